@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+DESCRIPTION = """Benchmark reading config files and the state file the way pyiaacsync used to (two reads per config with the pure 
+python YAML loader) against a single read per config with the libyaml based loader, if available"""
+
+def generate_configs(folder, num_files):
+    """Generate a tree of config files to benchmark against
+
+    Args:
+        folder (str): Folder in which to write the config files
+        num_files (int): Number of config files to write
+
+    Returns:
+        list: Paths to the config files written
+    """
+    config_paths = []
+    for i in range(num_files):
+        dir_path = os.path.join(folder, f"dir{i % 100}")
+        os.makedirs(dir_path, exist_ok=True)
+        config_path = os.path.join(dir_path, f"config{i}.yaml")
+        with open(config_path, "w") as f:
+            f.write(f"filepath: '/tmp/out{i}.txt'\ntext: 'Hello World {i}'\ntags:\n  - a\n  - b\nsettings:\n  enabled: true\n  count: {i}\n")
+        config_paths.append(config_path)
+    return config_paths
+
+def load_configs_two_reads(config_paths):
+    """Hash and parse each config file with two reads and the pure python loader"""
+    for config_path in config_paths:
+        with open(config_path, "rb") as f:
+            hashlib.sha256(f.read()).hexdigest()
+        with open(config_path, "r") as f:
+            yaml.load(f, Loader=yaml.SafeLoader)
+
+def load_configs_single_read(config_paths):
+    """Hash and parse each config file from a single read with the loader used by pyiaacsync"""
+    for config_path in config_paths:
+        with open(config_path, "rb") as f:
+            config_bytes = f.read()
+        hashlib.sha256(config_bytes).hexdigest()
+        yaml.load(config_bytes, Loader=statestore.SafeLoader)
+
+def time_it(func, *func_args):
+    """Time a function call in seconds"""
+    start = time.perf_counter()
+    func(*func_args)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument('-n', '--num-files', type=int, default=10000, help="Number of config files to generate")
+    args = parser.parse_args()
+
+    # Include the IAAC Sync module
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+    from pyiaacsync import statestore
+
+    with tempfile.TemporaryDirectory() as folder:
+        config_paths = generate_configs(os.path.join(folder, "conf"), args.num_files)
+        state = {p: {'asset_id': f"asset-{i}", 'hash': hashlib.sha256(p.encode()).hexdigest()} 
+                 for i, p in enumerate(config_paths)}
+        state_file = os.path.join(folder, "state.yaml")
+
+        print(f"Loader used by pyiaacsync: {statestore.SafeLoader.__name__}, Dumper: {statestore.SafeDumper.__name__}")
+
+        before = time_it(load_configs_two_reads, config_paths)
+        after = time_it(load_configs_single_read, config_paths)
+        print(f"Configs ({args.num_files} files): {before:.2f}s -> {after:.2f}s ({before / after:.1f}x)")
+
+        with open(state_file, "w") as f:
+            before = time_it(yaml.dump, state, f)
+        with open(state_file, "w") as f:
+            after = time_it(yaml.dump, state, f, statestore.SafeDumper)
+        print(f"State write ({args.num_files} assets): {before:.2f}s -> {after:.2f}s ({before / after:.1f}x)")
+
+        with open(state_file, "r") as f:
+            before = time_it(yaml.safe_load, f)
+        with open(state_file, "rb") as f:
+            after = time_it(yaml.load, f, statestore.SafeLoader)
+        print(f"State read ({args.num_files} assets): {before:.2f}s -> {after:.2f}s ({before / after:.1f}x)")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import argparse
+import gc
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+DESCRIPTION = """Benchmark the time to load the state and the memory it takes, for the state kept as plain dicts (as pyiaacsync used
+to) against the compact state records loaded from each of the state stores"""
+
+def generate_state(num_assets):
+    """Generate a state as plain dicts, as it is kept in the YAML state file
+
+    Args:
+        num_assets (int): Number of assets in the state
+
+    Returns:
+        dict: The state
+    """
+    state = {}
+    for i in range(num_assets):
+        config_path = os.path.join("exampleconf", f"dir{i % 100}", f"config{i}.yaml")
+        state[config_path] = {
+            'asset_id': f"asset-{i}",
+            'hash': hashlib.sha256(config_path.encode()).hexdigest(),
+            'stat': [1700000000000000000 + i, 100 + i % 50, 1000000 + i],
+        }
+    return state
+
+def measure(func, *func_args):
+    """Measure the time taken by a function call and the memory held by the value it returns
+
+    Returns:
+        tuple: The seconds taken, and the bytes held by the value returned
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = func(*func_args)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return elapsed, size
+
+def load_yaml_dicts(state_file):
+    """Load the YAML state file as plain dicts, as pyiaacsync used to (but with the same YAML loader as the state stores)"""
+    with open(state_file, "rb") as f:
+        return yaml.load(f, Loader=statestore.SafeLoader)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument('-n', '--num-assets', type=int, default=100000, help="Number of assets in the state")
+    args = parser.parse_args()
+
+    # Include the IAAC Sync module
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+    from pyiaacsync import statestore
+
+    state = statestore.records_from_dicts(generate_state(args.num_assets))
+    with tempfile.TemporaryDirectory() as folder:
+        yaml_state_file = os.path.join(folder, "state.yaml")
+        statestore.YamlStateStore(yaml_state_file).create(state)
+
+        elapsed, size = measure(load_yaml_dicts, yaml_state_file)
+        print(f"plain dicts (yaml): load {elapsed:.2f}s, memory {size / 2**20:.1f} MiB "
+              f"({args.num_assets} assets, file {os.path.getsize(yaml_state_file) / 2**20:.1f} MiB)")
+
+        for name, state_store_class in statestore.STATE_STORES.items():
+            state_store = state_store_class(os.path.join(folder, f"state.{name}"))
+            state_store.create(state)
+            elapsed, size = measure(state_store.read)
+            state_store.close()
+            print(f"records ({name}): load {elapsed:.2f}s, memory {size / 2**20:.1f} MiB "
+                  f"(file {os.path.getsize(state_store.state_file) / 2**20:.1f} MiB)")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DESCRIPTION = """Benchmark the throughput and memory of syncs against a synthetic tree of config files and a mock asset class
+with configurable latency, error rate and drift rate: a cold sync, a no-op resync, a resync after a fraction of the config files
+changed, and the deletion of all the assets. The results can be written as JSON, to compare them between releases"""
+
+CHOICES_SCENARIO = [
+    'cold_sync',
+    'noop_resync',
+    'partial_resync',
+    'delete_all',
+]
+
+HELP_SCENARIO = """
+Scenarios to run, in order.
+
+cold_sync: To create all the assets from a new state file
+noop_resync: To sync again when no config file has changed
+partial_resync: To sync again after a fraction `churn` of the config files have changed, been added or removed
+delete_all: To delete all the assets
+"""
+
+# Seconds by which the mtimes of the generated config files are moved back, so that their stat can be relied upon straight away
+CONFIG_MTIME_AGE = 60
+
+def generate_configs(folder, num_files, depth, files_per_dir):
+    """Generate a tree of config files to benchmark against
+
+    Args:
+        folder (str): Folder in which to write the config files
+        num_files (int): Number of config files to write
+        depth (int): Number of levels of folders in which the config files are spread
+        files_per_dir (int): Number of config files in each folder
+
+    Returns:
+        list: Paths to the config files written
+    """
+    num_dirs = math.ceil(num_files / files_per_dir)
+    fanout = max(2, math.ceil(num_dirs ** (1 / depth))) if depth else 1
+    mtime = time.time() - CONFIG_MTIME_AGE
+    config_paths = []
+    for i in range(num_files):
+        dir_index = i // files_per_dir
+        dir_parts = []
+        for _ in range(depth):
+            dir_parts.append(f"dir{dir_index % fanout}")
+            dir_index //= fanout
+        dir_path = os.path.join(folder, *reversed(dir_parts))
+        os.makedirs(dir_path, exist_ok=True)
+        config_path = os.path.join(dir_path, f"config{i}.yaml")
+        write_config(config_path, i, 0, mtime)
+        config_paths.append(config_path)
+    return config_paths
+
+def write_config(config_path, i, revision, mtime):
+    """Write a config file
+
+    Args:
+        config_path (str): Path to the config file
+        i (int): Number of the config
+        revision (int): Revision of the config, changed to simulate churn
+        mtime (float): Modification time to set on the config file
+    """
+    with open(config_path, "w") as f:
+        f.write(f"name: config-{i}\nrevision: {revision}\ntext: 'Hello World {i}'\ntags:\n  - a\n  - b\n"
+                f"settings:\n  enabled: true\n  count: {i}\n")
+    os.utime(config_path, (mtime, mtime))
+
+def churn_configs(config_paths, churn):
+    """Change, add and remove a fraction of the config files, as a commit would
+
+    Args:
+        config_paths (list): Paths to the config files
+        churn (float): Fraction of the config files to change. A tenth as many are added, and as many removed.
+
+    Returns:
+        int: Number of config files changed, added or removed
+    """
+    num_changed = int(len(config_paths) * churn)
+    num_added = num_removed = num_changed // 10
+    mtime = time.time() - CONFIG_MTIME_AGE / 2
+    step = max(1, len(config_paths) // max(1, num_changed))
+    changed_paths = config_paths[::step][:num_changed]
+    for config_path in changed_paths:
+        i = int(os.path.basename(config_path)[len("config"):-len(".yaml")])
+        write_config(config_path, i, 1, mtime)
+    for config_path in changed_paths[:num_removed]:
+        os.remove(config_path)
+    for j in range(num_added):
+        config_path = os.path.join(os.path.dirname(changed_paths[j]), f"config{len(config_paths) + j}.yaml")
+        write_config(config_path, len(config_paths) + j, 0, mtime)
+    return num_changed + num_added + num_removed
+
+def get_peak_rss():
+    """Get the peak resident memory of the process so far
+
+    Returns:
+        int: Bytes
+    """
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The peak is reported in bytes on macOS, and in KiB elsewhere
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+def get_git_commit():
+    """Get the git commit of the pyiaacsync checkout being benchmarked, if any
+
+    Returns:
+        str: The commit OR None, if not in a git checkout
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_scenario(scenario, num_configs, trace_memory, make_sync):
+    """Run a scenario and measure its time, memory and the metrics of the sync
+
+    Args:
+        scenario (str): Name of the scenario
+        num_configs (int): Number of configs the scenario goes through, to calculate the throughput
+        trace_memory (bool): Whether to measure the peak memory allocated by python via tracemalloc (slow)
+        make_sync (func): Function which creates the `IaacSync` instance to run the scenario
+
+    Returns:
+        dict: The results of the scenario
+    """
+    errors = []
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    iaac_sync = make_sync(lambda err_class, err_msg: errors.append(err_class.__name__))
+    elapsed = time.perf_counter() - start
+    result = {
+        'scenario': scenario,
+        'seconds': elapsed,
+        'configs': num_configs,
+        'configs_per_second': num_configs / elapsed if elapsed else None,
+        'errors': len(errors),
+        'peak_rss_mib': get_peak_rss() / 2**20,
+    }
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['traced_peak_mib'] = peak / 2**20
+
+    # Time taken by each phase and by the calls to each method of the asset class, from the metrics of the sync
+    metrics = iaac_sync.get_metrics()
+    result['phase_seconds'] = dict([(sample['labels']['phase'], sample['sum'])
+                                    for sample in metrics.get('pyiaacsync_phase_duration_seconds', [])])
+    result['asset_call_seconds'] = dict([(sample['labels']['operation'], sample['sum'])
+                                         for sample in metrics.get('pyiaacsync_asset_call_duration_seconds', [])])
+    result['config_results'] = dict([(sample['labels']['result'], sample['value'])
+                                     for sample in metrics.get('pyiaacsync_configs_total', [])])
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=DESCRIPTION, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-n', '--num-files', type=int, default=10000, help="Number of config files to generate")
+    parser.add_argument('-d', '--depth', type=int, default=2, help="Number of levels of folders holding the config files")
+    parser.add_argument('-fd', '--files-per-dir', type=int, default=100, help="Number of config files in each folder")
+    parser.add_argument('-c', '--churn', type=float, default=0.01,
+                        help="Fraction of the config files changed for the partial resync")
+    parser.add_argument('-l', '--latency', type=float, default=0, help="Seconds taken by each call to the mock provider")
+    parser.add_argument('-e', '--error-rate', type=float, default=0, help="Fraction of the calls to the mock provider which fail")
+    parser.add_argument('-dr', '--drift-rate', type=float, default=0,
+                        help="Fraction of the checks which report the asset as out of sync")
+    parser.add_argument('-w', '--max-workers', type=int, help="Number of threads to sync with, if any")
+    parser.add_argument('-as', '--async-asset', action='store_true', help="Use the mock asset class with async methods")
+    parser.add_argument('-b', '--batch-size', type=int, help="Maximum number of items passed to the batch methods, if any")
+    parser.add_argument('-st', '--state-store', default='yaml',
+                        help="State store to keep the state in e.g. yaml, sqlite, binary")
+    parser.add_argument('-s', '--scenario', action='append', choices=CHOICES_SCENARIO, help=HELP_SCENARIO)
+    parser.add_argument('-m', '--trace-memory', action='store_true',
+                        help="Measure the peak memory allocated by python in each scenario via tracemalloc (slow)")
+    parser.add_argument('-o', '--output', help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    # Include the IAAC Sync module
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+    from pyiaacsync import pyiaacsync, statestore
+    from mockasset import AsyncMockAsset, MockAssetWithUpdate
+
+    asset = AsyncMockAsset if args.async_asset else MockAssetWithUpdate
+    asset.configure(latency=args.latency, error_rate=args.error_rate, drift_rate=args.drift_rate)
+    scenarios = args.scenario or CHOICES_SCENARIO
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        conf_folder = os.path.join(folder, "conf")
+        start = time.perf_counter()
+        config_paths = generate_configs(conf_folder, args.num_files, args.depth, args.files_per_dir)
+        print(f"Generated {args.num_files} config files in {time.perf_counter() - start:.2f}s")
+
+        state_file = os.path.join(folder, f"state.{args.state_store}")
+        state_store = statestore.STATE_STORES[args.state_store](state_file)
+        sync_settings = {'continue_sync_on_error': True, 'max_workers': args.max_workers}
+        if args.batch_size:
+            sync_settings['batch_size'] = args.batch_size
+        pyiaacsync.IaacSync(conf_folder, state_store, asset, init=True, init_force=True)
+
+        def make_sync(callback_on_sync_error, **sync_args):
+            return pyiaacsync.IaacSync(conf_folder, state_store, asset, callback_on_sync_error=callback_on_sync_error,
+                                       **sync_settings, **sync_args)
+
+        for scenario in scenarios:
+            num_changed = churn_configs(config_paths, args.churn) if scenario == 'partial_resync' else None
+            sync_args = {'delete_all_only': True} if scenario == 'delete_all' else {}
+            result = run_scenario(scenario, args.num_files, args.trace_memory,
+                                  lambda callback: make_sync(callback, **sync_args))
+            result['changed_configs'] = num_changed
+            state_store.close()
+            results.append(result)
+            print(f"{scenario}: {result['seconds']:.2f}s, {result['configs_per_second'] or 0:.0f} configs/s, "
+                  f"{result['errors']} errors, peak RSS {result['peak_rss_mib']:.1f} MiB")
+
+    if args.output:
+        report = {
+            'benchmark': 'sync',
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'commit': get_git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'yaml_loader': statestore.SafeLoader.__name__,
+            'settings': vars(args),
+            'results': results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DESCRIPTION = """Benchmark finding the config files in a large tree and the assets in the state whose config files no longer exist
+the way pyiaacsync used to (`os.walk` collecting ALL the config files into a list, then checking each config path in the state
+against the list) against the streaming walk via `os.scandir` which removes each config file found from the set of config paths
+in the state. Exits with an error if the two do not find the same config files and orphans"""
+
+# Extension of the config files generated
+CONFIG_FILE_EXTENSION = ".yaml"
+
+def generate_configs(folder, num_files, files_per_dir):
+    """Generate a tree of empty config files to benchmark against, along with a file which is not a config in each folder
+
+    Args:
+        folder (str): Folder in which to write the config files
+        num_files (int): Number of config files to write
+        files_per_dir (int): Number of config files in each folder
+
+    Returns:
+        list: Paths to the config files written
+    """
+    config_paths = []
+    for i in range(num_files):
+        dir_path = os.path.join(folder, f"dir{i // files_per_dir // 100}", f"dir{i // files_per_dir}")
+        if i % files_per_dir == 0:
+            os.makedirs(dir_path, exist_ok=True)
+            open(os.path.join(dir_path, "README.md"), "w").close()
+        config_path = os.path.join(dir_path, f"config{i}{CONFIG_FILE_EXTENSION}")
+        open(config_path, "w").close()
+        config_paths.append(config_path)
+    return config_paths
+
+def find_orphans_list(folder, state_config_paths, max_list_files):
+    """Find the config files by collecting them into a list, and the orphans by checking the list for each config path in the
+    state, as pyiaacsync used to. The check is skipped above `max_list_files`, as it takes quadratic time.
+
+    Returns:
+        tuple: Number of config files found, and the orphans OR None, if the check was skipped
+    """
+    all_config_files = []
+    for dir_path, _, files in os.walk(folder):
+        for f in files:
+            if f.endswith(CONFIG_FILE_EXTENSION):
+                all_config_files.append(os.path.join(dir_path, f))
+    if len(all_config_files) > max_list_files:
+        return len(all_config_files), None
+    return len(all_config_files), [p for p in state_config_paths if p not in all_config_files]
+
+def find_orphans_streaming(folder, state_config_paths):
+    """Find the config files via the streaming walk, and the orphans as the config paths in the state not found by the walk, as
+    pyiaacsync does
+
+    Returns:
+        tuple: Number of config files found, and the orphans
+    """
+    num_config_files = 0
+    unseen_config_paths = set(state_config_paths)
+    for config_path in walk.walk_files(folder):
+        if config_path.endswith(CONFIG_FILE_EXTENSION):
+            unseen_config_paths.discard(config_path)
+            num_config_files += 1
+    return num_config_files, [p for p in state_config_paths if p in unseen_config_paths]
+
+def measure(func, *func_args):
+    """Measure the time and the peak memory allocated by python of a function call
+
+    Returns:
+        tuple: The result of the function, seconds and peak MiB
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*func_args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument('-n', '--num-files', type=int, default=100000, help="Number of config files to generate")
+    parser.add_argument('-fd', '--files-per-dir', type=int, default=100, help="Number of config files in each folder")
+    parser.add_argument('-r', '--orphan-rate', type=float, default=0.01,
+                        help="Fraction of the config files tracked in the state whose config files no longer exist")
+    parser.add_argument('-ml', '--max-list-files', type=int, default=20000,
+                        help="Number of config files above which the quadratic check against the list is skipped")
+    args = parser.parse_args()
+
+    # Include the IAAC Sync module
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+    from pyiaacsync import walk
+
+    with tempfile.TemporaryDirectory() as folder:
+        conf_folder = os.path.join(folder, "conf")
+        start = time.perf_counter()
+        config_paths = generate_configs(conf_folder, args.num_files, args.files_per_dir)
+        print(f"Generated {args.num_files} config files in {time.perf_counter() - start:.2f}s")
+
+        # The state tracks all the config files, along with the config files since removed
+        num_orphans = int(args.num_files * args.orphan_rate)
+        orphans = [os.path.join(conf_folder, "removed", f"config{i}{CONFIG_FILE_EXTENSION}") for i in range(num_orphans)]
+        state_config_paths = config_paths + orphans
+        del config_paths
+
+        (num_found, found_orphans), elapsed, peak = measure(find_orphans_streaming, conf_folder, state_config_paths)
+        print(f"Streaming walk with set ({num_found} config files, {len(found_orphans)} orphans): {elapsed:.2f}s, "
+              f"peak traced {peak:.1f} MiB")
+        if num_found != args.num_files or found_orphans != orphans:
+            sys.exit(f"Streaming walk found {num_found} config files and {len(found_orphans)} orphans, expected "
+                     f"{args.num_files} and {len(orphans)}")
+
+        (num_found, found_orphans), elapsed, peak = measure(find_orphans_list, conf_folder, state_config_paths,
+                                                            args.max_list_files)
+        if found_orphans is None:
+            print(f"os.walk with list ({num_found} config files, orphan check skipped above {args.max_list_files} files): "
+                  f"{elapsed:.2f}s, peak traced {peak:.1f} MiB")
+        else:
+            print(f"os.walk with list ({num_found} config files, {len(found_orphans)} orphans): {elapsed:.2f}s, "
+                  f"peak traced {peak:.1f} MiB")
+            if found_orphans != orphans:
+                sys.exit(f"os.walk with list found {len(found_orphans)} orphans, expected {len(orphans)}")
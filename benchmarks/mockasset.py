@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import asyncio
+import itertools
+import random
+import time
+
+class MockAssetError(Exception):
+    """Exception generated by the mock asset to simulate a failed call to the provider
+    """
+    pass
+
+class MockAsset:
+    """An asset class which keeps the assets in memory, to benchmark pyiaacsync without a real provider. Each call to the
+    provider (check, create, update, delete) waits for `latency` seconds, and fails with `MockAssetError` for a fraction
+    `error_rate` of the calls. A fraction `drift_rate` of the checks report the asset as out of sync, as if it was changed in
+    the background. Set the settings via `configure`.
+    """
+    latency = 0
+    error_rate = 0
+    drift_rate = 0
+    assets = {}
+    ids = itertools.count()
+    random = random.Random(0)
+
+    @classmethod
+    def configure(cls, latency=0, error_rate=0, drift_rate=0, seed=0):
+        """Set the behaviour of the mock provider, and forget all the assets
+
+        Args:
+            latency (float, optional): Seconds taken by each call to the provider. Defaults to 0.
+            error_rate (float, optional): Fraction of the calls to the provider which fail. Defaults to 0.
+            drift_rate (float, optional): Fraction of the checks which report the asset as out of sync. Defaults to 0.
+            seed (int, optional): Seed of the random errors and drift, so that runs can be compared. Defaults to 0.
+        """
+        cls.latency = latency
+        cls.error_rate = error_rate
+        cls.drift_rate = drift_rate
+        cls.assets = {}
+        cls.ids = itertools.count()
+        cls.random = random.Random(seed)
+
+    @classmethod
+    def call_provider(cls):
+        """Simulate a call to the provider
+
+        Raises:
+            MockAssetError: The call failed
+        """
+        if cls.latency:
+            time.sleep(cls.latency)
+        if cls.error_rate and cls.random.random() < cls.error_rate:
+            raise MockAssetError("Mock provider call failed")
+
+    @classmethod
+    def validate(cls, config, **args):
+        """Validate the config locally, without calling the provider
+
+        Args:
+            config (dict): Configuration/Spec describing the asset
+            args (dict): Adding optional arguments
+
+        Returns:
+            bool: Whether the config is valid
+        """
+        return isinstance(config, dict)
+
+    @classmethod
+    def check(cls, asset_id, config, **args):
+        """Check whether the asset matches the config
+
+        Args:
+            asset_id (str): Unique identifier identifying the asset
+            config (dict): Configuration/Spec (source of truth)
+            args (dict): Adding optional arguments
+
+        Returns:
+            bool: Whether the asset is in sync
+        """
+        cls.call_provider()
+        if cls.drift_rate and cls.random.random() < cls.drift_rate:
+            return False
+        return cls.assets.get(asset_id) == config
+
+    @classmethod
+    def create(cls, config, **args):
+        """Create the asset
+
+        Args:
+            config (dict): Configuration/Spec describing the asset
+            args (dict): Adding optional arguments
+
+        Returns:
+            str: ID of the asset created
+        """
+        cls.call_provider()
+        asset_id = f"mock-{next(cls.ids)}"
+        cls.assets[asset_id] = config
+        return asset_id
+
+    @classmethod
+    def delete(cls, asset_id, **args):
+        """Delete the asset
+
+        Args:
+            asset_id (str): Unique identifier identifying the asset to delete
+            args (dict): Adding optional arguments
+
+        Returns:
+            bool: Whether the asset has been deleted OR it no longer exists
+        """
+        cls.call_provider()
+        cls.assets.pop(asset_id, None)
+        return True
+
+class MockAssetWithUpdate(MockAsset):
+    """The mock asset class, which also updates the assets in place
+    """
+    @classmethod
+    def update(cls, asset_id, config, **args):
+        """Update the asset in place
+
+        Args:
+            asset_id (str): Unique identifier identifying the asset to update
+            config (dict): Configuration/Spec describing the asset
+            args (dict): Adding optional arguments
+
+        Returns:
+            bool: Whether the asset has been updated
+        """
+        cls.call_provider()
+        if asset_id not in cls.assets:
+            return False
+        cls.assets[asset_id] = config
+        return True
+
+class AsyncMockAsset(MockAssetWithUpdate):
+    """The mock asset class with `async def` methods, which wait for the latency without blocking the event loop
+    """
+    @classmethod
+    async def async_call_provider(cls):
+        """Simulate a call to the provider via the event loop
+
+        Raises:
+            MockAssetError: The call failed
+        """
+        if cls.latency:
+            await asyncio.sleep(cls.latency)
+        if cls.error_rate and cls.random.random() < cls.error_rate:
+            raise MockAssetError("Mock provider call failed")
+
+    @classmethod
+    async def check(cls, asset_id, config, **args):
+        await cls.async_call_provider()
+        if cls.drift_rate and cls.random.random() < cls.drift_rate:
+            return False
+        return cls.assets.get(asset_id) == config
+
+    @classmethod
+    async def create(cls, config, **args):
+        await cls.async_call_provider()
+        asset_id = f"mock-{next(cls.ids)}"
+        cls.assets[asset_id] = config
+        return asset_id
+
+    @classmethod
+    async def update(cls, asset_id, config, **args):
+        await cls.async_call_provider()
+        if asset_id not in cls.assets:
+            return False
+        cls.assets[asset_id] = config
+        return True
+
+    @classmethod
+    async def delete(cls, asset_id, **args):
+        await cls.async_call_provider()
+        cls.assets.pop(asset_id, None)
+        return True
@@ -13,7 +13,10 @@ CHOICES_ACTION = [
     'delete_assets',
     'validate_configs',
     'sync_once',
-    'sync'
+    'sync',
+    'watch',
+    'plan',
+    'apply'
 ]
 
 HELP_ACTION = """
@@ -24,6 +27,9 @@ delete_assets: To remove all existing assets and update state file
 validate_configs: To validate ALL the configs
 sync_once: To sync the assets from spec/configs once only
 sync: To continuously sync the assets from spec/configs continuously
+watch: To continuously sync the assets from spec/configs as soon as they change, keeping the state in memory
+plan: To plan the actions to sync the assets from spec/configs, and write them to a plan file without syncing
+apply: To apply the actions in the plan file written by plan
 """
 
 def sync_error_handler(err_class, err_msg):
@@ -38,6 +44,7 @@ if __name__ == "__main__":
     parser.add_argument('-f', '--init-state-file', help="Initial state file to use, optionally")
     parser.add_argument('-if', '--init-force', action='store_true', 
         help="Force initialization of the state file aka re-create state file even if it already exists")
+    parser.add_argument('-p', '--plan-file', default='out-plan.yaml', help="Plan file written by plan and read by apply")
     args = parser.parse_args()
 
     # Include the IAAC Sync class
@@ -87,6 +94,20 @@ if __name__ == "__main__":
                 print(f"Waiting for a second before resyncing...")
                 time.sleep(1)
 
+        elif args.action == 'watch':
+            i = pyiaacsync.IaacSync('exampleconf', 'out-teststate.yaml', FileAssetWithUpdate, run_on_init=False,
+                    continue_sync_on_error=True, callback_on_sync_error=sync_error_handler,
+                    **random_args)
+            i.run_forever()
+
+        elif args.action == 'plan':
+            i = pyiaacsync.IaacSync('exampleconf', 'out-teststate.yaml', FileAssetWithUpdate, plan_only=True, 
+                    plan_file=args.plan_file, **random_args)
+
+        elif args.action == 'apply':
+            i = pyiaacsync.IaacSync('exampleconf', 'out-teststate.yaml', FileAssetWithUpdate, apply_only=True, 
+                    plan_file=args.plan_file, **random_args)
+
     except Exception as e:
         print(f"Error running Iaac Sync. Exception: {e.__class__}, {e}")
         import traceback
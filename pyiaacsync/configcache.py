@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import threading
+
+from collections import OrderedDict
+
+# Default maximum number of parsed configs kept in the cache across syncs
+DEFAULT_CONFIG_CACHE_SIZE = 10000
+
+class ConfigCache:
+    """Class used to keep the parsed configs along with the stat of the config file they were read from, so that config files
+    which are unchanged are not read again in the next sync. At most `max_size` configs are kept, the least recently used are
+    evicted first, so that the memory used stays bounded however many config files the IAAC Sync folder has.
+    """
+    def __init__(self, max_size=DEFAULT_CONFIG_CACHE_SIZE):
+        """Function to initialize the cache
+
+        Args:
+            max_size (int, optional): Maximum number of configs to keep, or 0 to keep none. Defaults to
+                DEFAULT_CONFIG_CACHE_SIZE.
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, config_path, default=None):
+        """Get the cached entry for a config file, marking it as the most recently used
+
+        Args:
+            config_path (str): Path to the config file
+            default (object, optional): Returned if the config file is not cached. Defaults to None.
+
+        Returns:
+            tuple: The stat, hash, config and settings for pyiaacsync of the config file OR the default
+        """
+        with self.lock:
+            entry = self.entries.get(config_path)
+            if entry is None:
+                return default
+            self.entries.move_to_end(config_path)
+            return entry
+
+    def put(self, config_path, entry):
+        """Cache the entry for a config file, evicting the least recently used entries beyond `max_size`
+
+        Args:
+            config_path (str): Path to the config file
+            entry (tuple): The stat, hash, config and settings for pyiaacsync of the config file
+        """
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[config_path] = entry
+            self.entries.move_to_end(config_path)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def pop(self, config_path):
+        """Remove the entry for a config file, if cached
+
+        Args:
+            config_path (str): Path to the config file
+        """
+        with self.lock:
+            self.entries.pop(config_path, None)
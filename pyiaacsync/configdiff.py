@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+import base64
+import zlib
+
+import yaml
+
+from .statestore import SafeDumper, SafeLoader
+
+# Level of the zlib compression of the snapshots of the configs kept in the state
+SNAPSHOT_COMPRESSION_LEVEL = 6
+
+class ConfigDiff:
+    """Class which describes what changed between the config last applied to an asset and the config to apply: the keys
+    added, removed and changed, each by its path of keys from the top of the config e.g. `('settings', 'count')`. Mappings are
+    compared key by key, and any other value (including lists) is compared as a whole. A diff without any change is falsy.
+    """
+    def __init__(self, added=None, removed=None, changed=None):
+        """Function to initialize the diff
+
+        Args:
+            added (dict, optional): The value of each key added, by path. Defaults to None.
+            removed (dict, optional): The last applied value of each key removed, by path. Defaults to None.
+            changed (dict, optional): The last applied and new values `(old, new)` of each key changed, by path. Defaults to
+                None.
+        """
+        self.added = added or {}
+        self.removed = removed or {}
+        self.changed = changed or {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __eq__(self, other):
+        if not isinstance(other, ConfigDiff):
+            return NotImplemented
+        return (self.added, self.removed, self.changed) == (other.added, other.removed, other.changed)
+
+    def __repr__(self):
+        return f"ConfigDiff(added={self.added!r}, removed={self.removed!r}, changed={self.changed!r})"
+
+    def paths(self):
+        """Get the paths of all the keys added, removed or changed
+
+        Returns:
+            list: Sorted paths of keys e.g. `[('name',), ('settings', 'count')]`
+        """
+        return sorted(list(self.added) + list(self.removed) + list(self.changed), key=repr)
+
+def diff_configs(old_config, new_config, path=(), diff=None):
+    """Find what changed between two configs, walking into the mappings
+
+    Args:
+        old_config (object): The config last applied, or a value within it
+        new_config (object): The config to apply, or the value at the same path within it
+        path (tuple, optional): Path of keys to the values from the top of the configs. Defaults to the top.
+        diff (ConfigDiff, optional): The diff to add the changes to. Defaults to a new diff.
+
+    Returns:
+        ConfigDiff: The keys added, removed and changed
+    """
+    if diff is None:
+        diff = ConfigDiff()
+    if isinstance(old_config, dict) and isinstance(new_config, dict):
+        for key, value in new_config.items():
+            if key not in old_config:
+                diff.added[path + (key,)] = value
+            else:
+                diff_configs(old_config[key], value, path + (key,), diff)
+        for key, value in old_config.items():
+            if key not in new_config:
+                diff.removed[path + (key,)] = value
+    elif type(old_config) != type(new_config) or old_config != new_config:
+        diff.changed[path] = (old_config, new_config)
+    return diff
+
+def snapshot_config(config):
+    """Describe a config as a compact snapshot which can be kept in the state, as compressed YAML
+
+    Args:
+        config (object): The config
+
+    Returns:
+        str: The snapshot
+    """
+    config_yaml = yaml.dump(config, Dumper=SafeDumper, sort_keys=False, default_flow_style=True)
+    return base64.b64encode(zlib.compress(config_yaml.encode(), SNAPSHOT_COMPRESSION_LEVEL)).decode()
+
+def restore_config(snapshot):
+    """Restore a config from its snapshot
+
+    Args:
+        snapshot (str): The snapshot
+
+    Returns:
+        object: The config
+    """
+    return yaml.load(zlib.decompress(base64.b64decode(snapshot)), Loader=SafeLoader)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import base64
+import datetime
+import hashlib
+import json
+
+# Modes in which the configs can be hashed to tell whether they have changed: the raw bytes of the config file, or the canonical
+# form of the parsed config so that reformatting the file, editing comments or reordering keys does not change the hash
+RAW_HASH_MODE = "raw"
+SEMANTIC_HASH_MODE = "semantic"
+HASH_MODES = [RAW_HASH_MODE, SEMANTIC_HASH_MODE]
+
+# Prefix of the tags which mark the values that JSON cannot describe in the canonical form e.g. `{"!timestamp": "..."}`. Keys
+# of the config which start with it are escaped by doubling it, so that they are never mistaken for a tag
+CANONICAL_TAG_PREFIX = "!"
+
+def canonicalize(value):
+    """Convert a parsed config into a canonical form which only holds JSON values: the mappings with string keys as JSON
+    objects, the other mappings as pairs sorted by key, the sets sorted, and the timestamps and binary values tagged
+
+    Args:
+        value (object): The config, or a value within it
+
+    Returns:
+        object: The canonical form of the value
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        if all([isinstance(key, str) for key in value.keys()]):
+            return dict([(CANONICAL_TAG_PREFIX + key if key.startswith(CANONICAL_TAG_PREFIX) else key, canonicalize(item))
+                         for key, item in value.items()])
+        pairs = [[canonicalize(key), canonicalize(item)] for key, item in value.items()]
+        return {f"{CANONICAL_TAG_PREFIX}map": sorted(pairs, key=lambda pair: to_canonical_json(pair[0]))}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return {f"{CANONICAL_TAG_PREFIX}set": sorted([canonicalize(item) for item in value], key=to_canonical_json)}
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return {f"{CANONICAL_TAG_PREFIX}timestamp": value.isoformat()}
+    if isinstance(value, bytes):
+        return {f"{CANONICAL_TAG_PREFIX}binary": base64.b64encode(value).decode()}
+    return {f"{CANONICAL_TAG_PREFIX}{value.__class__.__name__}": repr(value)}
+
+def to_canonical_json(value):
+    """Serialize a value already in canonical form as compact JSON with sorted keys
+
+    Args:
+        value (object): The value in canonical form
+
+    Returns:
+        str: The JSON
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def calculate_hash(config_bytes, config, hash_mode=RAW_HASH_MODE):
+    """Calculate the SHA256 hash of a config, as per the hash mode
+
+    Args:
+        config_bytes (bytes): Contents of the config file
+        config (object): The config parsed from the config file, without the settings for pyiaacsync. Only used in the
+            semantic hash mode.
+        hash_mode (str, optional): One of HASH_MODES. Defaults to RAW_HASH_MODE.
+
+    Returns:
+        str: Readable SHA256 hash
+    """
+    if hash_mode == SEMANTIC_HASH_MODE:
+        config_bytes = to_canonical_json(canonicalize(config)).encode()
+    return hashlib.sha256(config_bytes).hexdigest()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+import os
+import subprocess
+
+# Command used to run git, with the optional locks disabled so that `git status` never writes the index of the work tree
+GIT_COMMAND = ["git", "--no-optional-locks"]
+
+class GitNotAvailable(Exception):
+    """Exception generated when git is not installed, or the folder is not in a git work tree
+    """
+    pass
+
+class GitWorkTree:
+    """Class used to ask git which files have changed in a folder of a git work tree since a commit, without walking and
+    hashing all the files in the folder
+    """
+    def __init__(self, folder):
+        """Function to initialize the work tree
+
+        Args:
+            folder (str): The folder within the git work tree e.g. the IAAC Sync folder
+
+        Raises:
+            GitNotAvailable: git is not installed, or the folder is not in a git work tree
+        """
+        self.folder = folder
+        try:
+            is_work_tree = self.__git("rev-parse", "--is-inside-work-tree").strip()
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise GitNotAvailable(f"Folder: {folder} is not in a git work tree. Error: {e.__class__}, {e}")
+        if is_work_tree != "true":
+            raise GitNotAvailable(f"Folder: {folder} is not in a git work tree")
+
+    def get_head(self):
+        """Get the commit checked out in the work tree
+
+        Returns:
+            str: The commit OR None, if nothing has been committed yet
+        """
+        try:
+            return self.__git("rev-parse", "--verify", "--quiet", "HEAD").strip()
+        except subprocess.CalledProcessError:
+            return None
+
+    def is_dirty(self):
+        """Check whether the folder has changes which are not committed, including untracked files
+
+        Returns:
+            bool: Whether any file in the folder differs from the commit checked out
+        """
+        return bool(self.__git("status", "--porcelain", "-z", "--untracked-files=all", "--", "."))
+
+    def is_ancestor(self, commit, head):
+        """Check whether a commit is in the history of another commit, which is not the case once the history has been
+        rewritten (e.g. after a rebase and force-push) or if the commit does not exist
+
+        Args:
+            commit (str): The older commit e.g. the commit last synced
+            head (str): The newer commit
+
+        Returns:
+            bool: Whether `commit` is an ancestor of (or the same as) `head`
+        """
+        try:
+            self.__git("merge-base", "--is-ancestor", commit, head)
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    def get_changed_paths(self, commit, head):
+        """Get the files in the folder which have been changed, added or removed between two commits. Renamed files are
+        listed as removed from their old path and added at their new path.
+
+        Args:
+            commit (str): The older commit e.g. the commit last synced
+            head (str): The newer commit
+
+        Returns:
+            set: Paths to the changed files, in the same form as the folder e.g. `<folder>/rules/rule-1.yaml`
+        """
+        output = self.__git("diff", "--name-only", "-z", "--no-renames", "--relative", commit, head, "--")
+        return set([os.path.join(self.folder, path.replace("/", os.sep)) for path in output.split("\0") if path])
+
+    def __git(self, *args):
+        """Run a git command in the folder
+
+        Args:
+            args (list): Arguments of the git command e.g. `status`, `--porcelain`
+
+        Raises:
+            subprocess.CalledProcessError: The git command failed
+
+        Returns:
+            str: The output of the git command
+        """
+        return subprocess.run(GIT_COMMAND + ["-C", self.folder] + list(args), capture_output=True, text=True,
+                              check=True).stdout
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+import threading
+
+class DependencyCycleException(Exception):
+    """Exception generated when the configs depend on each other in a cycle
+    """
+    pass
+
+class TaskGraph:
+    """Class used to run the tasks for configs in dependency order: the task for a config becomes ready as soon as the tasks for
+    all the configs it depends on have finished, so that independent branches can run concurrently. If a task fails, the
+    tasks for all the configs which depend on it (directly or not) are skipped. The configs can be given at once, or added one 
+    at a time as they are found via `add` until `close` is called.
+    """
+    def __init__(self, dependencies=None, reverse=False):
+        """Function to initialize the graph
+
+        Args:
+            dependencies (dict, optional): The config paths that each config path depends on. Dependencies outside of the graph 
+                are ignored. Defaults to None, in which case the configs are added via `add`.
+            reverse (bool, optional): Whether to run the tasks in reverse dependency order (e.g. to delete the assets), so that
+                the task for a config only becomes ready once the tasks for all the configs depending on it have finished.
+                Defaults to False.
+
+        Raises:
+            DependencyCycleException: The configs depend on each other in a cycle
+        """
+        # Config paths that each config added is still waiting on, and the configs added waiting on each config path
+        self.parents = {}
+        self.children = {}
+
+        # Number of config paths that each config added and not yet finished is still waiting on
+        self.waiting_parents = {}
+        self.finished = set()
+        self.failed = set()
+        self.ready = []
+        self.unfinished = 0
+        self.has_dependencies = False
+        self.is_closed = False
+        self.lock = threading.Lock()
+        if dependencies is None:
+            return
+
+        if reverse:
+            reversed_dependencies = dict([(config_path, []) for config_path in dependencies])
+            for config_path, depends_on in dependencies.items():
+                for parent in depends_on or []:
+                    if parent == config_path:
+                        raise DependencyCycleException(f"Config: {config_path} depends on itself")
+                    if parent in reversed_dependencies:
+                        reversed_dependencies[parent].append(config_path)
+            dependencies = reversed_dependencies
+        for config_path, depends_on in dependencies.items():
+            self.add(config_path, depends_on)
+        self.close()
+
+    def add(self, config_path, depends_on=None):
+        """Add the task for a config, which becomes ready as soon as the tasks for all the configs it depends on have 
+        finished. The configs it depends on which have not been added yet are waited on until `close` is called
+
+        Args:
+            config_path (str): Path to the config file
+            depends_on (list, optional): The config paths that the config depends on. Defaults to None.
+
+        Raises:
+            DependencyCycleException: The config depends on itself
+
+        Returns:
+            str: A config path that the config depends on whose task failed (or was skipped), in which case the task for the 
+                config is skipped OR None
+        """
+        if config_path in (depends_on or []):
+            raise DependencyCycleException(f"Config: {config_path} depends on itself")
+        with self.lock:
+            failed_parent = next((parent for parent in depends_on or [] if parent in self.failed), None)
+            if failed_parent:
+                self.failed.add(config_path)
+                return failed_parent
+
+            parents = set([parent for parent in depends_on or [] if parent not in self.finished])
+            if parents:
+                self.parents[config_path] = parents
+            for parent in parents:
+                self.children.setdefault(parent, set()).add(config_path)
+            self.waiting_parents[config_path] = len(parents)
+            self.unfinished += 1
+            if not parents:
+                self.ready.append(config_path)
+            return None
+
+    def close(self):
+        """Mark all the configs as added, so that the configs which have not been added are no longer waited on as they are 
+        outside of the graph
+
+        Raises:
+            DependencyCycleException: The configs depend on each other in a cycle
+        """
+        with self.lock:
+            self.is_closed = True
+            outside_parents = [parent for parent in self.children if parent not in self.waiting_parents]
+            for parent in outside_parents:
+                for child in self.children.pop(parent):
+                    if child in self.parents:
+                        self.parents[child].discard(parent)
+                    self.__release(child)
+            self.has_dependencies = any(self.parents.values())
+            self.__check_cycles()
+
+    def __release(self, config_path):
+        """Stop a config waiting on one of the configs it depends on, making its task ready if it was the last one
+
+        Args:
+            config_path (str): Path to the config file
+        """
+        if config_path not in self.waiting_parents:
+            return
+        self.waiting_parents[config_path] -= 1
+        if self.waiting_parents[config_path] == 0:
+            self.ready.append(config_path)
+
+    def __check_cycles(self):
+        """Check that every config can be reached in dependency order
+
+        Raises:
+            DependencyCycleException: The configs depend on each other in a cycle
+        """
+        waiting_parents = dict(self.waiting_parents)
+        ready = [config_path for config_path, count in waiting_parents.items() if count == 0]
+        reached = 0
+        while ready:
+            config_path = ready.pop()
+            reached += 1
+            for child in self.children.get(config_path, []):
+                if child not in waiting_parents:
+                    continue
+                waiting_parents[child] -= 1
+                if waiting_parents[child] == 0:
+                    ready.append(child)
+        if reached == len(waiting_parents):
+            return
+
+        # Walk back through the parents from a config left waiting to report one of the cycles
+        config_path = next(config_path for config_path, count in waiting_parents.items() if count)
+        path = []
+        seen = {}
+        while config_path not in seen:
+            seen[config_path] = len(path)
+            path.append(config_path)
+            config_path = next(parent for parent in self.parents[config_path] if waiting_parents.get(parent))
+        cycle = path[seen[config_path]:] + [config_path]
+        raise DependencyCycleException(f"Configs depend on each other in a cycle: {' -> '.join(reversed(cycle))}")
+
+    def pop_ready(self):
+        """Get the config paths whose tasks are ready to run
+
+        Returns:
+            list: Config paths whose tasks can be run now
+        """
+        with self.lock:
+            ready = [config_path for config_path in self.ready if config_path in self.waiting_parents]
+            self.ready = []
+            return ready
+
+    def is_finished(self):
+        """Check whether all the configs have been added, and their tasks have finished (or been skipped)
+
+        Returns:
+            bool: Whether all the tasks have finished
+        """
+        return self.is_closed and self.unfinished == 0
+
+    def finish(self, config_path):
+        """Mark the task for a config as finished, making ready the tasks for the configs waiting only on it
+
+        Args:
+            config_path (str): Path to the config file
+        """
+        with self.lock:
+            if self.waiting_parents.pop(config_path, None) is None:
+                return
+            self.unfinished -= 1
+            self.finished.add(config_path)
+            self.parents.pop(config_path, None)
+            for child in self.children.pop(config_path, []):
+                self.__release(child)
+
+    def fail(self, config_path):
+        """Mark the task for a config as failed, skipping the tasks for all the configs which depend on it, incl. those added 
+        later
+
+        Args:
+            config_path (str): Path to the config file
+
+        Returns:
+            list: Config paths whose tasks have been skipped
+        """
+        skipped = []
+        with self.lock:
+            failed = [config_path]
+            while failed:
+                failed_config_path = failed.pop()
+                if self.waiting_parents.pop(failed_config_path, None) is None:
+                    continue
+                self.unfinished -= 1
+                self.failed.add(failed_config_path)
+                self.parents.pop(failed_config_path, None)
+                if failed_config_path != config_path:
+                    skipped.append(failed_config_path)
+                failed.extend(self.children.pop(failed_config_path, []))
+        return skipped
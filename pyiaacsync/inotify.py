@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+
+# inotify event masks, as defined in <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Events which indicate that a config file (or a folder of config files) has changed
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+# Size of the header of each event read from the inotify file descriptor: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+# Maximum number of bytes to read from the inotify file descriptor at once
+READ_SIZE = 64 * 1024
+
+class InotifyNotAvailable(Exception):
+    """Exception generated when inotify is not available on the platform
+    """
+    pass
+
+class InotifyWatcher:
+    """Class used to watch a folder and all its sub-folders for changed files via Linux inotify
+    """
+    def __init__(self, folder):
+        """Start watching a folder and all its sub-folders
+
+        Args:
+            folder (str): The folder to watch
+
+        Raises:
+            InotifyNotAvailable: inotify is not available on the platform
+        """
+        libc_name = ctypes.util.find_library("c")
+        try:
+            self.libc = ctypes.CDLL(libc_name, use_errno=True)
+            self.libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise InotifyNotAvailable(f"inotify not available. Error: {e.__class__}, {e}")
+
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise InotifyNotAvailable(f"inotify not available. Error: {os.strerror(err)}")
+
+        self.folder = folder
+        self.watches = {}
+        self.overflowed = False
+        self.add_watches(folder)
+
+    def add_watches(self, folder):
+        """Watch a folder and all its sub-folders
+
+        Args:
+            folder (str): The folder to watch
+
+        Returns:
+            list: Paths to all the files found in the folders now being watched
+        """
+        file_paths = []
+        for dir_path, _, files in os.walk(folder):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR):
+                    # Folder removed while it was being watched
+                    continue
+                raise OSError(err, f"Could not watch folder: {dir_path}. Error: {os.strerror(err)}")
+            self.watches[wd] = dir_path
+            file_paths.extend([os.path.join(dir_path, f) for f in files])
+        return file_paths
+
+    def read_changes(self, timeout):
+        """Wait for changes in the watched folders
+
+        Args:
+            timeout (float): Maximum number of seconds to wait for changes
+
+        Returns:
+            set: Paths of the files and folders that have changed. `overflowed` is set if the kernel dropped events, in which
+                case all files must be assumed to have changed
+        """
+        changed_paths = set()
+        moved_dir_paths = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed_paths
+
+        while True:
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_len].rstrip(b"\0"))
+                offset += name_len
+
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+
+                dir_path = self.watches.get(wd)
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                if dir_path is None:
+                    continue
+
+                path = os.path.join(dir_path, name) if name else dir_path
+                changed_paths.add(path)
+
+                # The watches of a moved folder follow it, so they are only remapped once it is found under its new path
+                if mask & IN_ISDIR and mask & IN_MOVED_FROM:
+                    moved_dir_paths.add(path)
+
+                # Watch new folders, and report the files that were created in them before the watch was added. The kernel 
+                # returns the same watch for a folder moved within the IAAC Sync folder, which now maps to its new path
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    changed_paths.update(self.add_watches(path))
+
+        self.__remove_moved_out_watches(moved_dir_paths)
+        return changed_paths
+
+    def __remove_moved_out_watches(self, moved_dir_paths):
+        """Stop watching the folders moved out of the watched folder, i.e. those still mapped to the path they were moved from
+
+        Args:
+            moved_dir_paths (set): Paths the folders were moved from
+        """
+        if not moved_dir_paths:
+            return
+        prefixes = tuple([dir_path.rstrip(os.sep) + os.sep for dir_path in moved_dir_paths])
+        for wd, dir_path in list(self.watches.items()):
+            if dir_path in moved_dir_paths or dir_path.startswith(prefixes):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def close(self):
+        """Stop watching the folders
+        """
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
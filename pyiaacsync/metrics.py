@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Default upper bounds (in seconds) of the buckets of the latency histograms
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# Outcomes counted for the configs in a sync
+CONFIG_RESULTS = ["created", "updated", "deleted", "in_sync", "errored"]
+
+# Type and description of each metric collected, as exported to Prometheus
+METRICS = {
+    'pyiaacsync_cycles_total': ('counter', "Number of sync cycles run, by action"),
+    'pyiaacsync_cycle_duration_seconds': ('histogram', "Time taken by the sync cycles, by action"),
+    'pyiaacsync_last_cycle_duration_seconds': ('gauge', "Time taken by the last sync cycle, by action"),
+    'pyiaacsync_last_cycle_timestamp_seconds': ('gauge', "Time at which the last sync cycle finished, by action"),
+    'pyiaacsync_last_cycle_configs': ('gauge', "Number of configs in the last sync cycle, by action and result"),
+    'pyiaacsync_configs_total': ('counter', "Number of configs synced, by result"),
+    'pyiaacsync_phase_duration_seconds': ('histogram', "Time taken by each phase of a sync e.g. walk, hash, parse, "
+                                                       "state_write"),
+    'pyiaacsync_asset_calls_total': ('counter', "Number of calls to the asset class, by operation, kind and result"),
+    'pyiaacsync_asset_call_duration_seconds': ('histogram', "Time taken by the calls to the asset class, by operation and kind"),
+    'pyiaacsync_untracked_assets': ('gauge', "Number of remote assets listed by the asset class which are not tracked in the "
+                                             "state, by kind"),
+}
+
+logger = logging.getLogger(__name__)
+
+class Histogram:
+    """Class used to count observed values into buckets, along with their count and sum
+    """
+    def __init__(self, buckets):
+        """Function to initialize the histogram
+
+        Args:
+            buckets (tuple): Sorted upper bounds of the buckets
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Count a value into its bucket
+
+        Args:
+            value (float): The observed value
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        """Describe the histogram as a dict
+
+        Returns:
+            dict: The count, the sum and the cumulative count of the values at or below the upper bound of each bucket
+        """
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+
+class SyncMetrics:
+    """Class used to collect the metrics of the syncs: counters and latency histograms for each phase of a sync and each
+    operation of the asset class, and the outcome of the configs. The metrics can be read via `snapshot` and `get`, and written
+    to a Prometheus textfile collector file after each sync cycle.
+    """
+    def __init__(self, textfile=None, buckets=DEFAULT_LATENCY_BUCKETS):
+        """Function to initialize the metrics
+
+        Args:
+            textfile (str, optional): Path to the file (ending with `.prom`) to write the metrics to in the Prometheus text
+                format after each sync cycle. Defaults to None.
+            buckets (tuple, optional): Upper bounds (in seconds) of the buckets of the latency histograms. Defaults to
+                DEFAULT_LATENCY_BUCKETS.
+        """
+        self.textfile = textfile
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}
+        self.cycle_configs = {}
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter
+
+        Args:
+            name (str): Name of the counter
+            value (float, optional): Value to add. Defaults to 1.
+            labels (dict): Labels of the counter e.g. `operation='create'`
+        """
+        key = (name, self.__labels(labels))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge
+
+        Args:
+            name (str): Name of the gauge
+            value (float): Value of the gauge
+            labels (dict): Labels of the gauge
+        """
+        key = (name, self.__labels(labels))
+        with self.lock:
+            self.values[key] = value
+
+    def observe(self, name, value, **labels):
+        """Count a value into a histogram
+
+        Args:
+            name (str): Name of the histogram
+            value (float): The observed value e.g. seconds taken
+            labels (dict): Labels of the histogram e.g. `phase='hash'`
+        """
+        key = (name, self.__labels(labels))
+        with self.lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = Histogram(self.buckets)
+                self.values[key] = histogram
+            histogram.observe(value)
+
+    def observe_call(self, operation, kind, duration, result):
+        """Count a call to the asset class
+
+        Args:
+            operation (str): Name of the method of the asset class e.g. `create`
+            kind (str): The kind of asset, if `asset` is a registry of asset classes
+            duration (float): Seconds taken by the call
+            result (str): Outcome of the call i.e. `ok`, `error` or `throttled`
+        """
+        labels = {'operation': operation}
+        if kind is not None:
+            labels['kind'] = kind
+        self.inc('pyiaacsync_asset_calls_total', result=result, **labels)
+        self.observe('pyiaacsync_asset_call_duration_seconds', duration, **labels)
+
+    def count_config(self, result):
+        """Count the outcome of syncing a config
+
+        Args:
+            result (str): One of CONFIG_RESULTS
+        """
+        self.inc('pyiaacsync_configs_total', result=result)
+        with self.lock:
+            self.cycle_configs[result] = self.cycle_configs.get(result, 0) + 1
+
+    @contextmanager
+    def cycle(self, action):
+        """Time a sync cycle, and record the outcome of its configs once it has finished. The metrics are then written to the
+        textfile, if set. Errors writing the textfile are logged, so that they never replace the error of the cycle
+
+        Args:
+            action (str): The action of the cycle e.g. `sync`, `delete`, `plan`, `apply`
+        """
+        with self.lock:
+            self.cycle_configs = {}
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.inc('pyiaacsync_cycles_total', action=action)
+            self.observe('pyiaacsync_cycle_duration_seconds', duration, action=action)
+            self.set('pyiaacsync_last_cycle_duration_seconds', duration, action=action)
+            self.set('pyiaacsync_last_cycle_timestamp_seconds', time.time(), action=action)
+            for result in CONFIG_RESULTS:
+                self.set('pyiaacsync_last_cycle_configs', self.cycle_configs.get(result, 0), action=action, result=result)
+            if self.textfile:
+                try:
+                    self.write_textfile(self.textfile)
+                except Exception as e:
+                    logger.error(f"Could not write the metrics to textfile: {self.textfile}. Error: {e.__class__}, {e}")
+
+    def get(self, name, **labels):
+        """Get the value of a metric
+
+        Args:
+            name (str): Name of the metric
+            labels (dict): Labels of the metric
+
+        Returns:
+            float|dict: Value of the counter or gauge, or the histogram as a dict OR None, if never recorded
+        """
+        with self.lock:
+            value = self.values.get((name, self.__labels(labels)))
+            if isinstance(value, Histogram):
+                return value.to_dict()
+            return value
+
+    def snapshot(self):
+        """Get the values of all the metrics
+
+        Returns:
+            dict: For each metric, a list of its labels along with the value of the counter or gauge, or the histogram
+        """
+        snapshot = {}
+        with self.lock:
+            for (name, labels), value in sorted(self.values.items(), key=lambda item: item[0]):
+                sample = {'labels': dict(labels)}
+                if isinstance(value, Histogram):
+                    sample.update(value.to_dict())
+                else:
+                    sample['value'] = value
+                snapshot.setdefault(name, []).append(sample)
+        return snapshot
+
+    def to_prometheus(self):
+        """Describe the metrics in the Prometheus text format
+
+        Returns:
+            str: The metrics
+        """
+        lines = []
+        for name, samples in self.snapshot().items():
+            metric_type, description = METRICS.get(name, ('untyped', name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample in samples:
+                labels = sample['labels']
+                if 'value' in sample:
+                    lines.append(f"{name}{self.__format_labels(labels)} {sample['value']}")
+                    continue
+                for bound, count in sample['buckets'].items():
+                    lines.append(f"{name}_bucket{self.__format_labels(labels, le=bound)} {count}")
+                lines.append(f"{name}_bucket{self.__format_labels(labels, le='+Inf')} {sample['count']}")
+                lines.append(f"{name}_sum{self.__format_labels(labels)} {sample['sum']}")
+                lines.append(f"{name}_count{self.__format_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, textfile):
+        """Write the metrics in the Prometheus text format, replacing the file at once so that the collector never reads a
+        partly written file
+
+        Args:
+            textfile (str): Path to the file
+        """
+        tmp_textfile = f"{textfile}.{os.getpid()}.tmp"
+        with open(tmp_textfile, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_textfile, textfile)
+
+    def __labels(self, labels):
+        """Get the labels of a metric in a form usable as a key
+
+        Args:
+            labels (dict): Labels of the metric
+
+        Returns:
+            tuple: The sorted (name, value) of each label
+        """
+        return tuple(sorted(labels.items()))
+
+    def __format_labels(self, labels, **extra_labels):
+        """Format the labels of a metric in the Prometheus text format
+
+        Args:
+            labels (dict): Labels of the metric
+            extra_labels (dict): Any further labels e.g. the upper bound `le` of a histogram bucket
+
+        Returns:
+            str: The formatted labels e.g. `{operation="create"}`, or empty if there are none
+        """
+        labels = dict(labels, **extra_labels)
+        if not labels:
+            return ""
+        values = [(key, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+                  for key, value in labels.items()]
+        return "{" + ",".join([f'{key}="{value}"' for key, value in values]) + "}"
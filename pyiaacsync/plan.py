@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import datetime
+import os
+from collections import namedtuple
+
+import yaml
+
+from .confighash import RAW_HASH_MODE
+from .statestore import SafeDumper, SafeLoader
+
+# Version of the format of the plan file
+PLAN_VERSION = 1
+
+# Actions which can be planned for a config: create the asset, update it in place, delete it and create it again, delete it
+# as its config was removed, or leave it as is
+PLAN_ACTIONS = ["create", "update", "recreate", "delete", "noop"]
+
+# Action planned for the assets which already match their configs
+NOOP_ACTION = "noop"
+
+# Action planned for the assets whose configs were removed
+DELETE_ACTION = "delete"
+
+class PlanInvalidException(Exception):
+    """Exception generated when a plan file cannot be read
+    """
+    pass
+
+class PlanStaleException(Exception):
+    """Exception generated when a plan is applied after the assets it was planned against have changed in the state
+    """
+    pass
+
+# An action planned for a config: the config path relative to the IAAC Sync folder, the kind of asset, the asset ID and hash
+# tracked in the state when planned, and the hash, config and settings (`depends_on`, `check_interval`) of the config to apply
+PlanAction = namedtuple('PlanAction', ['action', 'config_path', 'kind', 'asset_id', 'state_hash', 'config_hash', 'config',
+                                       'depends_on', 'check_interval'], defaults=[None] * 7)
+
+class Plan:
+    """Class which describes the actions planned to sync the assets with the configs, so that they can be reviewed and then
+    applied later (e.g. planned in CI, applied in production) without reading the configs or checking the assets again
+    """
+    def __init__(self, actions, created=None, hash_mode=RAW_HASH_MODE):
+        """Function to initialize the plan
+
+        Args:
+            actions (list): The `PlanAction` for each config, in the order they were planned
+            created (str, optional): Time at which the plan was made, in ISO 8601 format. Defaults to now.
+            hash_mode (str, optional): The hash mode in which the configs were hashed. Defaults to RAW_HASH_MODE.
+        """
+        self.actions = actions
+        self.created = created or datetime.datetime.now(datetime.timezone.utc).isoformat()
+        self.hash_mode = hash_mode
+
+    def changes(self):
+        """Get the actions which change an asset
+
+        Returns:
+            list: The `PlanAction` which are not no-ops
+        """
+        return [action for action in self.actions if action.action != NOOP_ACTION]
+
+    def summary(self):
+        """Count the planned actions of each type
+
+        Returns:
+            dict: Number of configs for each action e.g. `{'create': 2, 'update': 1, 'recreate': 0, 'delete': 0, 'noop': 10}`
+        """
+        summary = dict([(action, 0) for action in PLAN_ACTIONS])
+        for action in self.actions:
+            summary[action.action] += 1
+        return summary
+
+    def write(self, plan_file):
+        """Write the plan to a YAML file, replacing it at once so that readers never see a partly written file
+
+        Args:
+            plan_file (str): Path to the plan file
+        """
+        actions = [dict([(field, value) for field, value in action._asdict().items() if value is not None])
+                   for action in self.actions]
+        tmp_plan_file = f"{plan_file}.tmp"
+        with open(tmp_plan_file, "w") as f:
+            yaml.dump({'version': PLAN_VERSION, 'created': self.created, 'hash_mode': self.hash_mode, 'actions': actions}, f, 
+                      Dumper=SafeDumper)
+        os.replace(tmp_plan_file, plan_file)
+
+    @classmethod
+    def read(cls, plan_file):
+        """Read a plan from a YAML file
+
+        Args:
+            plan_file (str): Path to the plan file
+
+        Raises:
+            PlanInvalidException: The plan file does not exist, or is not a plan of a supported version
+
+        Returns:
+            Plan: The plan
+        """
+        try:
+            with open(plan_file, "rb") as f:
+                plan = yaml.load(f, Loader=SafeLoader)
+        except Exception as e:
+            raise PlanInvalidException(f"Plan file: {plan_file} could not be read. Error: {e.__class__}, {e}")
+
+        if not isinstance(plan, dict) or plan.get('version') != PLAN_VERSION:
+            raise PlanInvalidException(f"Plan file: {plan_file} is not a plan of version {PLAN_VERSION}")
+        try:
+            actions = [PlanAction(**action) for action in plan.get('actions') or []]
+        except TypeError as e:
+            raise PlanInvalidException(f"Plan file: {plan_file} has invalid actions. Error: {e}")
+        for action in actions:
+            if action.action not in PLAN_ACTIONS or not action.config_path:
+                raise PlanInvalidException(f"Plan file: {plan_file} has an invalid action: {action.action} for config: "
+                                           f"{action.config_path}")
+        return cls(actions, plan.get('created'), plan.get('hash_mode') or RAW_HASH_MODE)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+import cProfile
+import glob
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Default number of cycles whose profiles are kept in the profile folder, the older ones being removed
+DEFAULT_KEEP_PROFILES = 10
+
+# Default number of the source lines which allocated the most memory reported for a cycle
+DEFAULT_TOP_ALLOCATIONS = 25
+
+# Number of frames of the traceback kept by tracemalloc for each allocation
+TRACEMALLOC_FRAMES = 1
+
+logger = logging.getLogger(__name__)
+
+class CycleProfiler:
+    """Class used to profile the sync cycles, to find out why a cycle is slow: each cycle can be run under cProfile and its
+    stats dumped, tracemalloc snapshots can be taken before and after the cycle to report the memory it allocated, and any
+    asset call slower than a threshold is logged along with the config path it was made for.
+    """
+    def __init__(self, profile_dir=None, cpu=True, memory=False, slow_call_threshold=None,
+            keep_profiles=DEFAULT_KEEP_PROFILES, top_allocations=DEFAULT_TOP_ALLOCATIONS):
+        """Function to initialize the profiler
+
+        Args:
+            profile_dir (str, optional): Folder to write the profiles of each cycle to e.g. `cycle-<time>-sync.prof` for the
+                cProfile stats (readable via `pstats`) and `cycle-<time>-sync.memory.txt` for the memory report. If not set,
+                the cycles are not profiled. Defaults to None.
+            cpu (bool, optional): Whether to run each cycle under cProfile. Only the thread running the cycle is profiled,
+                not the threads of `max_workers`. Defaults to True.
+            memory (bool, optional): Whether to trace the memory allocated by each cycle via tracemalloc. Defaults to False.
+            slow_call_threshold (float, optional): If set, the asset calls which take longer than this many seconds are
+                logged (as a warning of the `pyiaacsync.profiling` logger) along with the config path they were made for.
+                Defaults to None.
+            keep_profiles (int, optional): Number of cycles whose profiles are kept in the profile folder, at least 1. 
+                Defaults to DEFAULT_KEEP_PROFILES.
+            top_allocations (int, optional): Number of the source lines which allocated the most memory reported for each
+                cycle. Defaults to DEFAULT_TOP_ALLOCATIONS.
+
+        Raises:
+            ValueError: The number of cycles whose profiles are kept is below 1
+        """
+        if keep_profiles < 1:
+            raise ValueError(f"Number of profiles to keep: {keep_profiles} must be at least 1")
+        self.profile_dir = profile_dir
+        self.cpu = cpu
+        self.memory = memory
+        self.slow_call_threshold = slow_call_threshold
+        self.keep_profiles = keep_profiles
+        self.top_allocations = top_allocations
+        self.slow_calls = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def cycle(self, action):
+        """Profile a sync cycle, writing its profiles to the profile folder once it has finished
+
+        Args:
+            action (str): The action of the cycle e.g. `sync`, `delete`, `plan`, `apply`
+        """
+        if not self.profile_dir:
+            yield
+            return
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        prefix = os.path.join(self.profile_dir, f"cycle-{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 10**9:09d}-"
+                                                f"{action}")
+
+        profile = None
+        if self.cpu:
+            profile = cProfile.Profile()
+
+        # Only stop tracing the memory after the cycle, if it was not already being traced
+        is_tracing = False
+        before = None
+        if self.memory:
+            is_tracing = tracemalloc.is_tracing()
+            if not is_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+                profile.dump_stats(f"{prefix}.prof")
+            if before is not None:
+                after = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if not is_tracing:
+                    tracemalloc.stop()
+                self.__write_memory_report(f"{prefix}.memory.txt", before, after, peak)
+            self.__remove_old_profiles()
+
+    def record_call(self, call, duration):
+        """Log an asset call, if it was slower than the threshold
+
+        Args:
+            call (AssetCall): The asset call executed
+            duration (float): Seconds taken by the asset call
+        """
+        if self.slow_call_threshold is None or duration < self.slow_call_threshold:
+            return
+        with self.lock:
+            self.slow_calls += 1
+
+        config_path = call.config_path
+        if isinstance(config_path, list):
+            config_path = f"{len(config_path)} configs ({', '.join(config_path[:3])}{', ...' if len(config_path) > 3 else ''})"
+        kind = f", kind: {call.kind}" if call.kind is not None else ""
+        logger.warning(f"Slow asset call: {call.operation} took {duration:.3f}s for config: {config_path}{kind}")
+
+    def __write_memory_report(self, report_file, before, after, peak):
+        """Write the report of the memory allocated by a cycle
+
+        Args:
+            report_file (str): Path to the report file
+            before (tracemalloc.Snapshot): Snapshot taken before the cycle
+            after (tracemalloc.Snapshot): Snapshot taken after the cycle
+            peak (int): Peak size of the memory traced during the cycle, in bytes
+        """
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        differences = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        with open(report_file, "w") as f:
+            f.write(f"Peak traced memory: {peak / 2**20:.1f} MiB\n")
+            f.write(f"Top {self.top_allocations} source lines by memory allocated and still held after the cycle:\n")
+            for difference in differences[:self.top_allocations]:
+                f.write(f"{difference}\n")
+
+    def __remove_old_profiles(self):
+        """Remove the profiles of all but the last `keep_profiles` cycles from the profile folder
+        """
+        profiles = glob.glob(os.path.join(glob.escape(self.profile_dir), "cycle-*"))
+        prefixes = sorted(set([os.path.join(self.profile_dir, os.path.basename(path).split(".")[0]) for path in profiles]))
+        for prefix in prefixes[:-self.keep_profiles]:
+            for path in glob.glob(f"{glob.escape(prefix)}.*"):
+                os.remove(path)
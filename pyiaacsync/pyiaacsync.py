@@ -1,10 +1,106 @@
 #!/usr/bin/env python
-import hashlib
+import asyncio
+import inspect
+import logging
 import os
+import sys
+import threading
+import time
 import yaml
 
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+
+from .configcache import DEFAULT_CONFIG_CACHE_SIZE, ConfigCache
+from .configdiff import diff_configs, restore_config, snapshot_config
+from .confighash import HASH_MODES, RAW_HASH_MODE, calculate_hash
+from .gitchanges import GitNotAvailable, GitWorkTree
+from .graph import DependencyCycleException, TaskGraph
+from .inotify import InotifyNotAvailable, InotifyWatcher
+from .metrics import SyncMetrics
+from .plan import DELETE_ACTION, NOOP_ACTION, Plan, PlanAction, PlanInvalidException, PlanStaleException
+from .ratelimit import AssetThrottledException, RateLimiter
+from .retry import DEFAULT_THROTTLED_MAX_ATTEMPTS, AssetCallDeferred, CircuitBreakerOpen, RetryPolicy
+from .scheduler import DEFAULT_CHECK_JITTER, CheckScheduler
+from .sharding import LOCK_FILE_SUFFIX, HashRing, ShardLock, find_shard_state_files
+from .statestore import SafeLoader, StateRecord, StateStore, YamlStateStore
+from .validation import ValidationCache, ValidationReport, get_cache_key, get_validator_version
+from .walk import walk_files
+
 CONFIG_FILE_EXTENSIONS = [".yaml", ".yml"]
 
+# Default number of configs whose asset calls can be in flight at once when the asset class is async
+DEFAULT_MAX_CONCURRENCY = 100
+
+# Seconds to wait for further changes to config files before syncing them in `run_forever`
+DEFAULT_DEBOUNCE = 0.5
+
+# Maximum time to wait for changes to settle down before syncing them, as a multiple of the debounce
+DEBOUNCE_MAX_FACTOR = 10
+
+# Seconds between full syncs in `run_forever` when config files are watched via inotify, to detect drift in the assets
+DEFAULT_FULL_SYNC_INTERVAL = 300
+
+# Seconds between full syncs in `run_forever` when inotify is not available
+DEFAULT_POLL_INTERVAL = 1
+
+# Maximum seconds `run_forever` waits before checking whether it has been stopped
+STOP_CHECK_INTERVAL = 1
+
+# Key in the state which holds the metadata about the syncs (rather than an asset config path)
+STATE_METADATA_KEY = "__pyiaacsync__"
+
+# Key in a config which holds the settings for pyiaacsync about the config e.g. `check_interval`, which is removed from the 
+# config before it is passed to the asset class
+CONFIG_METADATA_KEY = "__pyiaacsync__"
+
+# Config files modified within this window (in nanoseconds) of being hashed do not have their stat recorded, as a change made
+# within the same mtime tick could otherwise go unnoticed
+RACY_STAT_WINDOW_NS = 2 * 10**9
+
+# Methods that an asset class can define, either as plain functions or as `async def` coroutines
+ASSET_METHODS = ["validate", "check", "create", "delete", "update", "fingerprint", "list"]
+
+# Methods of the asset class which only check the config locally rather than call the backend, and so are not guarded by the
+# circuit breaker
+LOCAL_ASSET_METHODS = ["validate"]
+
+# Methods of the asset class which can return an iterator (or async iterator) that fetches their results page by page, which is
+# consumed within the call so that the time taken by all the pages is counted against the call
+PAGINATED_ASSET_METHODS = ["list"]
+
+# Operations for which the asset class can optionally define a batch method e.g. `check_many`, that is called with a list of 
+# items instead of a single item
+BATCH_OPERATIONS = ["check", "create", "delete", "fingerprint"]
+
+# Default maximum number of items passed to the batch methods of the asset class at once
+DEFAULT_BATCH_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+# Number of tasks per worker thread which are submitted to the pool ahead of the running ones, beyond which no more configs are
+# picked up until a task finishes
+PENDING_TASKS_PER_WORKER = 2
+
+# A call to a method of the asset class e.g. `check`, which the sync steps hand over to be executed (or awaited). The `kind` 
+# selects the asset class from the registry of asset classes, if several are synced. The `config_path` (or list of config paths
+# for a batch call) that the call is made for is only set when profiling
+AssetCall = namedtuple('AssetCall', ['operation', 'call_args', 'args', 'kind', 'config_path'], defaults=[None, None])
+
+# A run of a task for each of the config paths, which the steps of a cycle hand over alongside the asset calls to be run on the
+# pool of threads (or the event loop) of the sync
+TaskRun = namedtuple('TaskRun', ['task', 'config_paths', 'args'])
+
+# A wait of some seconds that the steps of a cycle hand over e.g. until the deferred tasks are due, so that the event loop (if
+# any) is not blocked
+Delay = namedtuple('Delay', ['seconds'])
+
+# A result of the `create`, `update` or `check` method of the asset class along with the fingerprint of the asset (e.g. its 
+# version, ETag or modified time), which is kept in the state so that the `fingerprint` method of the asset class can tell 
+# whether the asset has changed without the full `check`
+FingerprintedResult = namedtuple('FingerprintedResult', ['result', 'fingerprint'])
+
 class AssetNotCreatedException(Exception):
     """Exception generated when an asset is not created
     """
@@ -35,20 +131,149 @@ class ConfigFileInvalidSyntax(Exception):
     """
     pass
 
+class AssetBatchResultInvalid(Exception):
+    """Exception generated when a batch method of the asset does not return a result for each item in the batch
+    """
+    pass
+
+class AssetDependencyFailedException(Exception):
+    """Exception generated when an asset is skipped because an asset it depends on could not be synced or deleted
+    """
+    pass
+
+class ConfigDependencyNotFoundException(Exception):
+    """Exception generated when a config depends on a config file which does not exist
+    """
+    pass
+
+class AssetKindNotFoundException(Exception):
+    """Exception generated when a config cannot be routed to an asset class in the registry of asset classes
+    """
+    pass
+
+class AssetListResultInvalid(Exception):
+    """Exception generated when the `list` method of an asset class does not return the asset ID and fingerprint of each asset
+    """
+    pass
+
+class ConfigNotValidException(Exception):
+    """Exception generated when the asset class deems a config not valid
+    """
+    pass
+
+class ConfigFilesInvalidException(ConfigFileInvalidSyntax):
+    """Exception generated when any of the config files fail validation, along with the report of all the config files which
+    failed
+    """
+    def __init__(self, report):
+        """Function to initialize the exception
+
+        Args:
+            report (ValidationReport): The report of the validation
+        """
+        super().__init__(report.summary())
+        self.report = report
+
+def get_config_kind(assets, iaac_sync_folder, config_path, config):
+    """Route a config to a kind of asset in the registry of asset classes, by the `kind` field of the config or else by the 
+    first sub-folder of the IAAC Sync folder that the config file is in
+
+    Args:
+        assets (dict): The registry of asset classes, if any
+        iaac_sync_folder (str): The IAAC Sync folder path
+        config_path (str): Path to the config file
+        config (dict): The config read from the config file, if any
+
+    Raises:
+        AssetKindNotFoundException: The config cannot be routed to an asset class in the registry
+
+    Returns:
+        str: The kind of asset OR None, if a single asset class is synced
+    """
+    if assets is None:
+        return None
+
+    if isinstance(config, dict) and 'kind' in config:
+        kind = config['kind']
+        if kind not in assets:
+            raise AssetKindNotFoundException(f"Config file: {config_path} has kind: {kind} which is not in the asset "
+                                             f"classes: {', '.join(assets)}")
+        return kind
+
+    sub_folder = os.path.relpath(config_path, iaac_sync_folder).split(os.sep)[0]
+    if sub_folder in assets:
+        return sub_folder
+    raise AssetKindNotFoundException(f"Config file: {config_path} has no kind and is not in the sub-folder of any of the "
+                                     f"asset classes: {', '.join(assets)}")
+
+def validate_config_file(asset, iaac_sync_folder, config_path, config_bytes, args):
+    """Parse and validate the config in a config file, in a process of the pool validating the configs. The asset class and 
+    args must be picklable, and `async def` validate methods are run in a new event loop
+
+    Args:
+        asset (object|dict): The asset class, or the registry of asset classes by kind
+        iaac_sync_folder (str): The IAAC Sync folder path
+        config_path (str): Path to the config file
+        config_bytes (bytes): Contents of the config file
+        args (dict): Any additional optional args which would get passed to the `validate` method
+
+    Returns:
+        tuple: The kind of asset (if any), the seconds taken by `validate` (if called), and the class name and message of the 
+            error OR None, if the config is valid
+    """
+    kind = None
+    duration = None
+    try:
+        try:
+            config = yaml.load(config_bytes, Loader=SafeLoader)
+        except Exception as e:
+            raise ConfigFileInvalidSyntax(f"Config file: {config_path} syntax invalid. Error: {e.__class__}, {e}")
+        if isinstance(config, dict):
+            config.pop(CONFIG_METADATA_KEY, None)
+
+        # Empty configs are not validated, as in a sync
+        if config:
+            assets = asset if isinstance(asset, dict) else None
+            kind = get_config_kind(assets, iaac_sync_folder, config_path, config)
+            asset_class = assets[kind] if assets is not None else asset
+            start = time.perf_counter()
+            try:
+                is_valid = asset_class.validate(config, **args)
+                if inspect.iscoroutine(is_valid):
+                    is_valid = asyncio.run(is_valid)
+            finally:
+                duration = time.perf_counter() - start
+            if not is_valid:
+                raise ConfigNotValidException(f"Config file: {config_path} is not valid")
+    except Exception as e:
+        return kind, duration, (e.__class__.__name__, str(e))
+    return kind, duration, None
+
 class IaacSync:
     """Class used for deploying and syncing IAAC assets defined in an IAAC Sync folder (`iaac_sync_folder`) (e.g. a folder managed via git 
     for version control) that contains various configs describing how to create assets using the `asset` functions
     """
     def __init__(self, iaac_sync_folder, state_file, asset, conf_file_extensions=CONFIG_FILE_EXTENSIONS, 
             init=False, init_force=False, init_state_file=None, delete_all_only=False, validate_configs_only=False,
-            delete_if_asset_not_updated=True, continue_sync_on_error=False, callback_on_sync_error=None, **args):
+            delete_if_asset_not_updated=True, continue_sync_on_error=False, callback_on_sync_error=None, max_workers=None, 
+            max_concurrency=DEFAULT_MAX_CONCURRENCY, full_rehash_interval=None, batch_size=DEFAULT_BATCH_SIZE, 
+            check_interval=None, check_jitter=DEFAULT_CHECK_JITTER, max_checks_per_cycle=None, rate_limits=None, 
+            throttling_exceptions=(AssetThrottledException,), retry_policies=None, circuit_breaker=None, 
+            max_concurrency_per_kind=None, shard=None, shards=None, plan_only=False, apply_only=False, plan_file=None, 
+            metrics_file=None, profiler=None, git_changes=False, hash_mode=RAW_HASH_MODE, 
+            config_diffs=False, validate_processes=None, validate_cache_file=None, config_cache_size=DEFAULT_CONFIG_CACHE_SIZE, 
+            run_on_init=True, **args):
         """Function to sync spec configs defined in IAAC Sync folder 
 
         Args:
             iaac_sync_folder (str): The IAAC Sync folder path which contains the spec for asset to create
-            state_file (str): The path of the state which will be used for syncing the assets
-            asset (object): A class that represents the asset to sync. The asset is an class which defines the validate, check, 
-                create, delete methods
+            state_file (str|StateStore): The path of the state which will be used for syncing the assets, kept as a YAML file. 
+                Alternatively, a state store e.g. `SqliteStateStore` which describes where the state is kept.
+            asset (object|dict): A class that represents the asset to sync. The asset is an class which defines the validate, check, 
+                create, delete methods. The methods can also be defined as `async def` coroutines, in which case the sync is driven 
+                through an asyncio event loop. Alternatively, a registry of asset classes by kind e.g. `{'rule': Rule, 'logsource': 
+                LogSource}` to sync several kinds of assets at once, where each config is routed by its `kind` field, or else by 
+                the first sub-folder of the IAAC Sync folder that it is in
             conf_file_extensions (list, optional): List of extensions in iaac_sync_folder. Defaults to CONFIG_FILE_EXTENSIONS.
             init (bool, optional): Initialize the state file only. Defaults to False.
             init_state_file (str, optional): An optional initial state file to use when performing initialize. Defaults to None.
@@ -61,129 +286,695 @@ class IaacSync:
                 with error class and message as the argument
             callback_on_sync_error (func): Function of format `def callback_on_sync_error(err_class, err_msg)` which has error class and 
                 error message as arguments
+            max_workers (int, optional): If set, the check, create, update and delete calls for each config are run on a pool of 
+                `max_workers` threads instead of one config at a time. Defaults to None.
+            max_concurrency (int, optional): Maximum number of configs whose asset calls can be in flight at once when the asset
+                class defines `async def` methods. Defaults to DEFAULT_MAX_CONCURRENCY.
+            full_rehash_interval (int, optional): Config files whose stat (mtime, size, inode) matches the state are not re-read 
+                and re-hashed. If set, every `full_rehash_interval`-th sync ignores the stat and re-hashes all config files. 
+                Defaults to None.
+            batch_size (int, optional): Maximum number of items passed at once to the optional batch methods of the asset class 
+                (`check_many`, `create_many`, `delete_many`, `fingerprint_many`), if defined. If not set, the batch methods are 
+                not used. Defaults to DEFAULT_BATCH_SIZE.
+            check_interval (float, optional): If set, each asset whose config is unchanged is only checked (`check`) once every 
+                `check_interval` seconds, spread evenly across the syncs, instead of in every sync. Can be set per config via 
+                `check_interval` under the `__pyiaacsync__` key of the config. Defaults to None.
+            check_jitter (float, optional): Fraction of the `check_interval` by which each check is randomly moved earlier or 
+                later. Defaults to DEFAULT_CHECK_JITTER.
+            max_checks_per_cycle (int, optional): Maximum number of assets checked in a sync when `check_interval` is set, the 
+                most overdue first. Defaults to None.
+            rate_limits (dict, optional): Maximum number of calls per second to each method of the asset class e.g. 
+                `{'create': 5, 'check': 50}`, or a `RateLimiter` per method. Calls to the batch methods e.g. `check_many` count
+                against the limit of their operation unless set separately. Defaults to None.
+            throttling_exceptions (tuple, optional): Exceptions raised by the asset class when the provider throttles it, upon 
+                which the rate limit of the method is decreased and then slowly increased again as calls succeed. Unless the 
+                retry policy of the method retries them, the throttled calls to a method with a rate limit or a retry policy are 
+                retried up to DEFAULT_THROTTLED_MAX_ATTEMPTS times, once the rate limiter of the method lets a call through 
+                again (or after a backoff, if the method has no rate limit). Defaults to (AssetThrottledException,).
+            retry_policies (dict, optional): How failed calls to each method of the asset class are retried e.g. 
+                `{'create': RetryPolicy(max_attempts=5), 'check': 3}`, given as a `RetryPolicy` or the maximum number of attempts.
+                The config whose asset call failed is retried after the backoff, at the end of the sync, so that it does not hold
+                up the other configs. Defaults to None.
+            circuit_breaker (CircuitBreaker, optional): If set, asset calls are skipped for a cooldown after too many consecutive 
+                calls fail, and the configs which would make them are skipped in the sync with a `CircuitBreakerOpen` error. 
+                Defaults to None.
+            max_concurrency_per_kind (dict, optional): Maximum number of calls to each kind of asset class in flight at once
+                e.g. `{'rule': 4}`, when `asset` is a registry of asset classes. Defaults to None.
+            shard (str, optional): If set, only the configs which belong to this shard are synced, with the config paths spread 
+                across the `shards` via consistent hashing. Each shard keeps its partition of the state next to the state file 
+                (e.g. `state.shard-1.yaml` for `state.yaml`), and holds a lock on it while syncing. Defaults to None.
+            shards (int|list, optional): The names of all the shards, or the number of shards in which case they are named `0` 
+                to `N-1`. Defaults to just the `shard`.
+            plan_only (bool, optional): Whether to only plan the actions to sync the assets and write them to `plan_file`, 
+                without changing any asset or the state. Defaults to False.
+            apply_only (bool, optional): Whether to only apply the actions planned in `plan_file`. Defaults to False.
+            plan_file (str, optional): Path to the plan file written by `plan_only` and read by `apply_only`. Defaults to None.
+            metrics_file (str, optional): Path to a Prometheus textfile collector file (ending with `.prom`) to which the metrics 
+                of the syncs are written after each sync cycle. The metrics are also available via `get_metrics`. Defaults to 
+                None.
+            profiler (CycleProfiler, optional): If set, profiles each sync cycle via cProfile and tracemalloc, and logs the 
+                asset calls slower than a threshold along with their config paths. Defaults to None.
+            git_changes (bool, optional): If set and the IAAC Sync folder is in a git work tree, `sync` only syncs the config 
+                files changed since the commit last synced (kept in the state), as told by git. ALL the config files are synced 
+                instead if the folder has uncommitted changes, the commit last synced is not in the history of the commit 
+                checked out, the `shards` have changed, or every `full_rehash_interval`-th sync. The assets of the configs 
+                unchanged in git are only checked for drift when due as per `check_interval` (or in the full syncs), so a 
+                warning is logged if neither `check_interval` nor `full_rehash_interval` is set. Defaults to False.
+            hash_mode (str, optional): How the configs are hashed to tell whether they have changed: `raw` hashes the bytes of 
+                the config files, `semantic` hashes the canonical form of the parsed configs (without the settings for 
+                pyiaacsync), so that reformatting, editing comments or reordering keys does not update the assets. The hashes 
+                kept in the state are migrated to the new mode on the next sync, without updating the unchanged assets. Defaults
+                to RAW_HASH_MODE.
+            config_diffs (bool, optional): If set, a compressed snapshot of the config last applied to each asset is kept in the 
+                state, and `update` is passed what changed in the config since as a `ConfigDiff` via the `config_diff` keyword 
+                argument (or None, if not known or if the asset has drifted from an unchanged config). Assets whose configs are 
+                unchanged apart from their formatting or the settings for pyiaacsync are left as is. Defaults to False.
+            validate_processes (int, optional): If set, `validate_configs` parses and validates the config files on a pool of 
+                `validate_processes` processes, in which case the asset class and args must be picklable (e.g. the asset class 
+                is defined at the top level of a module). Defaults to None.
+            validate_cache_file (str, optional): Path to a JSON file in which `validate_configs` keeps the config files which 
+                passed validation, by the hash of their contents and the version of the validators (the `validator_version` 
+                attribute of the asset class, or else the source of its `validate` method), so that they are skipped until 
+                either changes. Defaults to None.
+            config_cache_size (int, optional): Maximum number of parsed configs kept across the syncs of this instance, so that 
+                unchanged config files are not read again, the least recently used evicted first. Set to 0 to keep none. 
+                Defaults to DEFAULT_CONFIG_CACHE_SIZE.
+            run_on_init (bool, optional): Whether to perform the action (init, delete, validate, plan, apply or sync) when the 
+                class is created. If False, call `sync`, `async_sync`, `delete_assets`, `validate_configs`, `plan`, `apply` or 
+                `init_state` afterwards. Defaults to True.
             args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            ValueError: The hash mode is not one of HASH_MODES
         """
         self.iaac_sync_folder = iaac_sync_folder
-        self.state_file = state_file
-        self.asset = asset
+        if isinstance(state_file, StateStore):
+            self.state_store = state_file
+        else:
+            self.state_store = YamlStateStore(state_file)
+
+        # Keep the partition of the state for this shard, if the config paths are sharded
+        self.shard = None
+        self.hash_ring = None
+        self.shard_lock = None
+        self.shard_states = None
+        if shard is not None:
+            self.shard = str(shard)
+            self.hash_ring = HashRing(shards if shards is not None else [self.shard])
+            self.unsharded_state_store = self.state_store
+            self.state_store = self.state_store.for_shard(self.shard)
+            self.shard_lock = ShardLock(f"{self.state_store.state_file}{LOCK_FILE_SUFFIX}")
+        self.state_file = self.state_store.state_file
+        if isinstance(asset, dict):
+            self.asset = None
+            self.assets = asset
+        else:
+            self.asset = asset
+            self.assets = None
         self.conf_file_extensions = conf_file_extensions
         self.delete_if_asset_not_updated = delete_if_asset_not_updated
         self.continue_sync_on_error = continue_sync_on_error
         self.callback_on_sync_error = callback_on_sync_error
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.full_rehash_interval = full_rehash_interval
+        self.full_rehash = False
+        if hash_mode not in HASH_MODES:
+            raise ValueError(f"Hash mode: {hash_mode} is not one of {', '.join(HASH_MODES)}")
+        self.hash_mode = hash_mode
+        self.config_diffs = config_diffs
+        self.validate_processes = validate_processes
+        self.validation_cache = ValidationCache(validate_cache_file) if validate_cache_file else None
+
+        # Report of the last validation, and the keys of the config files which passed it as kept in the validation cache
+        self.validation_report = None
+        self.validation_passed_keys = set()
+        self.batch_size = batch_size
+        self.check_scheduler = CheckScheduler(check_interval, check_jitter, max_checks_per_cycle)
+        self.due_checks = set()
+        self.rate_limiters = {}
+        for operation, rate_limit in (rate_limits or {}).items():
+            if not isinstance(rate_limit, RateLimiter):
+                rate_limit = RateLimiter(rate_limit)
+            self.rate_limiters[operation] = rate_limit
+        self.throttling_exceptions = tuple(throttling_exceptions or ())
+        self.retry_policies = {}
+        for operation, retry_policy in (retry_policies or {}).items():
+            if not isinstance(retry_policy, RetryPolicy):
+                retry_policy = RetryPolicy(max_attempts=retry_policy)
+            self.retry_policies[operation] = retry_policy
+
+        # How the throttled calls to the methods without a retry policy which retries them are retried
+        self.throttled_retry_policy = RetryPolicy(max_attempts=DEFAULT_THROTTLED_MAX_ATTEMPTS, 
+                                                  retry_on=self.throttling_exceptions)
+        self.circuit_breaker = circuit_breaker
+
+        # Time at which each config whose task was deferred after a failed asset call is to be retried, and the number of 
+        # attempts made for it so far
+        self.deferred_tasks = {}
+        self.task_attempts = {}
+
+        # Graph of the tasks being run in dependency order, if the configs depend on each other
+        self.task_graph = None
+
+        # Configs read ahead of the sync to find their dependencies, handed over to the sync of each config
+        self.loaded_configs = {}
+
+        # Actions planned (or being applied) for each config path, and whether a plan is being made so that the state is
+        # never written
+        self.plan_actions = {}
+        self.is_planning = False
+
+        # Fingerprint of each remote asset by asset ID for each kind of asset whose asset class defines `list`, listed at the 
+        # start of a full sync, and the IDs of the remote assets listed which are not tracked in the state
+        self.inventories = {}
+        self.untracked_assets = {}
+
+        # Counters and latency histograms of the sync cycles, their phases and the calls to the asset class
+        self.metrics = SyncMetrics(metrics_file)
+        self.profiler = profiler
+
+        # Work tree of the IAAC Sync folder if its changes are found via git (or False if it is not in git), and the commit to 
+        # keep in the state if any config fails to sync, so that its changes are found again by the next sync
+        self.git_changes = git_changes
+        if git_changes and not check_interval and not full_rehash_interval:
+            logger.warning("With git_changes, the assets of the configs unchanged in git are only checked for drift when due as "
+                           "per check_interval, or in the full syncs every full_rehash_interval syncs, and neither is set")
+        self.git_work_tree = None
+        self.is_syncing_git_commit = False
+        self.git_commit_on_error = None
+
+        # Semaphores limiting the calls in flight to each kind of asset class, and their equivalent for the event loop
+        self.max_concurrency_per_kind = max_concurrency_per_kind or {}
+        self.kind_semaphores = dict([(kind, threading.BoundedSemaphore(limit)) 
+                                     for kind, limit in self.max_concurrency_per_kind.items()])
+        self.async_kind_semaphores = {}
+        self.args = args
         self.state = {}
-        if init:
-            self.init_state(init_state_file, init_force)
-        elif delete_all_only:
-            self.__delete_assets(**args)
-        elif validate_configs_only:
-            self.__validate_configs(**args)
+
+        # Config paths added, updated or removed in the state since it was last read or written
+        self.changed_config_paths = set()
+
+        # Parsed configs along with the stat of the config file they were read from, reused across syncs by this instance
+        self.config_cache = ConfigCache(config_cache_size)
+        self.state_lock = threading.RLock()
+        self.stop_event = threading.Event()
+
+        # Drive the sync through an event loop if any of the asset's methods are coroutines
+        asset_methods = ASSET_METHODS + [f"{operation}_many" for operation in BATCH_OPERATIONS]
+        self.is_async = any([inspect.iscoroutinefunction(getattr(asset_class, m, None)) or 
+                             inspect.isasyncgenfunction(getattr(asset_class, m, None))
+                             for asset_class in self.__get_asset_classes() for m in asset_methods])
+
+        if run_on_init:
+            if init:
+                self.init_state(init_state_file, init_force)
+            elif delete_all_only:
+                self.delete_assets()
+            elif validate_configs_only:
+                self.validate_configs()
+            elif plan_only:
+                self.plan(plan_file)
+            elif apply_only:
+                self.apply(plan_file)
+            else:
+                self.sync()
+
+    def sync(self):
+        """Sync the assets with the configs in the IAAC Sync folder. If the asset class is async, then the sync is run in a new 
+        event loop
+        """
+        with self.shard_lock or nullcontext():
+            if self.is_async:
+                asyncio.run(self.async_sync())
+            else:
+                self.__drive(self.__sync_assets(**self.args))
+
+    async def async_sync(self):
+        """Sync the assets with the configs in the IAAC Sync folder from within a running event loop
+        """
+        with self.shard_lock or nullcontext():
+            await self.__async_drive(self.__sync_assets(**self.args))
+
+    def delete_assets(self):
+        """Delete all the assets that have been previously created, and update state file. If the asset class is async, then the 
+        deletes are run in a new event loop
+        """
+        with self.shard_lock or nullcontext():
+            if self.is_async:
+                asyncio.run(self.async_delete_assets())
+            else:
+                self.__drive(self.__delete_assets(**self.args))
+
+    async def async_delete_assets(self):
+        """Delete all the assets that have been previously created from within a running event loop, and update state file
+        """
+        with self.shard_lock or nullcontext():
+            await self.__async_drive(self.__delete_assets(**self.args))
+
+    def validate_configs(self):
+        """Validate ALL configurations that exist in config files in IAAC Sync folder, reporting all the config files which 
+        fail. If the asset class is async, then the validation is run in a new event loop
+
+        Raises:
+            ConfigFilesInvalidException: Any of the config files failed validation, with the report of all that failed
+
+        Returns:
+            ValidationReport: The report of the validation
+        """
+        if self.is_async and not self.validate_processes:
+            return asyncio.run(self.async_validate_configs())
+        return self.__drive(self.__validate_configs(**self.args))
+
+    async def async_validate_configs(self):
+        """Validate ALL configurations that exist in config files in IAAC Sync folder from within a running event loop, 
+        reporting all the config files which fail
+
+        Raises:
+            ConfigFilesInvalidException: Any of the config files failed validation, with the report of all that failed
+
+        Returns:
+            ValidationReport: The report of the validation
+        """
+        return await self.__async_drive(self.__validate_configs(**self.args))
+
+    def plan(self, plan_file=None):
+        """Plan the actions (create, update, recreate, delete or noop) to sync the assets with the configs in the IAAC Sync 
+        folder, without changing any asset or the state. Only the `validate` and (due) `check` methods of the asset class are 
+        called. If the asset class is async, then the plan is made in a new event loop
+
+        Args:
+            plan_file (str, optional): Path to the plan file to write the plan to, if any. Defaults to None.
+
+        Returns:
+            Plan: The plan
+        """
+        if self.is_async:
+            return asyncio.run(self.async_plan(plan_file))
+        return self.__write_plan(self.__drive(self.__plan_assets(**self.args)), plan_file)
+
+    async def async_plan(self, plan_file=None):
+        """Plan the actions to sync the assets with the configs in the IAAC Sync folder from within a running event loop
+
+        Args:
+            plan_file (str, optional): Path to the plan file to write the plan to, if any. Defaults to None.
+
+        Returns:
+            Plan: The plan
+        """
+        return self.__write_plan(await self.__async_drive(self.__plan_assets(**self.args)), plan_file)
+
+    def apply(self, plan):
+        """Apply the actions of a plan, without reading the configs or checking the assets again. The actions are run in 
+        dependency order, in parallel as per `max_workers` or `max_concurrency`. If the asset class is async, then the plan is 
+        applied in a new event loop
+
+        Args:
+            plan (Plan|str): The plan, or the path to the plan file
+
+        Raises:
+            PlanInvalidException: The plan file cannot be read, or the plan was made in another hash mode
+            PlanStaleException: The assets in the state have changed since the plan was made
+        """
+        with self.shard_lock or nullcontext():
+            if self.is_async:
+                asyncio.run(self.async_apply(plan))
+            else:
+                self.__drive(self.__apply_plan(self.__read_plan(plan), **self.args))
+
+    async def async_apply(self, plan):
+        """Apply the actions of a plan from within a running event loop
+
+        Args:
+            plan (Plan|str): The plan, or the path to the plan file
+
+        Raises:
+            PlanInvalidException: The plan file cannot be read, or the plan was made in another hash mode
+            PlanStaleException: The assets in the state have changed since the plan was made
+        """
+        with self.shard_lock or nullcontext():
+            await self.__async_drive(self.__apply_plan(self.__read_plan(plan), **self.args))
+
+    def get_metrics(self):
+        """Get the metrics collected across the sync cycles run by this instance: the number and duration of the cycles, the 
+        time taken by each phase (`walk`, `hash`, `parse`, `state_read`, `state_write`), the number and duration of the calls to 
+        each method of the asset class, and the number of configs `created`, `updated`, `deleted`, `in_sync` or `errored`
+
+        Returns:
+            dict: For each metric e.g. `pyiaacsync_asset_call_duration_seconds`, a list of its labels along with the value of the 
+                counter or gauge, or the histogram
+        """
+        return self.metrics.snapshot()
+
+    def get_untracked_assets(self):
+        """Get the remote assets found by the last full sync which are not tracked in the state e.g. created by hand, for each
+        kind of asset whose asset class defines `list`. They are left as is.
+
+        Returns:
+            dict: Sorted IDs of the untracked assets for each kind of asset (or None, if a single asset class is synced)
+        """
+        return dict([(kind, list(asset_ids)) for kind, asset_ids in self.untracked_assets.items()])
+
+    def run_forever(self, debounce=DEFAULT_DEBOUNCE, full_sync_interval=DEFAULT_FULL_SYNC_INTERVAL, 
+            poll_interval=DEFAULT_POLL_INTERVAL):
+        """Keep syncing the assets with the configs in the IAAC Sync folder until `stop` is called. The state is read once and 
+        kept in memory. On Linux, the IAAC Sync folder is watched via inotify and only the config files that changed are synced, 
+        with a full sync every `full_sync_interval` seconds to detect drift in the assets. Otherwise, a full sync is performed 
+        every `poll_interval` seconds.
+
+        Args:
+            debounce (float, optional): Seconds to wait for further changes after a change before syncing, so that a burst of 
+                changes (e.g. git checkout) is synced together. Defaults to DEFAULT_DEBOUNCE.
+            full_sync_interval (float, optional): Seconds between full syncs when watching via inotify. Defaults to 
+                DEFAULT_FULL_SYNC_INTERVAL.
+            poll_interval (float, optional): Seconds between full syncs when inotify is not available. Defaults to 
+                DEFAULT_POLL_INTERVAL.
+        """
+        self.stop_event.clear()
+        with self.shard_lock or nullcontext():
+            self.__run_forever(debounce, full_sync_interval, poll_interval)
+
+    def __run_forever(self, debounce, full_sync_interval, poll_interval):
+        """Keep syncing the assets with the configs in the IAAC Sync folder until `stop` is called
+
+        Args:
+            debounce (float): Seconds to wait for further changes after a change before syncing
+            full_sync_interval (float): Seconds between full syncs when watching via inotify
+            poll_interval (float): Seconds between full syncs when inotify is not available
+        """
+        self.read_state()
+
+        # Keep a single event loop across the syncs for async asset classes
+        loop = asyncio.new_event_loop() if self.is_async else None
+
+        try:
+            watcher = InotifyWatcher(self.iaac_sync_folder)
+        except InotifyNotAvailable:
+            watcher = None
+            full_sync_interval = poll_interval
+
+        try:
+            next_full_sync = 0
+            while not self.stop_event.is_set():
+                # Perform a full sync when due, or when changes may have been missed
+                if time.monotonic() >= next_full_sync or (watcher and watcher.overflowed):
+                    if watcher:
+                        watcher.overflowed = False
+                    self.__run_cycle(loop, self.__sync_all_configs(**self.args))
+                    next_full_sync = time.monotonic() + full_sync_interval
+                    continue
+
+                timeout = min(next_full_sync - time.monotonic(), STOP_CHECK_INTERVAL)
+                if not watcher:
+                    self.stop_event.wait(max(timeout, 0))
+                    continue
+
+                changed_paths = watcher.read_changes(max(timeout, 0))
+                if not changed_paths:
+                    continue
+
+                # Wait until the changes settle down, but not forever if the changes keep coming
+                settle_deadline = time.monotonic() + debounce * DEBOUNCE_MAX_FACTOR
+                while time.monotonic() < settle_deadline:
+                    more_changed_paths = watcher.read_changes(debounce)
+                    if not more_changed_paths:
+                        break
+                    changed_paths |= more_changed_paths
+
+                self.__run_cycle(loop, self.__sync_changed_configs(changed_paths, **self.args))
+        finally:
+            if watcher:
+                watcher.close()
+            if loop:
+                loop.close()
+
+    def __run_cycle(self, loop, steps):
+        """Run the steps of a cycle of `run_forever`, on the event loop kept across the cycles for async asset classes
+
+        Args:
+            loop (asyncio.AbstractEventLoop): The event loop, or None if the asset class is not async
+            steps (generator): Steps of the cycle
+        """
+        if loop:
+            loop.run_until_complete(self.__async_drive(steps))
         else:
-            self.__sync_assets(**args)
+            self.__drive(steps)
+
+    def stop(self):
+        """Stop `run_forever` after the sync in progress, if any
+        """
+        self.stop_event.set()
 
     def init_state(self, init_state_file=None, init_force=False):
         """Create a new state file, or use an existing state file if it exists
         
         Args:
             init_state_file (str, optional): Path to Initial stae file to use, if any. Defaults to None
-            init_force (bool, optional): Force initialization even if init file already exists. 
+            init_force (bool, optional): Force initialization even if init file already exists. If the config paths are 
+                sharded, only the assets of the configs which belong to this shard are taken from the initial state file.
+        """
+        with self.shard_lock or nullcontext():
+            self.__init_state(init_state_file, init_force)
+
+    def __init_state(self, init_state_file, init_force):
+        """Create a new state file, or use an existing state file if it exists
+
+        Args:
+            init_state_file (str): Path to Initial stae file to use, if any
+            init_force (bool): Force initialization even if init file already exists
         """
         if init_state_file:
             if os.path.isfile(init_state_file):
-                if (not os.path.isfile(self.state_file)) or (init_force and os.path.isfile(self.state_file)):
-                    with open(init_state_file, 'r') as f1:
-                        with open(self.state_file, "w") as f2:
-                            f2.write(f1.read())
+                if (not self.state_store.exists()) or init_force:
+                    init_state = YamlStateStore(init_state_file).read()
+                    if self.hash_ring:
+                        init_state = dict([(config_path, record) for config_path, record in init_state.items() 
+                                           if config_path != STATE_METADATA_KEY and self.__is_own_config(config_path)])
+                    self.state_store.create(init_state)
                 else:
                     raise FileAlreadyExists(f"State file: {self.state_file} already exists. Use `init_force` flag to force re-creation")
             else:
                 raise FileNotFoundException(f"Init state file: {init_state_file} not found")
         else:
             # Create a new state file
-            if (not os.path.isfile(self.state_file)) or (init_force and os.path.isfile(self.state_file)):
-                with open(self.state_file, "w") as f:
-                    f.write('{}')
+            if (not self.state_store.exists()) or init_force:
+                self.state_store.create({})
             else:
                 raise FileAlreadyExists(f"State file: {self.state_file} already exists. Use `init_force` flag to force re-creation")
 
     def write_state(self):
-        """Write the state to state file
+        """Write the state to state file. Only the changes since the state was last read or written are written, if the state 
+        store supports incremental writes
         """
-        with open(self.state_file, "w") as f:
-            yaml.dump(self.state, f)
+        with self.state_lock:
+            start = time.perf_counter()
+            self.state_store.write(self.state, self.changed_config_paths)
+            self.changed_config_paths = set()
+            self.metrics.observe('pyiaacsync_phase_duration_seconds', time.perf_counter() - start, phase='state_write')
 
     def read_state(self):
         """Read the state from the state file
         """
         was_state_read = False
-        if os.path.isfile(self.state_file):
-            with open(self.state_file, "r") as f:
-                self.state = yaml.safe_load(f)
-                was_state_read = True
+        start = time.perf_counter()
+        state = self.state_store.read()
+        self.metrics.observe('pyiaacsync_phase_duration_seconds', time.perf_counter() - start, phase='state_read')
+        if state is not None:
+            with self.state_lock:
+                self.state = state
+                self.changed_config_paths = set()
+            was_state_read = True
         else:
             raise FileNotFoundException(f"State file: {self.state_file} not found. Was init run?")
         return was_state_read
 
     def __delete_assets(self, **args):
-        """Delete all the assets that have been previously created, and update state file
+        """Steps to delete all the assets that have been previously created, and update state file
 
         Args:
             args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            TaskRun|Delay: Runs of the delete task, and waits for the deferred tasks
         """
-        if self.read_state():
-            try:
-                if self.state:
-                    state_config_paths = list(self.state.keys())
-                    for config_path in state_config_paths:
-                        try:
-                            asset_id = self.state[config_path].get('asset_id', None)
-                            if self.asset.delete(asset_id, **args):
-                                # Remove the asset tracking from the state since it is no longer being tracked in git
-                                del self.state[config_path]
-                        except Exception as e:
-                            # Execute callback if set by the user, otherwise raise this error to next parent
-                            # exception
-                            if self.continue_sync_on_error:
-                                self.write_state()
-                                self.callback_on_sync_error(e.__class__, str(e))
-                            else:
-                                raise
-            except Exception as e:
-                # Ensure that the current state is written back irrespective of exception that occurs
-                self.write_state()
-                # Re-raise the error
-                raise
+        with self.__track_cycle('delete'):
+            if self.read_state():
+                self.__forget_git_commit()
+                try:
+                    if self.state:
+                        state_config_paths = self.__state_config_paths()
+                        yield from self.__run_tasks(self.__delete_asset, self.__get_delete_task_graph(state_config_paths), 
+                                                    **args)
+                except BaseException as e:
+                    # Ensure that the current state is written back irrespective of exception that occurs (incl. cancellation)
+                    self.write_state()
+                    # Re-raise the error
+                    raise
                 
-            self.write_state()
+                self.write_state()
+
+    def __delete_asset(self, config_path, **args):
+        """Steps to delete the asset tracked in the state for a single config path
+
+        Args:
+            config_path (str): Path to the config file tracked in the state
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+        """
+        asset_id = self.state[config_path].get('asset_id', None)
+        kind = self.__get_state_kind(config_path)
+        if (yield AssetCall('delete', (asset_id,), args, kind)):
+            # Remove the asset tracking from the state since it is no longer being tracked in git
+            self.__remove_state(config_path)
+            self.metrics.count_config('deleted')
 
     def __validate_configs(self, **args):
-        """Simply validate ALL configurations that exist in config files in IAAC Sync folder
+        """Steps to validate ALL the config files in the IAAC Sync folder, on a pool of processes if set, skipping the config 
+        files which passed before as per the validation cache
+
+        Args:
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            ConfigFilesInvalidException: Any of the config files failed validation, with the report of all that failed
+
+        Yields:
+            AssetCall|Future: Calls to the asset class methods to execute, or the validations submitted to the pool to wait for
+
+        Returns:
+            ValidationReport: The report of the validation
+        """
+        with self.__track_cycle('validate'):
+            report = ValidationReport()
+            pending_configs = self.__find_configs_to_validate(report, args)
+            if self.validate_processes:
+                asset = self.asset if self.assets is None else self.assets
+                with ProcessPoolExecutor(self.validate_processes) as pool:
+                    futures = [(config_path, cache_key, pool.submit(validate_config_file, asset, self.iaac_sync_folder, 
+                                                                    config_path, config_bytes, args)) 
+                               for config_path, config_bytes, cache_key in pending_configs]
+                    for config_path, cache_key, future in futures:
+                        self.__finish_validation(report, config_path, cache_key, *(yield future))
+            else:
+                for config_path, config_bytes, cache_key in pending_configs:
+                    error = None
+                    try:
+                        yield from self.__validate_config(config_path, config_bytes, **args)
+                    except Exception as e:
+                        error = e
+                    self.__finish_validation(report, config_path, cache_key, None, None, error)
+        return self.__end_validation(report)
+
+    def __find_configs_to_validate(self, report, args):
+        """Walk the IAAC Sync folder and yield the config files to validate, skipping those which passed before as per the 
+        validation cache
+
+        Args:
+            report (ValidationReport): The report of the validation, counting the config files found
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            tuple: Path to the config file, its contents, and its key in the validation cache (if any)
+        """
+        self.validation_passed_keys = set()
+        cached_keys = set()
+        validator_version = None
+        if self.validation_cache:
+            cached_keys = self.validation_cache.read()
+            validator_version = get_validator_version(self.assets if self.assets is not None else {None: self.asset}, args)
+
+        for config_path in self.__find_config_files():
+            report.validated += 1
+            try:
+                config_bytes = self.__read_config_file(config_path)
+            except FileNotFoundException as e:
+                report.add_failure(config_path, e)
+                continue
+
+            cache_key = None
+            if self.validation_cache:
+                # The sub-folder of a config file can route it to another kind of asset
+                route = ""
+                if self.assets is not None:
+                    route = os.path.relpath(config_path, self.iaac_sync_folder).split(os.sep)[0]
+                cache_key = get_cache_key(validator_version, config_bytes, route)
+                if cache_key in cached_keys:
+                    report.cached += 1
+                    self.validation_passed_keys.add(cache_key)
+                    continue
+            yield config_path, config_bytes, cache_key
+
+    def __finish_validation(self, report, config_path, cache_key, kind, duration, error):
+        """Record the outcome of validating a config file
+
+        Args:
+            report (ValidationReport): The report of the validation
+            config_path (str): Path to the config file
+            cache_key (str): Key of the config file in the validation cache, if any
+            kind (str): The kind of asset, if validated in a process of the pool
+            duration (float): Seconds taken by `validate`, if called in a process of the pool
+            error (Exception|tuple): The error raised (or its class name and message) OR None, if the config file is valid
+        """
+        if duration is not None:
+            self.metrics.observe_call('validate', kind, duration, 'ok' if error is None else 'error')
+        if error is None:
+            if cache_key:
+                self.validation_passed_keys.add(cache_key)
+        else:
+            report.add_failure(config_path, error)
+
+    def __end_validation(self, report):
+        """Keep the config files which passed validation in the validation cache, and raise the failures if any
+
+        Args:
+            report (ValidationReport): The report of the validation
+
+        Raises:
+            ConfigFilesInvalidException: Any of the config files failed validation, with the report of all that failed
+
+        Returns:
+            ValidationReport: The report of the validation
+        """
+        if self.validation_cache:
+            self.validation_cache.write(self.validation_passed_keys)
+        self.validation_report = report
+        if not report.is_valid():
+            raise ConfigFilesInvalidException(report)
+        return report
+
+    def __validate_config(self, config_path, config_bytes, **args):
+        """Steps to validate the configuration in a single config file
 
         Args:
+            config_path (str): Path to the config file in the IAAC Sync folder
+            config_bytes (bytes): Contents of the config file
             args (dict): Any additional optional args which would get passed to the methods defined in the asset class
 
         Raises:
             ConfigFileInvalidSyntax: A config in the state file is not accurate
+            ConfigNotValidException: The asset class deems the config not valid
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
         """
+        # Read the config from file
+        config = ''
+        try:
+            config = self.__parse_config(config_bytes)
+        except Exception as e:
+            raise ConfigFileInvalidSyntax(f"Config file: {config_path} syntax invalid. Error: {e.__class__}, {e}")
 
-        # Loop through each config fie in the IAAC Sync folder
-        for dir_path, _, files in os.walk(self.iaac_sync_folder):
-            for f in files:
-                config_path = os.path.join(dir_path, f)
+        self.__pop_config_metadata(config)
 
-                # Read the config from file
-                config = ''
-                try:
-                    with open(config_path, "r") as f:
-                        config = yaml.safe_load(f)
-                except Exception as e:
-                    raise ConfigFileInvalidSyntax(f"Config file: {config_path} syntax invalid. Error: {e.__class__}, {e}")
-
-                # Validate whether the config is correctly provided before syncing
-                if config:
-                    self.asset.validate(config, **args)
+        # Validate whether the config is correctly provided before syncing
+        if config:
+            if not (yield AssetCall('validate', (config,), args, self.__get_config_kind(config_path, config))):
+                raise ConfigNotValidException(f"Config file: {config_path} is not valid")
                     
     def __sync_assets(self, **args):
-        """Sync assets by comparing the file hashes of config file and recreating file
+        """Steps to sync assets by comparing the file hashes of config file and recreating file
 
         Args:
             args (dict): Any additional optional args which would get passed to the methods defined in the asset class
@@ -191,167 +982,2280 @@ class IaacSync:
         Raises:
             FileNotFoundException: When the state file is not found
             ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
+
+        Yields:
+            AssetCall|TaskRun|Delay: Calls to the asset class methods to execute, runs of the sync tasks, and waits for the 
+                deferred tasks
         """
-        all_config_files = []
-        
         if self.read_state():
+            if self.git_changes:
+                yield from self.__sync_git_changes(**args)
+            else:
+                yield from self.__sync_all_configs(**args)
+        else:
+            raise FileNotFoundException(f"State file: {self.state_file} not found. Was file init or state file not copied")
+
+    def __sync_all_configs(self, **args):
+        """Steps to sync ALL the config files in the IAAC Sync folder with the state already read, and delete any assets 
+        whose config files no longer exist
+
+        Args:
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
+
+        Yields:
+            AssetCall|TaskRun|Delay: Calls to the asset class methods to execute, runs of the sync tasks, and waits for the 
+                deferred tasks
+        """
+        with self.__track_cycle('sync'):
+            self.__start_sync_cycle()
+
+            # Config paths tracked in the state whose config files have not been found (yet) by the walk
+            unseen_config_paths = set(self.__state_config_paths())
             try:
-                # Loop through each config fie in the IAAC Sync folder
-                for dir_path, _, files in os.walk(self.iaac_sync_folder):
-
-                    for f in files:
-                        
-                        # Work only with the conf files
-                        if any([f.endswith(ext) for ext in self.conf_file_extensions]):
-                            try:
-                                config_path = os.path.join(dir_path, f)
-
-                                # Keep track of ALL the asset config files
-                                all_config_files.append(config_path)
-
-                                # Calculate the hash for config which will be checked to see if they have changed
-                                config_hash = self.__calculate_hash(config_path)
-                                state_conf = self.state.get(config_path, None)
-                                
-                                # Get the hash of existing assets. If it doesn't exist then 
-                                state_hash = ''
-                                asset_id = ''
-                                if state_conf:
-                                    state_hash = state_conf['hash']
-                                    asset_id = state_conf['asset_id']
-                                else:
-                                    self.state[config_path] = {
-                                        'asset_id': '',
-                                        'hash': '',
-                                    }
-
-                                # Read the config from file
-                                config = ''
-                                try:
-                                    with open(config_path, "r") as f:
-                                        config = yaml.safe_load(f)
-                                except Exception as e:
-                                    self.write_state()
-                                    raise ConfigFileInvalidSyntax(f"Config file: {config_path} syntax invalid. Error: {e.__class__}, {e}")
-
-                                # Validate whether the config is correctly provided before syncing
-                                if config:
-                                    if self.asset.validate(config, **args):
-                                        
-                                        # Checking if the asset that currently exists matches the config in 'git'
-                                        is_asset_in_sync = True
-                                        if asset_id:
-                                            is_asset_in_sync = self.asset.check(asset_id, config, **args)
-
-                                        # If the spec file has changed OR is brand new, then re-create the asset (delete, then create)
-                                        if (not state_hash) or (state_hash != config_hash) or not is_asset_in_sync:
-
-                                            # Recreate the asset by first attempting to delete it
-                                            if asset_id:
-
-                                                # Check if there is an update function in the asset, if yes, then call it
-                                                if hasattr(self.asset, 'update') and callable(self.asset.update):
-                                                    if self.asset.update(asset_id, config, **args):
-                                                        # Call the update function, and ensure that the same asset ID is returned
-                                                        # if asset ID not returned then there was an error
-                                                        self.state[config_path]['hash'] = config_hash
-                                                        self.state[config_path]['asset_id'] = asset_id
-                                                    else:
-                                                        if self.delete_if_asset_not_updated:
-                                                            if self.asset.delete(asset_id, **args):
-                                                                # Asset ID deleted
-                                                                asset_id = ''
-                                                                if config_path in self.state:
-                                                                    # Update the state file that asset has been deleted
-                                                                    del self.state[config_path]
-                                                            else:
-                                                                raise AssetNotDeletedException(f"Asset with config in file {config_path} could not be deleted")
-                                                        else:
-                                                            raise AssetNotUpdatedException(f"Asset with config in file {config_path} could not be updated")
-
-                                                else:
-                                                    if self.asset.delete(asset_id, **args):
-                                                        # Asset ID deleted
-                                                        asset_id = ''
-                                                        if config_path in self.state:
-                                                            # Update the state file that asset has been deleted
-                                                            del self.state[config_path]
-                                                    else:
-                                                        raise AssetNotDeletedException(f"Asset with config in file {config_path} could not be deleted")
-                                            
-                                            # Try to create the asset again now, if it is deleted
-                                            if not asset_id:
-                                                asset_id = self.asset.create(config, **args)
-                                                if asset_id:
-                                                    if config_path not in self.state:
-                                                        self.state[config_path] = {}
-                                                    # Update the state file with the hash and the new asset ID created
-                                                    self.state[config_path]['hash'] = config_hash
-                                                    self.state[config_path]['asset_id'] = asset_id
-
-                                                if not asset_id:
-                                                    raise AssetNotCreatedException(f"Asset with config in file {config_path} could not be created")
-                            except Exception as e:
-                                # Execute callback if set by the user, otherwise raise this error to next parent
-                                # exception
-                                if self.continue_sync_on_error:
-                                    self.write_state()
-                                    self.callback_on_sync_error(e.__class__, str(e))
-                                else:
-                                    raise
+                # List the remote assets in bulk if the asset class can, so that only the assets which have changed are checked
+                yield from self.__list_inventories(**args)
 
-                
+                # Sync each config file in the IAAC Sync folder as it is found, tracking the config paths in the state not found
+                yield from self.__run_sync_tasks(self.__find_config_files(unseen_config_paths), **args)
+            
                 # Delete any assets which are not in the config spec (git)
                 if self.state:
 
-                    # Read all the config spec keys and loop through them
-                    state_config_paths = list(self.state.keys())
-                    for config_path in state_config_paths:
-                        try:
-                            # Check if any are not in the config specs
-                            if config_path not in all_config_files:
-                                
-                                asset_id = self.state[config_path].get('asset_id', None)
-                                if asset_id:
-                                    if self.asset.delete(asset_id, **args):
-                                        # Remove the asset tracking from the state since it is no longer being tracked in git
-                                        del self.state[config_path]
-                        except Exception as e:
-                            # Execute callback if set by the user, otherwise raise this error to next parent
-                            # exception
-                            if self.continue_sync_on_error:
-                                self.write_state()
-                                self.callback_on_sync_error(e.__class__, str(e))
-                            else:
-                                raise
+                    # Read all the config spec keys and check if any are not in the config specs
+                    state_config_paths = [config_path for config_path in self.__state_config_paths() 
+                                          if config_path in unseen_config_paths]
+                    state_config_paths = self.__hand_off_config_paths(state_config_paths)
+                    yield from self.__run_tasks(self.__delete_orphan_asset, self.__get_delete_task_graph(state_config_paths), 
+                                                **args)
 
-            except Exception as e:
+            except BaseException as e:
                 self.write_state()
                 raise
+            finally:
+                self.inventories = {}
 
             self.write_state()
 
-        else:
-            raise FileNotFoundException(f"State file: {self.state_file} not found. Was file init or state file not copied")
+    def __sync_changed_configs(self, changed_paths, **args):
+        """Steps to sync only the config files at (or under) the changed paths with the state already read, and delete any 
+        assets whose config files have been removed
+
+        Args:
+            changed_paths (set): Paths of the files and folders in the IAAC Sync folder that have changed
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
+
+        Yields:
+            TaskRun|Delay: Runs of the sync tasks, and waits for the deferred tasks
+        """
+        with self.__track_cycle('sync_changed'):
+            config_paths, state_config_paths = self.__find_changed_config_files(changed_paths)
+            try:
+                yield from self.__run_sync_tasks(config_paths, is_partial=True, **args)
+                yield from self.__run_tasks(self.__delete_orphan_asset, self.__get_delete_task_graph(state_config_paths), 
+                                            **args)
+            except BaseException as e:
+                self.write_state()
+                raise
+
+            self.write_state()
 
-    def __calculate_hash(self, file_path):
-        """Function calculates SHA256 hash for a file path
+    def __sync_git_changes(self, **args):
+        """Steps to sync only the config files changed in git since the commit last synced, or ALL the config files if the 
+        changes cannot be told from git
 
         Args:
-            file_path (str): Path to the file found for which hash must be calculated
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
 
         Raises:
-            FileNotFoundException: Config file not found
+            ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
 
-        Returns:
-            str: Readable SHA256 hash OR None, if file not found 
+        Yields:
+            AssetCall|TaskRun|Delay: Calls to the asset class methods to execute, runs of the sync tasks, and waits for the 
+                deferred tasks
         """
-        readable_hash = ""
-        if os.path.isfile(file_path):
-            with open(file_path,"rb") as f:
-                bytes = f.read()
-                readable_hash = hashlib.sha256(bytes).hexdigest()
-        else:
-            raise FileNotFoundException(f"File: {file_path} not found")
+        changed_paths = self.__start_git_sync()
+        try:
+            if changed_paths is None:
+                yield from self.__sync_all_configs(**args)
+            else:
+                yield from self.__sync_changed_configs(changed_paths, **args)
+        except BaseException as e:
+            self.__finish_git_sync(is_failed=True)
+            raise
+        self.__finish_git_sync()
+
+    def __plan_assets(self, **args):
+        """Steps to plan the actions to sync ALL the config files in the IAAC Sync folder with the state, and to delete any 
+        assets whose config files no longer exist
 
-        return readable_hash
\ No newline at end of file
+        Args:
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            FileNotFoundException: When the state file is not found
+            ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
+
+        Yields:
+            TaskRun|Delay: Runs of the plan task, and waits for the deferred tasks
+
+        Returns:
+            Plan: The plan
+        """
+        with self.__track_cycle('plan'):
+            self.__start_plan()
+            unseen_config_paths = set(self.__state_config_paths())
+            try:
+                yield from self.__run_tasks(self.__plan_config, self.__find_config_files(unseen_config_paths), **args)
+                return self.__get_plan(unseen_config_paths)
+            finally:
+                self.is_planning = False
+
+    def __start_plan(self):
+        """Read the state to plan against, and find the assets due for a drift check. Nothing found is recorded in the state, 
+        which is never written while planning
+        """
+        self.read_state()
+        self.is_planning = True
+        self.plan_actions = {}
+        self.shard_states = None
+        self.__migrate_hashes()
+        records = [(config_path, self.state[config_path]) for config_path in self.__state_config_paths()]
+        self.due_checks, _ = self.check_scheduler.schedule(records, time.time())
+
+    def __get_plan(self, unseen_config_paths):
+        """Collect the actions planned for the config files, followed by the deletion of the assets whose config files no 
+        longer exist
+
+        Args:
+            unseen_config_paths (set): Config paths tracked in the state whose config files were not found in the IAAC Sync 
+                folder
+
+        Returns:
+            Plan: The plan
+        """
+        actions = [self.plan_actions[config_path] for config_path in sorted(self.plan_actions)]
+
+        state_config_paths = [config_path for config_path in self.__state_config_paths() if config_path in unseen_config_paths]
+        for config_path in self.__hand_off_config_paths(state_config_paths):
+            state_conf = self.state[config_path]
+            if state_conf.get('asset_id'):
+                actions.append(PlanAction(DELETE_ACTION, self.__get_relative_config_path(config_path), 
+                                          self.__get_state_kind(config_path), state_conf.get('asset_id'), 
+                                          state_conf.get('hash') or None))
+        return Plan(actions, hash_mode=self.hash_mode)
+
+    def __write_plan(self, plan, plan_file):
+        """Write a plan to the plan file, if any
+
+        Args:
+            plan (Plan): The plan
+            plan_file (str): Path to the plan file, if any
+
+        Returns:
+            Plan: The plan
+        """
+        if plan_file:
+            plan.write(plan_file)
+        return plan
+
+    def __read_plan(self, plan):
+        """Read a plan from the plan file, unless already given
+
+        Args:
+            plan (Plan|str): The plan, or the path to the plan file
+
+        Raises:
+            PlanInvalidException: The plan file cannot be read
+
+        Returns:
+            Plan: The plan
+        """
+        if isinstance(plan, Plan):
+            return plan
+        return Plan.read(plan)
+
+    def __apply_plan(self, plan, **args):
+        """Steps to apply the actions of a plan, and update the state file
+
+        Args:
+            plan (Plan): The plan
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            FileNotFoundException: When the state file is not found
+            PlanInvalidException: The plan was made in another hash mode
+            PlanStaleException: The assets in the state have changed since the plan was made
+
+        Yields:
+            TaskRun|Delay: Runs of the apply task, and waits for the deferred tasks
+        """
+        with self.__track_cycle('apply'):
+            sync_config_paths, delete_config_paths = self.__start_apply(plan)
+            try:
+                yield from self.__run_tasks(self.__apply_action, sync_config_paths, **args)
+                yield from self.__run_tasks(self.__apply_action, delete_config_paths, **args)
+            except BaseException as e:
+                self.write_state()
+                raise
+
+            self.write_state()
+
+    def __start_apply(self, plan):
+        """Read the state, and check that the assets of the configs with planned changes are still as they were planned against
+
+        Args:
+            plan (Plan): The plan
+
+        Raises:
+            FileNotFoundException: When the state file is not found
+            PlanInvalidException: The plan was made in another hash mode
+            PlanStaleException: The assets in the state have changed since the plan was made
+
+        Returns:
+            tuple: The graph (or list) of config paths whose assets are to be created or updated, and the graph (or list) of 
+                config paths whose assets are to be deleted
+        """
+        if plan.hash_mode != self.hash_mode:
+            raise PlanInvalidException(f"Plan made at {plan.created} hashed the configs in hash mode: {plan.hash_mode}, not "
+                                       f"{self.hash_mode}")
+        self.read_state()
+        self.__forget_git_commit()
+        self.__migrate_hashes()
+        self.plan_actions = {}
+        self.shard_states = None
+        stale_config_paths = []
+        for action in plan.changes():
+            config_path = os.path.join(self.iaac_sync_folder, *action.config_path.split('/'))
+            state_conf = self.state.get(config_path, None)
+            if not state_conf and self.hash_ring:
+                state_conf = self.__take_over_state_record(config_path)
+            state_asset_id = state_conf.get('asset_id') if state_conf else None
+            state_hash = state_conf.get('hash') if state_conf else None
+            if (state_asset_id or None) != (action.asset_id or None) or (state_hash or None) != (action.state_hash or None):
+                stale_config_paths.append(action.config_path)
+            self.plan_actions[config_path] = action
+
+        if stale_config_paths:
+            raise PlanStaleException(f"Plan made at {plan.created} is stale as the assets with configs in files "
+                                     f"{', '.join(stale_config_paths)} have changed since. Plan again")
+
+        dependencies = dict([(config_path, self.__get_config_dependencies({'depends_on': action.depends_on})) 
+                             for config_path, action in self.plan_actions.items() if action.action != DELETE_ACTION])
+        delete_config_paths = [config_path for config_path, action in self.plan_actions.items() 
+                               if action.action == DELETE_ACTION]
+        return self.__get_task_graph(dependencies), self.__get_delete_task_graph(delete_config_paths)
+
+    @contextmanager
+    def __track_cycle(self, action):
+        """Collect the metrics of a sync cycle, and profile it if a profiler is set
+
+        Args:
+            action (str): The action of the cycle e.g. `sync`, `delete`, `plan`, `apply`
+        """
+        with self.metrics.cycle(action):
+            with self.profiler.cycle(action) if self.profiler else nullcontext():
+                yield
+
+    def __state_config_paths(self):
+        """Get the config paths of all the assets tracked in the state
+
+        Returns:
+            list: Config paths in the state (excluding the sync metadata)
+        """
+        return [config_path for config_path in list(self.state.keys()) if config_path != STATE_METADATA_KEY]
+
+    def __start_sync_cycle(self):
+        """Count the sync in the state metadata, and determine whether this sync must re-hash all config files
+        """
+        self.shard_states = None
+        self.__forget_git_commit()
+        self.__migrate_hashes()
+        with self.state_lock:
+            sync_cycle = self.state.get(STATE_METADATA_KEY, {}).get('sync_cycle', 0) + 1
+            self.__update_state(STATE_METADATA_KEY, sync_cycle=sync_cycle)
+            self.full_rehash = bool(self.full_rehash_interval) and sync_cycle % self.full_rehash_interval == 0
+
+            self.__schedule_checks()
+
+    def __schedule_checks(self):
+        """Find the assets due for a drift check in this sync, recording a last checked time for the assets never checked
+
+        Returns:
+            set: Config paths of the assets due for a drift check
+        """
+        with self.state_lock:
+            records = [(config_path, self.state[config_path]) for config_path in self.__state_config_paths()]
+            self.due_checks, last_checked_times = self.check_scheduler.schedule(records, time.time())
+            for config_path, last_checked in last_checked_times.items():
+                self.__update_state(config_path, last_checked=last_checked)
+        return self.due_checks
+
+    def __start_git_sync(self):
+        """Find the config files changed in git since the commit last synced, and keep the commit checked out in the state as 
+        the commit synced (or none if the folder has uncommitted changes)
+
+        Returns:
+            set: Paths to the config files changed, added or removed since the commit last synced OR None, if ALL the config 
+                files must be synced
+        """
+        start = time.perf_counter()
+        if self.git_work_tree is None:
+            try:
+                self.git_work_tree = GitWorkTree(self.iaac_sync_folder)
+            except GitNotAvailable:
+                self.git_work_tree = False
+        if not self.git_work_tree:
+            return None
+
+        metadata = self.state.get(STATE_METADATA_KEY, {})
+        last_commit = metadata.get('git_commit')
+        shards = self.hash_ring.shards if self.hash_ring else None
+        head = self.git_work_tree.get_head()
+        if head and self.git_work_tree.is_dirty():
+            head = None
+
+        changed_paths = None
+        sync_cycle = metadata.get('sync_cycle', 0) + 1
+        is_full_sync_due = bool(self.full_rehash_interval) and sync_cycle % self.full_rehash_interval == 0
+        if head and last_commit and not is_full_sync_due and metadata.get('git_shards') == shards:
+            if self.git_work_tree.is_ancestor(last_commit, head):
+                changed_paths = set([path for path in self.git_work_tree.get_changed_paths(last_commit, head) 
+                                     if self.__is_config_file(path)])
+
+        # Count the syncs of the changed configs too, so that the full syncs are made every `full_rehash_interval` syncs. The 
+        # configs git reports as unchanged are synced too if their assets are due for a drift check
+        if changed_paths is not None:
+            self.__update_state(STATE_METADATA_KEY, sync_cycle=sync_cycle)
+            changed_paths.update(self.__schedule_checks())
+        self.__update_state(STATE_METADATA_KEY, git_commit=head, git_shards=shards)
+        self.is_syncing_git_commit = True
+        self.git_commit_on_error = last_commit if head else None
+        self.metrics.observe('pyiaacsync_phase_duration_seconds', time.perf_counter() - start, phase='git_diff')
+        return changed_paths
+
+    def __finish_git_sync(self, is_failed=False):
+        """Finish the sync of the config files changed in git. If it failed, the commit last synced is kept in the state so that
+        the changes since that commit are synced again by the next sync
+
+        Args:
+            is_failed (bool, optional): Whether the sync failed. Defaults to False.
+        """
+        if self.is_syncing_git_commit and is_failed:
+            self.__update_state(STATE_METADATA_KEY, git_commit=self.git_commit_on_error)
+            self.write_state()
+        self.is_syncing_git_commit = False
+
+    def __forget_git_commit(self):
+        """Forget the commit last synced when the assets are changed other than by syncing the changes in git, so that the next 
+        sync via `git_changes` syncs ALL the config files
+        """
+        if not self.is_syncing_git_commit and self.state.get(STATE_METADATA_KEY, {}).get('git_commit'):
+            self.__update_state(STATE_METADATA_KEY, git_commit=None)
+
+    def __migrate_hashes(self):
+        """Migrate the hashes kept in the state to the hash mode of the sync, if they were calculated in another mode. The hash 
+        of each asset whose config file is unchanged since it was synced (i.e. still matches its hash in the old mode) is 
+        replaced by its hash in the new mode, so that switching modes does not update the assets
+        """
+        state_hash_mode = self.state.get(STATE_METADATA_KEY, {}).get('hash_mode') or RAW_HASH_MODE
+        if state_hash_mode == self.hash_mode:
+            return
+
+        for config_path in self.__state_config_paths():
+            state_hash = self.state[config_path].get('hash')
+            if not state_hash:
+                continue
+            try:
+                config_bytes = self.__read_config_file(config_path)
+                config = self.__parse_config(config_bytes)
+            except Exception as e:
+                # The config files which have been removed or are invalid are left to the sync
+                continue
+            self.__pop_config_metadata(config)
+            if self.__calculate_hash(config_bytes, config, state_hash_mode) == state_hash:
+                self.__update_state(config_path, hash=self.__calculate_hash(config_bytes, config))
+
+        self.__update_state(STATE_METADATA_KEY, hash_mode=None if self.hash_mode == RAW_HASH_MODE else self.hash_mode)
+
+    def __update_state(self, config_path, **fields):
+        """Update fields of the asset tracked in the state for a config path, tracking it in the state if not already
+
+        Args:
+            config_path (str): Path to the config file
+            fields (dict): Fields to set e.g. `asset_id`, `hash`
+        """
+        with self.state_lock:
+            record = self.state.get(config_path)
+            if record is None:
+                record = StateRecord()
+                config_path = sys.intern(config_path)
+                self.state[config_path] = record
+            record.update(fields)
+            self.changed_config_paths.add(config_path)
+
+    def __remove_state(self, config_path):
+        """Remove the asset tracking from the state for a config path
+
+        Args:
+            config_path (str): Path to the config file
+        """
+        with self.state_lock:
+            self.state.pop(config_path, None)
+            self.changed_config_paths.add(config_path)
+
+    def __find_changed_config_files(self, changed_paths):
+        """Find the config files to sync and the config paths in the state whose assets must be deleted, given the changed paths
+
+        Args:
+            changed_paths (set): Paths of the files and folders in the IAAC Sync folder that have changed
+
+        Returns:
+            tuple: Sorted list of config files to sync, and sorted list of config paths in the state whose config files no longer 
+                exist
+        """
+        self.shard_states = None
+        self.__forget_git_commit()
+        self.__migrate_hashes()
+        config_paths = set()
+        state_config_paths = set()
+        for path in changed_paths:
+            if os.path.isfile(path):
+                if self.__is_config_file(path) and self.__is_own_config(path):
+                    config_paths.add(path)
+            elif os.path.isdir(path):
+                config_paths.update(self.__find_config_files(folder=path))
+            elif path in self.state:
+                state_config_paths.add(path)
+            else:
+                # A folder has been removed, so look for the config paths under it
+                prefix = path.rstrip(os.sep) + os.sep
+                state_config_paths.update([config_path for config_path in self.__state_config_paths() 
+                                           if config_path.startswith(prefix) and not os.path.isfile(config_path)])
+
+        state_config_paths.discard(STATE_METADATA_KEY)
+        return sorted(config_paths), sorted(state_config_paths)
+
+    def __is_own_config(self, config_path):
+        """Check whether a config belongs to this shard, if the config paths are sharded
+
+        Args:
+            config_path (str): Path to the config file
+
+        Returns:
+            bool: Whether the config is synced by this instance
+        """
+        if not self.hash_ring:
+            return True
+        return self.__get_config_shard(config_path) == self.shard
+
+    def __get_config_shard(self, config_path):
+        """Get the shard that a config belongs to, by the config path relative to the IAAC Sync folder so that all the workers
+        agree wherever the IAAC Sync folder is checked out
+
+        Args:
+            config_path (str): Path to the config file
+
+        Returns:
+            str: Name of the shard
+        """
+        return self.hash_ring.get_shard(self.__get_relative_config_path(config_path))
+
+    def __get_relative_config_path(self, config_path):
+        """Get the path of a config file relative to the IAAC Sync folder, in the same form wherever the folder is checked out
+
+        Args:
+            config_path (str): Path to the config file
+
+        Returns:
+            str: Path relative to the IAAC Sync folder, separated by `/`
+        """
+        return os.path.relpath(config_path, self.iaac_sync_folder).replace(os.sep, '/')
+
+    def __get_shard_states(self):
+        """Read the partitions of the state kept by the other shards, once per sync
+
+        Returns:
+            dict: The state of each of the other shards
+        """
+        with self.state_lock:
+            if self.shard_states is None:
+                self.shard_states = {}
+                for shard in find_shard_state_files(self.unsharded_state_store.state_file):
+                    if shard == self.shard:
+                        continue
+                    state_store = self.unsharded_state_store.for_shard(shard)
+                    try:
+                        self.shard_states[shard] = state_store.read() or {}
+                    finally:
+                        state_store.close()
+            return self.shard_states
+
+    def __take_over_state_record(self, config_path):
+        """Take over the asset tracked by another shard for a config which now belongs to this shard (e.g. after a shard was 
+        added), so that the asset is not created again
+
+        Args:
+            config_path (str): Path to the config file
+
+        Returns:
+            StateRecord: The record of the asset taken over OR None, if no other shard tracks an asset for the config
+        """
+        for shard_state in self.__get_shard_states().values():
+            record = shard_state.get(config_path)
+            if record and record.get('asset_id'):
+                fields = record.to_dict()
+
+                # The stat of the config file is only meaningful on the worker which recorded it
+                fields.pop('stat', None)
+                self.__update_state(config_path, **fields)
+                return self.state[config_path]
+        return None
+
+    def __hand_off_config_paths(self, config_paths):
+        """Hand off the assets tracked in the state whose config files still exist, but now belong to another shard: they are 
+        no longer tracked once the other shard has taken them over, and are never deleted in the meantime
+
+        Args:
+            config_paths (list): Config paths tracked in the state, whose config files are not synced by this shard
+
+        Returns:
+            list: Config paths whose assets must be deleted, as their config files no longer exist (or the other shard has 
+                created its own asset)
+        """
+        if not self.hash_ring:
+            return config_paths
+
+        orphan_config_paths = []
+        for config_path in config_paths:
+            if not os.path.isfile(config_path) or not self.__is_config_file(config_path):
+                orphan_config_paths.append(config_path)
+                continue
+
+            shard_state = self.__get_shard_states().get(self.__get_config_shard(config_path), {})
+            record = shard_state.get(config_path)
+            if not record or not record.get('asset_id'):
+                # Keep the asset until the other shard has taken it over
+                continue
+            if record.get('asset_id') == self.state[config_path].get('asset_id'):
+                self.__remove_state(config_path)
+            else:
+                orphan_config_paths.append(config_path)
+        return orphan_config_paths
+
+    def __is_config_file(self, file_path):
+        """Check whether a file is a config file, as per the `conf_file_extensions`
+
+        Args:
+            file_path (str): Path to the file
+
+        Returns:
+            bool: Whether the file is a config file
+        """
+        return any([file_path.endswith(ext) for ext in self.conf_file_extensions])
+
+    def __find_config_files(self, unseen_config_paths=None, folder=None):
+        """Walk the IAAC Sync folder and yield the config files to sync, as they are found
+
+        Args:
+            unseen_config_paths (set, optional): Config paths tracked in the state, from which each config file found is 
+                removed so that only the config paths whose config files no longer exist are left once the walk is done. 
+                Defaults to None.
+            folder (str, optional): Folder within the IAAC Sync folder to walk. Defaults to the IAAC Sync folder.
+
+        Yields:
+            str: Path to each config file in the IAAC Sync folder
+        """
+        # Time spent walking the folder, excluding the time taken by the caller between the config files yielded
+        walk_time = 0
+        start = time.perf_counter()
+
+        # Loop through each config fie in the IAAC Sync folder
+        for config_path in walk_files(folder or self.iaac_sync_folder):
+            # Work only with the conf files
+            if not self.__is_config_file(config_path) or not self.__is_own_config(config_path):
+                continue
+            if unseen_config_paths is not None:
+                unseen_config_paths.discard(config_path)
+            walk_time += time.perf_counter() - start
+            yield config_path
+            start = time.perf_counter()
+
+        walk_time += time.perf_counter() - start
+        self.metrics.observe('pyiaacsync_phase_duration_seconds', walk_time, phase='walk')
+
+    def __run_sync_tasks(self, config_paths, is_partial=False, **args):
+        """Steps to sync each of the config files as soon as it is found, in dependency order: the configs which depend on 
+        other configs are held back only until the configs they depend on have been synced
+
+        Args:
+            config_paths (iterable): Config paths to sync
+            is_partial (bool, optional): Whether only some of the configs are synced, in which case the dependencies tracked in 
+                the state for the other configs are also checked for cycles. Defaults to False.
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            DependencyCycleException: The configs depend on each other in a cycle
+
+        Yields:
+            TaskRun|Delay: Runs of the sync task, and waits for the deferred tasks
+        """
+        task_graph = TaskGraph()
+        yield from self.__run_tasks(self.__sync_config, self.__add_dependent_configs(config_paths, task_graph, is_partial), 
+                                    task_graph, **args)
+
+    def __run_tasks(self, task, config_paths, task_graph=None, **args):
+        """Steps to run a task for each of the config paths, and then retry the tasks deferred after a failed asset call once 
+        their backoff has passed
+
+        Args:
+            task (func): Steps of format `def task(config_path, **args)` to run for each config path
+            config_paths (iterable|TaskGraph): Config paths to run the task for, or a graph of the config paths to run the task 
+                for in dependency order
+            task_graph (TaskGraph, optional): Graph that the config paths are added to as they are found, to run the task for 
+                the configs held back in dependency order. Defaults to None.
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            TaskRun|Delay: Runs of the task, and waits for the deferred tasks
+        """
+        self.deferred_tasks = {}
+        self.task_attempts = {}
+        self.task_graph = config_paths if isinstance(config_paths, TaskGraph) else task_graph
+        try:
+            yield TaskRun(task, config_paths, args)
+            while self.deferred_tasks:
+                yield Delay(self.__get_deferred_tasks_delay())
+                yield TaskRun(task, self.__pop_deferred_tasks(), args)
+        finally:
+            self.task_graph = None
+
+    def __run_tasks_once(self, task, config_paths, **args):
+        """Run a task for each of the config paths, either one at a time or on a bounded pool of `max_workers` threads, with at 
+        most PENDING_TASKS_PER_WORKER tasks per thread submitted at once
+
+        Args:
+            task (func): Steps of format `def task(config_path, **args)` to run for each config path
+            config_paths (iterable): Config paths to run the task for
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+        """
+        if self.__is_batching():
+            self.__drive(self.__batch_tasks(task, config_paths, **args))
+            return
+
+        if not self.max_workers:
+            for config_path in self.__iter_config_paths(config_paths):
+                if config_path is None:
+                    break
+                self.__run_task(task, config_path, **args)
+            return
+
+        max_pending_tasks = self.max_workers * PENDING_TASKS_PER_WORKER
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = set()
+            try:
+                for config_path in self.__iter_config_paths(config_paths):
+                    if config_path is None:
+                        if not futures:
+                            break
+                        # Wait for a task to finish, which may make the tasks depending on it ready
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                        continue
+                    futures.add(executor.submit(self.__run_task, task, config_path, **args))
+
+                    # Wait for a task to finish before picking up the next config, so that the configs found are not all 
+                    # queued up at once
+                    if len(futures) >= max_pending_tasks:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                # Stop picking up any more configs, and let the running ones finish before raising the error
+                for future in futures:
+                    future.cancel()
+                raise
+
+    async def __async_run_tasks_once(self, task, config_paths, **args):
+        """Run a task for each of the config paths via the event loop, with at most `max_concurrency` tasks in flight at once
+
+        Args:
+            task (func): Steps of format `def task(config_path, **args)` to run for each config path
+            config_paths (iterable): Config paths to run the task for
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+        """
+        if self.__is_batching():
+            await self.__async_drive(self.__batch_tasks(task, config_paths, **args))
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency or 1)
+        pending = set()
+
+        async def run(config_path):
+            try:
+                await self.__async_run_task(task, config_path, **args)
+            finally:
+                semaphore.release()
+
+        try:
+            for config_path in self.__iter_config_paths(config_paths):
+                if config_path is None:
+                    if not pending:
+                        break
+                    # Wait for a task to finish, which may make the tasks depending on it ready
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for t in done:
+                        t.result()
+                    continue
+
+                # Wait for a slot before picking up the next config, so only `max_concurrency` tasks are created at once
+                await semaphore.acquire()
+                pending.add(asyncio.ensure_future(run(config_path)))
+
+                # Surface any errors from the tasks which have already finished
+                done = set([t for t in pending if t.done()])
+                pending -= done
+                for t in done:
+                    t.result()
+
+            if pending:
+                await asyncio.gather(*pending)
+        except BaseException:
+            # Stop all the tasks still in flight before raising the error
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+
+    def __run_task(self, task, config_path, **args):
+        """Run a task for a single config path, handling errors as per `continue_sync_on_error`
+
+        Args:
+            task (func): Steps of format `def task(config_path, **args)` to run for the config path
+            config_path (str): Path to the config file
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+        """
+        try:
+            self.__drive(task(config_path, **args), defer_retries=True, config_path=config_path)
+        except Exception as e:
+            self.__handle_task_error(e, config_path)
+            self.__finish_task(config_path, False)
+        else:
+            self.__finish_task(config_path, True)
+
+    async def __async_run_task(self, task, config_path, **args):
+        """Run a task for a single config path via the event loop, handling errors as per `continue_sync_on_error`
+
+        Args:
+            task (func): Steps of format `def task(config_path, **args)` to run for the config path
+            config_path (str): Path to the config file
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+        """
+        try:
+            await self.__async_drive(task(config_path, **args), defer_retries=True, config_path=config_path)
+        except Exception as e:
+            self.__handle_task_error(e, config_path)
+            self.__finish_task(config_path, False)
+        else:
+            self.__finish_task(config_path, True)
+
+    def __iter_config_paths(self, config_paths):
+        """Iterate over the config paths to run a task for, followed by the config paths in the graph of tasks being run in 
+        dependency order as they become ready
+
+        Args:
+            config_paths (iterable|TaskGraph): Config paths to run the task for, or the graph of tasks
+
+        Yields:
+            str: Config path to run the task for OR None, if the remaining tasks in the graph are waiting on the tasks still 
+                running (or deferred)
+        """
+        if not isinstance(config_paths, TaskGraph):
+            yield from config_paths
+
+        while self.task_graph and not self.task_graph.is_finished():
+            ready = self.task_graph.pop_ready()
+            if ready:
+                yield from ready
+            else:
+                yield None
+
+    def __finish_task(self, config_path, is_completed):
+        """Mark the task for a config path as finished in the graph of tasks being run in dependency order, if any. If the 
+        task failed, the tasks for the configs depending on it are skipped, and their errors handled as per 
+        `continue_sync_on_error`
+
+        Args:
+            config_path (str): Path to the config file the task was run for
+            is_completed (bool): Whether the task completed without errors
+        """
+        if not self.task_graph:
+            return
+        if is_completed:
+            self.task_graph.finish(config_path)
+        elif config_path not in self.deferred_tasks:
+            self.__skip_dependent_tasks(self.task_graph, config_path)
+
+    def __skip_dependent_tasks(self, task_graph, config_path):
+        """Skip the tasks for the configs which depend on a config whose task failed, handling their errors as per 
+        `continue_sync_on_error`
+
+        Args:
+            task_graph (TaskGraph): The graph of tasks
+            config_path (str): Path to the config file whose task failed
+        """
+        for skipped_config_path in task_graph.fail(config_path):
+            self.__skip_task(skipped_config_path, config_path)
+
+    def __skip_task(self, config_path, failed_config_path):
+        """Skip the task for a config which depends on a config whose task failed, handling its error as per 
+        `continue_sync_on_error`
+
+        Args:
+            config_path (str): Path to the config file whose task is skipped
+            failed_config_path (str): Path to the config file whose task failed
+        """
+        e = AssetDependencyFailedException(f"Asset with config in file {config_path} skipped as the asset with config in "
+                                           f"file {failed_config_path} failed")
+        self.__handle_task_error(e, config_path)
+
+    def __handle_task_error(self, e, config_path):
+        """Defer the task to be retried if an asset call failed and its retry policy allows another attempt. Otherwise, execute 
+        callback if set by the user, or raise this error to next parent exception
+
+        Args:
+            e (Exception): Error raised when running a task for a config path
+            config_path (str): Path to the config file the task was run for
+        """
+        if isinstance(e, AssetCallDeferred):
+            if self.__defer_task(config_path, e):
+                return
+            e = e.error
+
+        self.metrics.count_config('errored')
+
+        # Keep the commit last synced in the state, so that the changes since then are synced again by the next sync
+        if self.is_syncing_git_commit:
+            self.__update_state(STATE_METADATA_KEY, git_commit=self.git_commit_on_error)
+
+        # The state is written once the cycle has finished (or failed), rather than after each error
+        if self.continue_sync_on_error:
+            with self.state_lock:
+                self.callback_on_sync_error(e.__class__, str(e))
+        else:
+            raise e
+
+    def __defer_task(self, config_path, deferred):
+        """Schedule the task for a config path to be retried at the end of the sync, after the backoff of the retry policy. A 
+        throttled call is not retried before the rate limiter of the method would let a call through, and is retried as soon 
+        as it would if the call is only retried as it was throttled
+
+        Args:
+            config_path (str): Path to the config file the task was run for
+            deferred (AssetCallDeferred): The failed asset call
+
+        Returns:
+            bool: Whether the task was deferred, or False if all the attempts allowed by the retry policy have been made
+        """
+        retry_policy = self.__get_retry_policy(deferred.operation, deferred.error)
+        with self.state_lock:
+            attempt = self.task_attempts.get(config_path, 1)
+            if attempt >= retry_policy.max_attempts:
+                return False
+            delay = retry_policy.delay(attempt)
+            rate_limiter = self.__get_operation_setting(self.rate_limiters, deferred.operation)
+            if rate_limiter and isinstance(deferred.error, self.throttling_exceptions):
+                # The rate limiter has slowed down the calls, so its wait replaces the backoff of the throttled calls
+                if retry_policy is self.throttled_retry_policy:
+                    delay = 0
+                delay = max(delay, rate_limiter.get_wait())
+            self.task_attempts[config_path] = attempt + 1
+            self.deferred_tasks[config_path] = time.monotonic() + delay
+        return True
+
+    def __get_deferred_tasks_delay(self):
+        """Get the seconds to wait until the first deferred task is due to be retried
+
+        Returns:
+            float: Seconds to wait
+        """
+        return max(0, min(self.deferred_tasks.values()) - time.monotonic())
+
+    def __pop_deferred_tasks(self):
+        """Remove the deferred tasks which are due to be retried
+
+        Returns:
+            list: Config paths to retry the task for
+        """
+        now = time.monotonic()
+        config_paths = [config_path for config_path, retry_at in self.deferred_tasks.items() if retry_at <= now]
+        for config_path in config_paths:
+            del self.deferred_tasks[config_path]
+        return config_paths
+
+    def __is_retryable(self, operation, error):
+        """Check whether a failed asset call is retried as per the retry policy of the method, or as it was throttled
+
+        Args:
+            operation (str): Name of the method of the asset class e.g. `create`
+            error (Exception): The error raised by the asset call
+
+        Returns:
+            bool: Whether the task which made the call should be deferred to be retried
+        """
+        return self.__get_retry_policy(operation, error) is not None
+
+    def __get_retry_policy(self, operation, error):
+        """Get the retry policy which retries a failed asset call: the retry policy of the method if it retries the error, or 
+        else the retry policy for throttled calls if the provider throttled the call and the method has a rate limit or a retry 
+        policy, so that the calls are not retried unless retries (or rate limits) have been set up
+
+        Args:
+            operation (str): Name of the method of the asset class e.g. `create`
+            error (Exception): The error raised by the asset call
+
+        Returns:
+            RetryPolicy: The retry policy OR None, if the call is not retried
+        """
+        retry_policy = self.__get_operation_setting(self.retry_policies, operation)
+        if retry_policy and retry_policy.is_retryable(error):
+            return retry_policy
+        is_limited = retry_policy or self.__get_operation_setting(self.rate_limiters, operation)
+        if is_limited and self.throttled_retry_policy.is_retryable(error):
+            return self.throttled_retry_policy
+        return None
+
+    def __drive(self, steps, defer_retries=False, config_path=None):
+        """Execute the asset calls yielded by the steps of a task (or a cycle) one after another, sending back each result
+
+        Args:
+            steps (generator): Steps of a task which yield `AssetCall`, or a list of `AssetCall` to execute together (in which case
+                a list of results is sent back, with an exception in place of the result for each call that failed). The steps 
+                of a cycle also yield `TaskRun` to run on the pool of threads, `Delay` to sleep, or a `Future` to wait for
+            defer_retries (bool, optional): Whether to stop the steps if an asset call fails and its retry policy retries the 
+                error, so that the task can be retried later. Defaults to False.
+            config_path (str, optional): Path to the config file the task is run for, to trace the asset calls when profiling. 
+                Defaults to None.
+
+        Returns:
+            object: Value returned by the steps, if any
+
+        Raises:
+            AssetCallDeferred: An asset call failed and is to be retried, if `defer_retries` is set
+        """
+        result = None
+        error = None
+        while True:
+            try:
+                call = steps.throw(error) if error else steps.send(result)
+            except StopIteration as e:
+                return e.value
+
+            result = None
+            error = None
+            try:
+                if isinstance(call, list):
+                    result = self.__call_assets(call)
+                elif isinstance(call, TaskRun):
+                    self.__run_tasks_once(call.task, call.config_paths, **call.args)
+                elif isinstance(call, Delay):
+                    time.sleep(call.seconds)
+                elif isinstance(call, Future):
+                    result = call.result()
+                else:
+                    if self.profiler and config_path:
+                        call = call._replace(config_path=config_path)
+                    result = self.__call_asset(call)
+            except BaseException as e:
+                if defer_retries and isinstance(e, Exception) and self.__is_retryable(call.operation, e):
+                    steps.close()
+                    raise AssetCallDeferred(call.operation, e)
+                # Hand any error (incl. an interrupt) back to the steps, so that they can write back the state before it is raised
+                error = e
+
+    async def __async_drive(self, steps, defer_retries=False, config_path=None):
+        """Execute (or await) the asset calls yielded by the steps of a task (or a cycle) one after another, sending back each 
+        result
+
+        Args:
+            steps (generator): Steps of a task which yield `AssetCall`, or a list of `AssetCall` to execute together (in which case
+                a list of results is sent back, with an exception in place of the result for each call that failed). The steps 
+                of a cycle also yield `TaskRun` to run on the event loop, `Delay` to sleep, or a `Future` to await
+            defer_retries (bool, optional): Whether to stop the steps if an asset call fails and its retry policy retries the 
+                error, so that the task can be retried later. Defaults to False.
+            config_path (str, optional): Path to the config file the task is run for, to trace the asset calls when profiling. 
+                Defaults to None.
+
+        Returns:
+            object: Value returned by the steps, if any
+
+        Raises:
+            AssetCallDeferred: An asset call failed and is to be retried, if `defer_retries` is set
+        """
+        result = None
+        error = None
+        while True:
+            try:
+                call = steps.throw(error) if error else steps.send(result)
+            except StopIteration as e:
+                return e.value
+
+            result = None
+            error = None
+            try:
+                if isinstance(call, list):
+                    result = await self.__async_call_assets(call)
+                elif isinstance(call, TaskRun):
+                    await self.__async_run_tasks_once(call.task, call.config_paths, **call.args)
+                elif isinstance(call, Delay):
+                    await asyncio.sleep(call.seconds)
+                elif isinstance(call, Future):
+                    result = await asyncio.wrap_future(call)
+                else:
+                    if self.profiler and config_path:
+                        call = call._replace(config_path=config_path)
+                    result = await self.__async_call_asset(call)
+            except BaseException as e:
+                if defer_retries and isinstance(e, Exception) and self.__is_retryable(call.operation, e):
+                    steps.close()
+                    raise AssetCallDeferred(call.operation, e)
+                # Hand any error (incl. a cancellation) back to the steps, so that they can write back the state before it is 
+                # raised
+                error = e
+
+    def __call_asset(self, call):
+        """Call the method of the asset class, waiting for the rate limit of the method if set
+
+        Args:
+            call (AssetCall): The asset call to execute
+
+        Returns:
+            object: Value returned by the asset class method
+
+        Raises:
+            CircuitBreakerOpen: The call was skipped as the circuit breaker is open
+        """
+        method = getattr(self.__get_asset_class(call.kind), call.operation)
+        rate_limiter = self.__get_operation_setting(self.rate_limiters, call.operation)
+        self.__check_circuit_breaker(call)
+        if rate_limiter:
+            rate_limiter.acquire()
+        with self.kind_semaphores.get(call.kind) or nullcontext():
+            start = time.perf_counter()
+            try:
+                result = method(*call.call_args, **call.args)
+                if call.operation in PAGINATED_ASSET_METHODS:
+                    result = self.__collect_pages(result)
+            except Exception as e:
+                self.__record_call_result(call, rate_limiter, time.perf_counter() - start, e)
+                raise
+        self.__record_call_result(call, rate_limiter, time.perf_counter() - start)
+        return result
+
+    async def __async_call_asset(self, call):
+        """Call the method of the asset class, awaiting it if it is a coroutine and waiting for the rate limit of the method if
+        set
+
+        Args:
+            call (AssetCall): The asset call to execute
+
+        Returns:
+            object: Value returned by the asset class method
+
+        Raises:
+            CircuitBreakerOpen: The call was skipped as the circuit breaker is open
+        """
+        method = getattr(self.__get_asset_class(call.kind), call.operation)
+        rate_limiter = self.__get_operation_setting(self.rate_limiters, call.operation)
+        self.__check_circuit_breaker(call)
+        if rate_limiter:
+            await rate_limiter.async_acquire()
+        async with self.__get_async_kind_semaphore(call.kind) or nullcontext():
+            start = time.perf_counter()
+            try:
+                result = method(*call.call_args, **call.args)
+                if inspect.isawaitable(result):
+                    result = await result
+                if call.operation in PAGINATED_ASSET_METHODS:
+                    if hasattr(result, '__aiter__'):
+                        result = [item async for item in result]
+                    result = self.__collect_pages(result)
+            except Exception as e:
+                self.__record_call_result(call, rate_limiter, time.perf_counter() - start, e)
+                raise
+        self.__record_call_result(call, rate_limiter, time.perf_counter() - start)
+        return result
+
+    def __get_asset_classes(self):
+        """Get all the asset classes synced
+
+        Returns:
+            list: The asset class, or the asset classes in the registry
+        """
+        if self.assets is None:
+            return [self.asset]
+        return list(self.assets.values())
+
+    def __get_asset_class(self, kind):
+        """Get the asset class for a kind of asset
+
+        Args:
+            kind (str): The kind of asset, if `asset` is a registry of asset classes
+
+        Raises:
+            AssetKindNotFoundException: The kind of asset is not in the registry
+
+        Returns:
+            object: The asset class
+        """
+        if self.assets is None:
+            return self.asset
+        if kind not in self.assets:
+            raise AssetKindNotFoundException(f"Asset kind: {kind} not found in the asset classes: {', '.join(self.assets)}")
+        return self.assets[kind]
+
+    def __get_config_kind(self, config_path, config):
+        """Route a config to a kind of asset in the registry of asset classes, by the `kind` field of the config or else by the 
+        first sub-folder of the IAAC Sync folder that the config file is in
+
+        Args:
+            config_path (str): Path to the config file
+            config (dict): The config read from the config file, if any
+
+        Raises:
+            AssetKindNotFoundException: The config cannot be routed to an asset class in the registry
+
+        Returns:
+            str: The kind of asset OR None, if a single asset class is synced
+        """
+        return get_config_kind(self.assets, self.iaac_sync_folder, config_path, config)
+
+    def __get_state_kind(self, config_path):
+        """Get the kind of asset tracked in the state for a config path, routing it by its sub-folder if not tracked
+
+        Args:
+            config_path (str): Path to the config file tracked in the state
+
+        Returns:
+            str: The kind of asset OR None, if a single asset class is synced
+        """
+        if self.assets is None:
+            return None
+        return self.state[config_path].get('kind') or self.__get_config_kind(config_path, None)
+
+    def __get_async_kind_semaphore(self, kind):
+        """Get the semaphore limiting the calls in flight to a kind of asset class via the event loop, if its concurrency is 
+        limited. The semaphores are created for each event loop
+
+        Args:
+            kind (str): The kind of asset
+
+        Returns:
+            asyncio.Semaphore: The semaphore OR None, if the concurrency is not limited
+        """
+        if kind not in self.max_concurrency_per_kind:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore_loop, semaphore = self.async_kind_semaphores.get(kind, (None, None))
+        if semaphore_loop is not loop:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_kind[kind])
+            self.async_kind_semaphores[kind] = (loop, semaphore)
+        return semaphore
+
+    def __check_circuit_breaker(self, call):
+        """Check that the circuit breaker, if set, lets the asset call through
+
+        Args:
+            call (AssetCall): The asset call to execute
+
+        Raises:
+            CircuitBreakerOpen: The circuit breaker is open
+        """
+        if self.circuit_breaker and call.operation not in LOCAL_ASSET_METHODS and not self.circuit_breaker.allow():
+            raise CircuitBreakerOpen(f"Asset method {call.operation} skipped as the circuit breaker is open after "
+                                     f"{self.circuit_breaker.failures} failed calls")
+
+    def __record_call_result(self, call, rate_limiter, duration, error=None):
+        """Adapt the rate limiter and the circuit breaker to the outcome of an asset call, and count it in the metrics (and the 
+        profiler, if set)
+
+        Args:
+            call (AssetCall): The asset call executed
+            rate_limiter (RateLimiter): The rate limiter for the method called, if any
+            duration (float): Seconds taken by the asset call
+            error (Exception, optional): The error raised by the asset call, if it failed. Defaults to None.
+        """
+        if self.profiler:
+            self.profiler.record_call(call, duration)
+
+        circuit_breaker = None
+        if call.operation not in LOCAL_ASSET_METHODS:
+            circuit_breaker = self.circuit_breaker
+
+        if error is None:
+            self.metrics.observe_call(call.operation, call.kind, duration, 'ok')
+            if rate_limiter:
+                rate_limiter.succeeded()
+            if circuit_breaker:
+                circuit_breaker.succeeded()
+        elif isinstance(error, self.throttling_exceptions):
+            # Throttling is handled by slowing down the calls, rather than counting against the circuit breaker
+            self.metrics.observe_call(call.operation, call.kind, duration, 'throttled')
+            if rate_limiter:
+                rate_limiter.throttled()
+        else:
+            self.metrics.observe_call(call.operation, call.kind, duration, 'error')
+            if circuit_breaker:
+                circuit_breaker.failed()
+
+    def __get_operation_setting(self, settings, operation):
+        """Get the setting e.g. the rate limiter for a method of the asset class. Batch methods e.g. `check_many` share the 
+        setting of their operation, unless one is set for the batch method itself
+
+        Args:
+            settings (dict): The setting for each method of the asset class e.g. `rate_limiters`
+            operation (str): Name of the method of the asset class e.g. `check`
+
+        Returns:
+            object: The setting for the method OR None, if not set
+        """
+        if not settings:
+            return None
+        setting = settings.get(operation)
+        if not setting and operation.endswith("_many"):
+            setting = settings.get(operation[:-len("_many")])
+        return setting
+
+    def __call_assets(self, calls):
+        """Call the methods of the asset class for a list of calls, on the pool of `max_workers` threads if set
+
+        Args:
+            calls (list): The asset calls to execute
+
+        Returns:
+            list: Value returned for each call, or the exception raised by the call
+        """
+        def call_asset(call):
+            try:
+                return self.__call_asset(call)
+            except Exception as e:
+                return e
+
+        if self.max_workers and len(calls) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(call_asset, calls))
+        return [call_asset(call) for call in calls]
+
+    async def __async_call_assets(self, calls):
+        """Call (or await) the methods of the asset class for a list of calls concurrently
+
+        Args:
+            calls (list): The asset calls to execute
+
+        Returns:
+            list: Value returned for each call, or the exception raised by the call
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency or 1)
+
+        async def call_asset(call):
+            async with semaphore:
+                return await self.__async_call_asset(call)
+
+        return await asyncio.gather(*[call_asset(call) for call in calls], return_exceptions=True)
+
+    def __is_batching(self):
+        """Check whether the asset calls should be grouped into calls to the batch methods of the asset class
+
+        Returns:
+            bool: Whether `batch_size` is set and the asset class defines any batch methods
+        """
+        return bool(self.batch_size) and any([self.__has_batch_method(operation, kind) for operation in BATCH_OPERATIONS
+                                              for kind in (self.assets or [None])])
+
+    def __has_batch_method(self, operation, kind=None):
+        """Check whether the asset class defines the batch method for an operation e.g. `check_many` for `check`
+
+        Args:
+            operation (str): The operation e.g. `check`
+            kind (str, optional): The kind of asset, if `asset` is a registry of asset classes. Defaults to None.
+
+        Returns:
+            bool: Whether the batch method is defined
+        """
+        if operation not in BATCH_OPERATIONS or (self.assets is not None and kind not in self.assets):
+            return False
+        return callable(getattr(self.__get_asset_class(kind), f"{operation}_many", None))
+
+    def __batch_tasks(self, task, config_paths, **args):
+        """Steps to run a task for up to `batch_size` config paths at a time in lockstep, so that the calls they make to the same 
+        operation are grouped into a single call to the batch method of the asset class (e.g. `check_many`). Operations without a 
+        batch method are called one item at a time.
+
+        The batch methods are called with a list of items, each item being the argument that would be passed to the single item 
+        method (e.g. a config for `create_many` or an asset ID for `delete_many`), or a tuple of arguments if there are several 
+        (e.g. (asset ID, config) for `check_many`). They must return a list with the result for each item, in the same order, 
+        where an exception in place of a result marks that item as failed.
+
+        Args:
+            task (func): Steps of format `def task(config_path, **args)` to run for each config path
+            config_paths (iterable): Config paths to run the task for
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            list: Calls to the asset class methods to execute together
+        """
+        config_paths = self.__iter_config_paths(config_paths)
+        pending_calls = {}
+        steps_config_paths = {}
+        more_config_paths = True
+        while True:
+            # Pick up more configs to keep `batch_size` configs in flight
+            while more_config_paths and len(pending_calls) < self.batch_size:
+                config_path = next(config_paths, StopIteration)
+                if config_path is StopIteration:
+                    more_config_paths = False
+                elif config_path is None:
+                    # The remaining configs are waiting on the configs in flight
+                    break
+                else:
+                    steps = task(config_path, **args)
+                    steps_config_paths[steps] = config_path
+                    self.__advance_batched_task(pending_calls, steps_config_paths, steps, None)
+
+            if not pending_calls:
+                break
+
+            # Group the pending calls by kind of asset and operation, and combine each group into a batch call if the asset 
+            # supports it
+            groups = {}
+            for steps, call in pending_calls.items():
+                groups.setdefault((call.kind, call.operation), []).append(steps)
+
+            calls = []
+            calls_steps = []
+            for (kind, operation), steps_group in groups.items():
+                if self.__has_batch_method(operation, kind):
+                    items = [pending_calls[steps].call_args for steps in steps_group]
+                    items = [item[0] if len(item) == 1 else item for item in items]
+                    config_path = None
+                    if self.profiler:
+                        config_path = [steps_config_paths[steps] for steps in steps_group]
+                    calls.append(AssetCall(f"{operation}_many", (items,), pending_calls[steps_group[0]].args, kind, config_path))
+                    calls_steps.append(steps_group)
+                else:
+                    for steps in steps_group:
+                        call = pending_calls[steps]
+                        if self.profiler:
+                            call = call._replace(config_path=steps_config_paths[steps])
+                        calls.append(call)
+                        calls_steps.append(steps)
+
+            results = yield calls
+
+            # Hand back the result for each item to the steps of the task which made the call
+            for call, steps_group, result in zip(calls, calls_steps, results):
+                if not isinstance(steps_group, list):
+                    self.__advance_batched_task(pending_calls, steps_config_paths, steps_group, result)
+                    continue
+
+                if isinstance(result, Exception):
+                    item_results = [result] * len(steps_group)
+                elif not isinstance(result, (list, tuple)) or len(result) != len(steps_group):
+                    error = AssetBatchResultInvalid(f"Asset method {call.operation} did not return a result for each of the "
+                                                    f"{len(steps_group)} items in the batch")
+                    item_results = [error] * len(steps_group)
+                else:
+                    item_results = result
+
+                for steps, item_result in zip(steps_group, item_results):
+                    self.__advance_batched_task(pending_calls, steps_config_paths, steps, item_result)
+
+    def __advance_batched_task(self, pending_calls, steps_config_paths, steps, result):
+        """Hand back the result of an asset call to the steps of a task being run in a batch, and track its next call, handling 
+        errors as per the retry policies and `continue_sync_on_error`
+
+        Args:
+            pending_calls (dict): The next asset call for each of the steps being run in the batch
+            steps_config_paths (dict): The config path for each of the steps being run in the batch
+            steps (generator): Steps of the task
+            result (object): Result of the previous asset call, or the exception raised by it
+        """
+        call = pending_calls.pop(steps, None)
+        config_path = steps_config_paths[steps]
+        try:
+            if isinstance(result, Exception):
+                if call and self.__is_retryable(call.operation, result):
+                    steps.close()
+                    raise AssetCallDeferred(call.operation, result)
+                pending_calls[steps] = steps.throw(result)
+            else:
+                pending_calls[steps] = steps.send(result)
+            return
+        except StopIteration:
+            del steps_config_paths[steps]
+            self.__finish_task(config_path, True)
+        except Exception as e:
+            del steps_config_paths[steps]
+            self.__handle_task_error(e, config_path)
+            self.__finish_task(config_path, False)
+
+    def __sync_config(self, config_path, **args):
+        """Steps to sync the asset for a single config file by comparing the file hash of config file with the state
+
+        Args:
+            config_path (str): Path to the config file in the IAAC Sync folder
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+        """
+        state_conf = self.state.get(config_path, None)
+        if not state_conf and self.hash_ring:
+            state_conf = self.__take_over_state_record(config_path)
+        
+        # Get the hash of existing assets. If it doesn't exist then 
+        state_hash = ''
+        asset_id = ''
+        if state_conf:
+            state_hash = state_conf['hash']
+            asset_id = state_conf['asset_id']
+        else:
+            self.__update_state(config_path, asset_id='', hash='')
+
+        # Asset ID tracked before the sync, to tell apart the assets created from those created again
+        state_asset_id = asset_id
+
+        # Reuse the config if it was already read to find its dependencies, otherwise read it now
+        loaded_config = self.loaded_configs.pop(config_path, None)
+        if loaded_config:
+            config_stat, config_hash, config, config_metadata = loaded_config
+        else:
+            config_stat = self.__calculate_stat(config_path)
+            config_hash, config, config_metadata = self.__load_config(config_path, config_stat, is_lazy=True)
+
+        # The config file is unchanged since the asset was synced, so it is only read if the asset must be checked, or if the
+        # state lacks what can only be found from the config
+        fingerprint = None
+        if config_metadata is None:
+            is_asset_in_sync, fingerprint = yield from self.__check_unread_config(config_path, asset_id, args)
+            if is_asset_in_sync:
+                self.metrics.count_config('in_sync')
+                return
+            config_hash, config, config_metadata = self.__load_config(config_path, config_stat)
+
+        # Track the settings from the config metadata which are needed to schedule the drift checks
+        check_interval = config_metadata.get('check_interval')
+        if self.state[config_path].get('check_interval') != check_interval:
+            self.__update_state(config_path, check_interval=check_interval)
+
+        # Track the configs that the asset depends on, so that the assets can be deleted in reverse dependency order even
+        # once their config files are removed
+        depends_on = self.__get_config_dependencies(config_metadata) or None
+        if self.state[config_path].get('depends_on') != depends_on:
+            self.__update_state(config_path, depends_on=depends_on)
+        missing_config_paths = [path for path in depends_on or [] if not os.path.isfile(path)]
+        if missing_config_paths:
+            raise ConfigDependencyNotFoundException(f"Config file: {config_path} depends on config files which do not exist: "
+                                                    f"{', '.join(missing_config_paths)}")
+
+        # Time at which the asset is known to match the config, recorded if its drift checks are scheduled
+        last_checked = None
+        if check_interval or self.check_scheduler.check_interval:
+            last_checked = time.time()
+
+        # Validate whether the config is correctly provided before syncing
+        if config:
+            kind = self.__get_config_kind(config_path, config)
+            if (yield AssetCall('validate', (config,), args, kind)):
+
+                # Delete the asset if the config is now routed to another kind of asset, so that it is created again. Assets 
+                # tracked without a kind (e.g. before the registry of asset classes was used) are taken to be of the kind 
+                # routed to
+                state_kind = self.state[config_path].get('kind')
+                if asset_id and self.assets is not None and state_kind not in (None, kind):
+                    if (yield AssetCall('delete', (asset_id,), args, state_kind)):
+                        asset_id = ''
+                        state_hash = ''
+                        self.__remove_state(config_path)
+                    else:
+                        raise AssetNotDeletedException(f"Asset with config in file {config_path} could not be deleted")
+                
+                # Checking if the asset that currently exists matches the config in 'git', if the asset is due a check
+                is_asset_in_sync = True
+                if asset_id and self.__is_listed_as_missing(kind, asset_id):
+                    # The asset has been deleted out-of-band, so create it again
+                    asset_id = ''
+                    is_asset_in_sync = False
+                elif asset_id and (self.__is_check_due(config_path, state_hash != config_hash) or 
+                                   self.__is_listed_as_changed(config_path, kind, asset_id)):
+                    is_asset_in_sync, fingerprint = yield from self.__check_asset(config_path, asset_id, config, kind, 
+                                                                                   state_hash != config_hash, args, 
+                                                                                   fingerprint)
+                    if is_asset_in_sync and self.state[config_path].get('fingerprint') != fingerprint:
+                        self.__update_state(config_path, fingerprint=fingerprint)
+                    if self.check_scheduler.interval(self.state[config_path]):
+                        self.__update_state(config_path, last_checked=time.time())
+
+                # Find what changed in the config since it was last applied
+                config_diff = None
+                if asset_id and state_hash and state_hash != config_hash:
+                    config_diff = self.__get_config_diff(config_path, config)
+                    if config_diff is not None and not config_diff:
+                        if is_asset_in_sync:
+                            # Only the formatting or the settings for pyiaacsync changed, so the asset already matches the 
+                            # config
+                            self.__update_state(config_path, hash=config_hash, stat=config_stat)
+                            state_hash = config_hash
+                        else:
+                            # The asset has drifted from the config, so the whole config must be applied
+                            config_diff = None
+
+                # If the spec file has changed OR is brand new, then re-create the asset (delete, then create)
+                if (not state_hash) or (state_hash != config_hash) or not is_asset_in_sync:
+
+                    # Recreate the asset by first attempting to delete it
+                    if asset_id:
+
+                        # Check if there is an update function in the asset, if yes, then call it
+                        asset_class = self.__get_asset_class(kind)
+                        if hasattr(asset_class, 'update') and callable(asset_class.update):
+                            is_updated, fingerprint = self.__split_fingerprint((yield AssetCall(
+                                'update', (asset_id, config), self.__get_update_args(args, config_diff), kind)))
+                            if is_updated:
+                                # Call the update function, and ensure that the same asset ID is returned
+                                # if asset ID not returned then there was an error
+                                self.__update_state(config_path, hash=config_hash, asset_id=asset_id, stat=config_stat,
+                                                    last_checked=last_checked, kind=kind, 
+                                                    config_snapshot=self.__snapshot_config(config), fingerprint=fingerprint)
+                                self.metrics.count_config('updated')
+                            else:
+                                if self.delete_if_asset_not_updated:
+                                    if (yield AssetCall('delete', (asset_id,), args, kind)):
+                                        # Asset ID deleted
+                                        asset_id = ''
+                                        # Update the state file that asset has been deleted
+                                        self.__remove_state(config_path)
+                                    else:
+                                        raise AssetNotDeletedException(f"Asset with config in file {config_path} could not be deleted")
+                                else:
+                                    raise AssetNotUpdatedException(f"Asset with config in file {config_path} could not be updated")
+
+                        else:
+                            if (yield AssetCall('delete', (asset_id,), args, kind)):
+                                # Asset ID deleted
+                                asset_id = ''
+                                # Update the state file that asset has been deleted
+                                self.__remove_state(config_path)
+                            else:
+                                raise AssetNotDeletedException(f"Asset with config in file {config_path} could not be deleted")
+                    
+                    # Try to create the asset again now, if it is deleted
+                    if not asset_id:
+                        asset_id, fingerprint = self.__split_fingerprint((yield AssetCall('create', (config,), args, kind)))
+                        if asset_id:
+                            # Update the state file with the hash and the new asset ID created
+                            self.__update_state(config_path, hash=config_hash, asset_id=asset_id, stat=config_stat,
+                                                last_checked=last_checked, check_interval=check_interval, 
+                                                depends_on=depends_on, kind=kind, 
+                                                config_snapshot=self.__snapshot_config(config), fingerprint=fingerprint)
+                            self.metrics.count_config('updated' if state_asset_id else 'created')
+
+                        if not asset_id:
+                            raise AssetNotCreatedException(f"Asset with config in file {config_path} could not be created")
+                else:
+                    # Record the kind of asset, if tracked without one
+                    if self.assets is not None and self.state[config_path].get('kind') != kind:
+                        self.__update_state(config_path, kind=kind)
+
+                    # Keep a snapshot of the config applied to the asset, if not kept yet
+                    if self.config_diffs and not self.state[config_path].get('config_snapshot'):
+                        self.__update_state(config_path, config_snapshot=self.__snapshot_config(config))
+                    self.metrics.count_config('in_sync')
+
+    def __plan_config(self, config_path, **args):
+        """Steps to plan the action to sync the asset for a single config file, by comparing the file hash of the config file 
+        with the state. Only the validate and check calls are made, and the state is left as is
+
+        Args:
+            config_path (str): Path to the config file in the IAAC Sync folder
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+        """
+        state_conf = self.state.get(config_path, None)
+        if not state_conf and self.hash_ring:
+            state_conf = self.__take_over_state_record(config_path)
+        state_hash = ''
+        asset_id = ''
+        if state_conf:
+            state_hash = state_conf.get('hash') or ''
+            asset_id = state_conf.get('asset_id') or ''
+
+        # Always hash the config file, as the plan must not rely on the stat of config files in another checkout
+        config_bytes = self.__read_config_file(config_path)
+        try:
+            config = self.__parse_config(config_bytes)
+        except Exception as e:
+            raise ConfigFileInvalidSyntax(f"Config file: {config_path} syntax invalid. Error: {e.__class__}, {e}")
+        config_metadata = self.__pop_config_metadata(config)
+        config_hash = self.__calculate_hash(config_bytes, config)
+
+        depends_on = config_metadata.get('depends_on') or None
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        missing_config_paths = [path for path in self.__get_config_dependencies(config_metadata) if not os.path.isfile(path)]
+        if missing_config_paths:
+            raise ConfigDependencyNotFoundException(f"Config file: {config_path} depends on config files which do not exist: "
+                                                    f"{', '.join(missing_config_paths)}")
+
+        # Configs which are empty or not valid are left as is, as in a sync
+        action = NOOP_ACTION
+        kind = None
+        if config:
+            kind = self.__get_config_kind(config_path, config)
+            if (yield AssetCall('validate', (config,), args, kind)):
+
+                # Recreate the asset if the config is now routed to another kind of asset, as in a sync
+                if asset_id and self.assets is not None and state_conf.get('kind') not in (None, kind):
+                    action = 'recreate'
+                else:
+                    is_asset_in_sync = True
+                    if asset_id and self.__is_check_due(config_path, state_hash != config_hash):
+                        is_asset_in_sync, _ = yield from self.__check_asset(config_path, asset_id, config, kind, 
+                                                                            state_hash != config_hash, args)
+
+                    # Leave the asset as is if only the formatting or the settings for pyiaacsync changed, as in a sync
+                    is_config_changed = (not state_hash) or (state_hash != config_hash)
+                    if is_config_changed and asset_id and state_hash:
+                        config_diff = self.__get_config_diff(config_path, config)
+                        is_config_changed = config_diff is None or bool(config_diff)
+
+                    if is_config_changed or not is_asset_in_sync:
+                        if not asset_id:
+                            action = 'create'
+                        elif callable(getattr(self.__get_asset_class(kind), 'update', None)):
+                            action = 'update'
+                        else:
+                            action = 'recreate'
+
+        # Only keep the config for the actions which change the asset, to keep the plan small
+        if action == NOOP_ACTION:
+            config = None
+        self.plan_actions[config_path] = PlanAction(action, self.__get_relative_config_path(config_path), kind, 
+                                                    asset_id or None, state_hash or None, config_hash, config, depends_on, 
+                                                    config_metadata.get('check_interval'))
+
+    def __apply_action(self, config_path, **args):
+        """Steps to apply the action planned for a single config path, using the config and hash from the plan
+
+        Args:
+            config_path (str): Path to the config file in the IAAC Sync folder
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Raises:
+            AssetNotCreatedException: The asset could not be created
+            AssetNotUpdatedException: The asset could not be updated
+            AssetNotDeletedException: The asset could not be deleted to be created again
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+        """
+        action = self.plan_actions[config_path]
+        asset_id = action.asset_id or ''
+        if action.action == DELETE_ACTION:
+            if (yield AssetCall('delete', (asset_id,), args, self.__get_state_kind(config_path))):
+                self.__remove_state(config_path)
+                self.metrics.count_config('deleted')
+            return
+
+        # Time at which the asset is known to match the config, recorded if its drift checks are scheduled
+        last_checked = None
+        if action.check_interval or self.check_scheduler.check_interval:
+            last_checked = time.time()
+
+        # The stat of the config file is cleared, so that the config file is hashed again in the next sync
+        fields = dict(hash=action.config_hash, stat=None, last_checked=last_checked, check_interval=action.check_interval,
+                      depends_on=self.__get_config_dependencies({'depends_on': action.depends_on}) or None, kind=action.kind,
+                      config_snapshot=self.__snapshot_config(action.config))
+
+        if action.action == 'update':
+            config_diff = self.__get_config_diff(config_path, action.config)
+            is_updated, fingerprint = self.__split_fingerprint((yield AssetCall(
+                'update', (asset_id, action.config), self.__get_update_args(args, config_diff), action.kind)))
+            if is_updated:
+                self.__update_state(config_path, asset_id=asset_id, fingerprint=fingerprint, **fields)
+                self.metrics.count_config('updated')
+                return
+            if not self.delete_if_asset_not_updated:
+                raise AssetNotUpdatedException(f"Asset with config in file {config_path} could not be updated")
+
+        # Recreate the asset by first deleting it
+        if asset_id:
+            if (yield AssetCall('delete', (asset_id,), args, self.__get_state_kind(config_path))):
+                asset_id = ''
+                self.__remove_state(config_path)
+            else:
+                raise AssetNotDeletedException(f"Asset with config in file {config_path} could not be deleted")
+
+        asset_id, fingerprint = self.__split_fingerprint((yield AssetCall('create', (action.config,), args, action.kind)))
+        if not asset_id:
+            raise AssetNotCreatedException(f"Asset with config in file {config_path} could not be created")
+        self.__update_state(config_path, asset_id=asset_id, fingerprint=fingerprint, **fields)
+        self.metrics.count_config('updated' if action.asset_id else 'created')
+
+    def __get_config_diff(self, config_path, config):
+        """Find what changed in a config since it was last applied to its asset, from the snapshot kept in the state
+
+        Args:
+            config_path (str): Path to the config file
+            config (object): The config to apply
+
+        Returns:
+            ConfigDiff: The changes OR None, if no snapshot of the config last applied is kept
+        """
+        state_conf = self.state.get(config_path, None)
+        if not self.config_diffs or not state_conf:
+            return None
+        snapshot = state_conf.get('config_snapshot')
+        if not snapshot:
+            return None
+        return diff_configs(restore_config(snapshot), config)
+
+    def __snapshot_config(self, config):
+        """Get the snapshot of a config applied to its asset, to keep in the state
+
+        Args:
+            config (object): The config applied
+
+        Returns:
+            str: The snapshot OR None, if no snapshots are kept so that any snapshot kept before is removed
+        """
+        if not self.config_diffs:
+            return None
+        return snapshot_config(config)
+
+    def __get_update_args(self, args, config_diff):
+        """Get the arguments passed to `update`, along with the changes to the config if they are tracked
+
+        Args:
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+            config_diff (ConfigDiff): The changes to the config since it was last applied, if known
+
+        Returns:
+            dict: The arguments
+        """
+        if not self.config_diffs:
+            return args
+        return dict(args, config_diff=config_diff)
+
+    def __load_config(self, config_path, config_stat, is_lazy=False):
+        """Read and parse a config file, unless it was already read for the same stat
+
+        Args:
+            config_path (str): Path to the config file in the IAAC Sync folder
+            config_stat (tuple): The stat of the config file, if it can be relied upon
+            is_lazy (bool, optional): Whether to leave the config file unread if its stat shows that it is unchanged since it 
+                was last hashed, in which case only the hash kept in the state is returned. Defaults to False.
+
+        Raises:
+            ConfigFileInvalidSyntax: If config spec file's content is deemed invalid
+
+        Returns:
+            tuple: The hash of the config file, the config and the settings for pyiaacsync in the config (both None, if the 
+                config file was left unread)
+        """
+        # Reuse the hash and config, if the config file was already read for the same stat
+        cached_stat, cached_hash, cached_config, cached_config_metadata = self.config_cache.get(config_path, (None,) * 4)
+        if config_stat and cached_stat == config_stat and not self.full_rehash:
+            return cached_hash, cached_config, cached_config_metadata
+
+        state_conf = self.state.get(config_path, None)
+        state_hash = state_conf['hash'] if state_conf else ''
+        if is_lazy and state_hash and config_stat and not self.full_rehash and state_conf.get('stat') == config_stat:
+            return state_hash, None, None
+
+        # Read the config file once, to both calculate the hash which will be checked to see if the config has changed 
+        # and parse the config
+        config_bytes = self.__read_config_file(config_path)
+        try:
+            config = self.__parse_config(config_bytes)
+        except Exception as e:
+            self.config_cache.pop(config_path)
+            raise ConfigFileInvalidSyntax(f"Config file: {config_path} syntax invalid. Error: {e.__class__}, {e}")
+        config_metadata = self.__pop_config_metadata(config)
+
+        # Reuse the hash if the config file's stat shows that it is unchanged since it was last hashed
+        if state_hash and config_stat and not self.full_rehash and state_conf.get('stat') == config_stat:
+            config_hash = state_hash
+        else:
+            config_hash = self.__calculate_hash(config_bytes, config)
+            if state_hash == config_hash:
+                self.__update_state(config_path, stat=config_stat)
+
+        self.config_cache.put(config_path, (config_stat, config_hash, config, config_metadata))
+        return config_hash, config, config_metadata
+
+    def __get_config_dependencies(self, config_metadata):
+        """Get the config paths that a config depends on, as listed under `depends_on` in its settings for pyiaacsync relative to
+        the IAAC Sync folder
+
+        Args:
+            config_metadata (dict): The settings for pyiaacsync in the config
+
+        Returns:
+            list: Config paths that the config depends on
+        """
+        depends_on = config_metadata.get('depends_on') or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        return [os.path.join(self.iaac_sync_folder, path) for path in depends_on]
+
+    def __add_dependent_configs(self, config_paths, task_graph, is_partial=False):
+        """Read each config to find the configs that it depends on, and add it to the graph of tasks, passing on the configs 
+        ready to be synced as they are found. The configs which depend on others are held back only until the configs they 
+        depend on have been synced (or the walk is done without finding them), and skipped if any of them failed. Config files 
+        which are unchanged since they were synced are left unread, as they depend on the configs tracked in the state
+
+        Args:
+            config_paths (iterable): Config paths to sync
+            task_graph (TaskGraph): The graph of tasks, closed once all the config paths have been added
+            is_partial (bool, optional): Whether only some of the configs are synced, in which case the dependencies tracked in 
+                the state for the other configs are also checked for cycles. Defaults to False.
+
+        Raises:
+            DependencyCycleException: The configs depend on each other in a cycle
+
+        Yields:
+            str: Config path to sync
+        """
+        self.loaded_configs = {}
+        dependencies = {}
+        for config_path in config_paths:
+            config_stat = self.__calculate_stat(config_path)
+            try:
+                config_hash, config, config_metadata = self.__load_config(config_path, config_stat, is_lazy=True)
+            except Exception:
+                # The error is surfaced when the config is synced
+                depends_on = None
+            else:
+                if config_metadata is None:
+                    depends_on = self.state[config_path].get('depends_on')
+                else:
+                    depends_on = self.__get_config_dependencies(config_metadata)
+                if depends_on:
+                    dependencies[config_path] = depends_on
+                else:
+                    self.loaded_configs[config_path] = (config_stat, config_hash, config, config_metadata)
+
+            failed_config_path = task_graph.add(config_path, depends_on)
+            if failed_config_path:
+                self.__skip_task(config_path, failed_config_path)
+            yield from task_graph.pop_ready()
+
+        if is_partial and dependencies:
+            all_dependencies = dict([(config_path, self.state[config_path].get('depends_on')) 
+                                     for config_path in self.__state_config_paths()])
+            all_dependencies.update(dependencies)
+            TaskGraph(all_dependencies)
+        task_graph.close()
+
+    def __get_delete_task_graph(self, config_paths):
+        """Find the configs that each of the config paths tracked in the state depends on, so that their assets can be deleted
+        in reverse dependency order
+
+        Args:
+            config_paths (list): Config paths tracked in the state whose assets are to be deleted
+
+        Raises:
+            DependencyCycleException: The configs depend on each other in a cycle
+
+        Returns:
+            TaskGraph|list: The graph of config paths to delete in reverse OR the list of config paths, if none depend on each 
+                other
+        """
+        dependencies = dict([(config_path, self.state[config_path].get('depends_on')) for config_path in config_paths])
+        return self.__get_task_graph(dependencies, reverse=True)
+
+    def __get_task_graph(self, dependencies, reverse=False):
+        """Get the graph of config paths to run the tasks for in dependency order, if any of them depend on each other
+
+        Args:
+            dependencies (dict): The config paths that each config path depends on
+            reverse (bool, optional): Whether to run the tasks in reverse dependency order. Defaults to False.
+
+        Raises:
+            DependencyCycleException: The configs depend on each other in a cycle
+
+        Returns:
+            TaskGraph|list: The graph of config paths OR the list of config paths, if none depend on each other
+        """
+        task_graph = TaskGraph(dependencies, reverse=reverse)
+        if task_graph.has_dependencies:
+            return task_graph
+        return list(dependencies)
+
+    def __pop_config_metadata(self, config):
+        """Remove the settings for pyiaacsync (under the `CONFIG_METADATA_KEY`) from a config
+
+        Args:
+            config (dict): The config read from the config file
+
+        Returns:
+            dict: The settings for pyiaacsync in the config, if any
+        """
+        config_metadata = {}
+        if isinstance(config, dict):
+            config_metadata = config.pop(CONFIG_METADATA_KEY, None) or {}
+        return config_metadata
+
+    def __is_check_due(self, config_path, is_config_changed):
+        """Check whether the asset for a config path must be checked (`check`) in this sync
+
+        Args:
+            config_path (str): Path to the config file
+            is_config_changed (bool): Whether the config has changed since the asset was created or updated, in which case it 
+                gets updated anyway
+
+        Returns:
+            bool: Whether the asset must be checked
+        """
+        if not self.check_scheduler.interval(self.state[config_path]):
+            return True
+        return not is_config_changed and config_path in self.due_checks
+
+    def __get_listing_kinds(self):
+        """Get the kinds of asset whose asset class defines `list`
+
+        Returns:
+            list: The kinds of asset (or None, if a single asset class is synced)
+        """
+        return [kind for kind in (self.assets or [None]) if callable(getattr(self.__get_asset_class(kind), 'list', None))]
+
+    def __list_inventories(self, **args):
+        """Steps to list the remote assets of each kind of asset whose asset class defines `list`, to find the assets which 
+        are missing, have changed or are not tracked in the state
+
+        Args:
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+        """
+        self.untracked_assets = {}
+        for kind in self.__get_listing_kinds():
+            try:
+                inventory = yield from self.__list_assets(kind, **args)
+            except Exception as e:
+                self.__handle_listing_error(e)
+                continue
+            self.__set_inventory(kind, inventory)
+
+    def __list_assets(self, kind, **args):
+        """Steps to list the remote assets of a kind of asset
+
+        Args:
+            kind (str): The kind of asset
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+
+        Returns:
+            dict: The fingerprint of each remote asset by asset ID
+        """
+        return (yield AssetCall('list', (), args, kind))
+
+    def __collect_pages(self, result):
+        """Collect the remote assets returned by `list`, fetching all the pages of the result
+
+        Args:
+            result (dict|iterable): The fingerprint of each asset by asset ID, or (asset ID, fingerprint) for each asset
+
+        Raises:
+            AssetListResultInvalid: An item of the result is not a pair of asset ID and fingerprint
+
+        Returns:
+            dict: The fingerprint of each asset (as a string OR None, if not known) by asset ID
+        """
+        if isinstance(result, dict):
+            result = result.items()
+        inventory = {}
+        for item in result or []:
+            if not isinstance(item, (list, tuple)) or len(item) != 2:
+                raise AssetListResultInvalid(f"Asset method list returned {item!r}, instead of a pair of asset ID and "
+                                             f"fingerprint")
+            asset_id, fingerprint = item
+            inventory[asset_id] = str(fingerprint) if fingerprint is not None else None
+        return inventory
+
+    def __set_inventory(self, kind, inventory):
+        """Keep the remote assets of a kind of asset for the sync, and find the ones which are not tracked in the state
+
+        Args:
+            kind (str): The kind of asset
+            inventory (dict): The fingerprint of each remote asset by asset ID
+        """
+        self.inventories[kind] = inventory
+
+        # The other shards track the assets which are not in the partition of this shard
+        if self.hash_ring:
+            return
+        tracked_asset_ids = set([self.state[config_path].get('asset_id') for config_path in self.__state_config_paths()
+                                 if self.__get_state_kind(config_path) == kind])
+        untracked_asset_ids = sorted([asset_id for asset_id in inventory if asset_id not in tracked_asset_ids], key=str)
+        self.untracked_assets[kind] = untracked_asset_ids
+        self.metrics.set('pyiaacsync_untracked_assets', len(untracked_asset_ids), 
+                         **({'kind': kind} if kind is not None else {}))
+
+    def __handle_listing_error(self, e):
+        """Fall back to checking each asset one by one if the remote assets could not be listed. Execute callback if set by 
+        the user, or raise this error to next parent exception
+
+        Args:
+            e (Exception): Error raised when listing the remote assets
+        """
+        if not self.continue_sync_on_error:
+            raise e
+        self.callback_on_sync_error(e.__class__, str(e))
+
+    def __is_listed_as_missing(self, kind, asset_id):
+        """Check whether an asset is missing from the remote assets listed for its kind e.g. deleted out-of-band
+
+        Args:
+            kind (str): The kind of asset
+            asset_id (str): ID of the asset
+
+        Returns:
+            bool: Whether the remote assets were listed, and the asset is not among them
+        """
+        inventory = self.inventories.get(kind)
+        return inventory is not None and asset_id not in inventory
+
+    def __is_listed_as_changed(self, config_path, kind, asset_id):
+        """Check whether the fingerprint of an asset listed for its kind differs from the one kept in the state
+
+        Args:
+            config_path (str): Path to the config file
+            kind (str): The kind of asset
+            asset_id (str): ID of the asset
+
+        Returns:
+            bool: Whether the asset was listed with a fingerprint, which is not the one kept in the state
+        """
+        fingerprint = self.inventories.get(kind, {}).get(asset_id)
+        return fingerprint is not None and self.state[config_path].get('fingerprint') != fingerprint
+
+    def __check_unread_config(self, config_path, asset_id, args):
+        """Steps to find whether the asset for a config file which is unchanged since it was synced is still in sync, without 
+        reading the config file. It is, unless it is due a check that its fingerprint cannot settle, it is missing from the 
+        remote assets listed, or the state lacks what can only be found from the config (its kind, or a snapshot of the 
+        config)
+
+        Args:
+            config_path (str): Path to the config file
+            asset_id (str): ID of the asset
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+
+        Returns:
+            tuple: Whether the asset is known to be in sync, and the fingerprint of the asset if fetched OR None
+        """
+        state_conf = self.state[config_path]
+        if (not asset_id or (self.assets is not None and not state_conf.get('kind')) or 
+                (self.config_diffs and not state_conf.get('config_snapshot'))):
+            return False, None
+
+        # Read the config file to report any config files it depends on which no longer exist
+        if any([not os.path.isfile(path) for path in state_conf.get('depends_on') or []]):
+            return False, None
+
+        kind = self.__get_state_kind(config_path)
+        if self.__is_listed_as_missing(kind, asset_id):
+            return False, None
+
+        fingerprint = None
+        if self.__is_check_due(config_path, False) or self.__is_listed_as_changed(config_path, kind, asset_id):
+            fingerprint = yield from self.__fetch_fingerprint(asset_id, kind, args)
+            if fingerprint is None or state_conf.get('fingerprint') != fingerprint:
+                return False, fingerprint
+            if self.check_scheduler.interval(state_conf):
+                self.__update_state(config_path, last_checked=time.time())
+        return True, fingerprint
+
+    def __fetch_fingerprint(self, asset_id, kind, args):
+        """Steps to get the fingerprint of an asset, as listed along with the other remote assets, or else via `fingerprint` if 
+        the asset class defines it
+
+        Args:
+            asset_id (str): ID of the asset
+            kind (str): The kind of asset
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+
+        Returns:
+            str: The fingerprint of the asset OR None, if not known
+        """
+        fingerprint = self.inventories.get(kind, {}).get(asset_id)
+        if fingerprint is None and callable(getattr(self.__get_asset_class(kind), 'fingerprint', None)):
+            fingerprint = yield AssetCall('fingerprint', (asset_id,), args, kind)
+            if fingerprint is not None:
+                fingerprint = str(fingerprint)
+        return fingerprint
+
+    def __check_asset(self, config_path, asset_id, config, kind, is_config_changed, args, fingerprint=None):
+        """Steps to check whether an asset matches its config. If the asset class defines `fingerprint` (or `list`) and the 
+        config is unchanged, the fingerprint of the asset is fetched first, and the full `check` is skipped if it is the same as
+        when the asset was last known to match the config
+
+        Args:
+            config_path (str): Path to the config file
+            asset_id (str): ID of the asset
+            config (object): The config
+            kind (str): The kind of asset
+            is_config_changed (bool): Whether the config has changed since the asset was created or updated
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+            fingerprint (str, optional): The fingerprint of the asset, if already fetched and found to differ from the one kept
+                in the state. Defaults to None.
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+
+        Returns:
+            tuple: Whether the asset matches the config, and the fingerprint of the asset OR None, if not known
+        """
+        state_conf = self.state.get(config_path, None)
+        if is_config_changed:
+            fingerprint = self.inventories.get(kind, {}).get(asset_id)
+        elif fingerprint is None:
+            fingerprint = yield from self.__fetch_fingerprint(asset_id, kind, args)
+            if fingerprint is not None and state_conf and state_conf.get('fingerprint') == fingerprint:
+                return True, fingerprint
+
+        is_asset_in_sync, check_fingerprint = self.__split_fingerprint((yield AssetCall('check', (asset_id, config), args, 
+                                                                                          kind)))
+        return is_asset_in_sync, check_fingerprint if check_fingerprint is not None else fingerprint
+
+    def __split_fingerprint(self, result):
+        """Split the result of an asset call into the result itself and the fingerprint of the asset, if the asset class 
+        returned a `FingerprintedResult`
+
+        Args:
+            result (object): The result of the asset call
+
+        Returns:
+            tuple: The result, and the fingerprint as a string OR None, if not returned
+        """
+        if not isinstance(result, FingerprintedResult):
+            return result, None
+        fingerprint = result.fingerprint
+        return result.result, str(fingerprint) if fingerprint is not None else None
+
+    def __delete_orphan_asset(self, config_path, **args):
+        """Steps to delete the asset for a config path which is tracked in the state, but no longer in the config spec (git)
+
+        Args:
+            config_path (str): Path to the config file tracked in the state
+            args (dict): Any additional optional args which would get passed to the methods defined in the asset class
+
+        Yields:
+            AssetCall: Calls to the asset class methods to execute
+        """
+        asset_id = self.state[config_path].get('asset_id', None)
+        if asset_id:
+            kind = self.__get_state_kind(config_path)
+            if (yield AssetCall('delete', (asset_id,), args, kind)):
+                # Remove the asset tracking from the state since it is no longer being tracked in git
+                self.__remove_state(config_path)
+                self.metrics.count_config('deleted')
+
+    def __calculate_stat(self, file_path):
+        """Function gets the stat of a config file used to detect whether it has changed since it was last hashed
+
+        Args:
+            file_path (str): Path to the config file
+
+        Raises:
+            FileNotFoundException: Config file not found
+
+        Returns:
+            tuple: The (mtime_ns, size, inode) of the file OR None, if the file was modified too recently for its stat to be 
+                relied upon
+        """
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundException(f"File: {file_path} not found")
+
+        if time.time_ns() - st.st_mtime_ns < RACY_STAT_WINDOW_NS:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def __read_config_file(self, file_path):
+        """Function reads the contents of a config file
+
+        Args:
+            file_path (str): Path to the config file to read
+
+        Raises:
+            FileNotFoundException: Config file not found
+
+        Returns:
+            bytes: Contents of the config file
+        """
+        try:
+            with open(file_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise FileNotFoundException(f"File: {file_path} not found")
+
+    def __parse_config(self, config_bytes):
+        """Function parses the contents of a config file
+
+        Args:
+            config_bytes (bytes): Contents of the config file
+
+        Returns:
+            object: The config
+        """
+        start = time.perf_counter()
+        try:
+            return yaml.load(config_bytes, Loader=SafeLoader)
+        finally:
+            self.metrics.observe('pyiaacsync_phase_duration_seconds', time.perf_counter() - start, phase='parse')
+
+    def __calculate_hash(self, config_bytes, config, hash_mode=None):
+        """Function calculates SHA256 hash for the contents of a config file, or for the canonical form of the config in the 
+        semantic hash mode
+
+        Args:
+            config_bytes (bytes): Contents of the config file for which hash must be calculated
+            config (object): The config parsed from the config file, without the settings for pyiaacsync
+            hash_mode (str, optional): One of HASH_MODES. Defaults to the hash mode of the sync.
+
+        Returns:
+            str: Readable SHA256 hash
+        """
+        start = time.perf_counter()
+        config_hash = calculate_hash(config_bytes, config, hash_mode or self.hash_mode)
+        self.metrics.observe('pyiaacsync_phase_duration_seconds', time.perf_counter() - start, phase='hash')
+        return config_hash
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+import asyncio
+import threading
+import time
+
+# Default factor by which the rate is multiplied when the asset is throttled
+DEFAULT_DECREASE_FACTOR = 0.5
+
+# Default lowest rate, as a fraction of the configured rate, to which the rate can be decreased
+DEFAULT_MIN_RATE_FRACTION = 0.01
+
+# Default increase of the rate for every second of successful calls, as a fraction of the configured rate
+DEFAULT_INCREASE_FRACTION = 0.05
+
+class AssetThrottledException(Exception):
+    """Exception which the asset class can raise when the provider throttles it (e.g. HTTP 429), so that the rate of calls is
+    decreased
+    """
+    pass
+
+class RateLimiter:
+    """Class used to limit the rate of calls to an asset operation via a token bucket, with the rate adapted via AIMD (additive
+    increase, multiplicative decrease): the rate is cut whenever the provider throttles a call, and slowly increased back
+    towards the configured rate while calls succeed. This keeps the throughput just under the provider's quota.
+    """
+    def __init__(self, rate, burst=None, decrease_factor=DEFAULT_DECREASE_FACTOR, min_rate=None, additive_increase=None):
+        """Function to initialize the rate limiter
+
+        Args:
+            rate (float): Maximum number of calls per second
+            burst (float, optional): Maximum number of calls which can be made at once after being idle. Defaults to the rate,
+                or 1 if the rate is lower.
+            decrease_factor (float, optional): Factor by which the rate is multiplied when throttled. Defaults to
+                DEFAULT_DECREASE_FACTOR.
+            min_rate (float, optional): Lowest rate to which the rate can be decreased. Defaults to DEFAULT_MIN_RATE_FRACTION of
+                the rate.
+            additive_increase (float, optional): Increase of the rate (in calls per second) for every second of successful
+                calls. Defaults to DEFAULT_INCREASE_FRACTION of the rate.
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.decrease_factor = decrease_factor
+        self.min_rate = min_rate or rate * DEFAULT_MIN_RATE_FRACTION
+        self.additive_increase = additive_increase or rate * DEFAULT_INCREASE_FRACTION
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __reserve(self):
+        """Take a token from the bucket, going into debt if there are none left so that concurrent callers queue up
+
+        Returns:
+            float: Seconds to wait before making the call
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def get_wait(self):
+        """Get the seconds to wait until a call could be made, without taking a token
+
+        Returns:
+            float: Seconds to wait
+        """
+        with self.lock:
+            tokens = min(self.burst, self.tokens + (time.monotonic() - self.updated) * self.rate)
+            if tokens >= 1:
+                return 0
+            return (1 - tokens) / self.rate
+
+    def acquire(self):
+        """Wait until a call can be made
+        """
+        wait = self.__reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def async_acquire(self):
+        """Wait until a call can be made, without blocking the event loop
+        """
+        wait = self.__reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def succeeded(self):
+        """Increase the rate additively after a successful call
+        """
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.additive_increase / self.rate)
+
+    def throttled(self):
+        """Decrease the rate multiplicatively after a call was throttled, and drop any tokens saved up
+        """
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.tokens = min(self.tokens, 0)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+import random
+import threading
+import time
+
+# Default number of attempts (incl. the first) made for an asset call before its error is surfaced
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Default number of attempts (incl. the first) made for an asset call which the provider throttled, when no retry policy set for
+# the method retries it
+DEFAULT_THROTTLED_MAX_ATTEMPTS = 5
+
+# Default seconds to wait before the first retry, doubled for every further retry
+DEFAULT_BASE_DELAY = 1
+
+# Default maximum seconds to wait before a retry
+DEFAULT_MAX_DELAY = 60
+
+# Default fraction of the delay by which each retry is randomly moved earlier or later
+DEFAULT_RETRY_JITTER = 0.5
+
+# Default number of consecutive failed asset calls after which the circuit breaker opens
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# Default seconds for which the circuit breaker stays open before letting a trial call through
+DEFAULT_COOLDOWN = 60
+
+class CircuitBreakerOpen(Exception):
+    """Exception generated when an asset call is skipped because the circuit breaker is open
+    """
+    pass
+
+class AssetCallDeferred(Exception):
+    """Exception generated when an asset call has failed and the task which made it is to be retried later in the sync
+    """
+    def __init__(self, operation, error):
+        """Function to initialize the exception
+
+        Args:
+            operation (str): Name of the method of the asset class which failed e.g. `create`
+            error (Exception): The error raised by the asset call
+        """
+        super().__init__(f"Asset method {operation} failed, to be retried. Error: {error.__class__}, {error}")
+        self.operation = operation
+        self.error = error
+
+class RetryPolicy:
+    """Class used to describe how failed calls to an asset operation are retried, with an exponential backoff and jitter
+    """
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+            jitter=DEFAULT_RETRY_JITTER, retry_on=(Exception,)):
+        """Function to initialize the retry policy
+
+        Args:
+            max_attempts (int, optional): Number of attempts (incl. the first) before the error is surfaced. Defaults to
+                DEFAULT_MAX_ATTEMPTS.
+            base_delay (float, optional): Seconds to wait before the first retry, doubled for every further retry. Defaults to
+                DEFAULT_BASE_DELAY.
+            max_delay (float, optional): Maximum seconds to wait before a retry. Defaults to DEFAULT_MAX_DELAY.
+            jitter (float, optional): Fraction of the delay by which each retry is randomly moved earlier or later. Defaults to
+                DEFAULT_RETRY_JITTER.
+            retry_on (tuple, optional): Exceptions raised by the asset class which are retried. Defaults to (Exception,).
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = tuple(retry_on)
+
+    def is_retryable(self, error):
+        """Check whether an error raised by the asset class is retried
+
+        Args:
+            error (Exception): The error raised by the asset call
+
+        Returns:
+            bool: Whether the error is retried
+        """
+        return isinstance(error, self.retry_on) and not isinstance(error, CircuitBreakerOpen)
+
+    def delay(self, attempt):
+        """Get the seconds to wait before retrying after a failed attempt
+
+        Args:
+            attempt (int): Number of the attempt which failed, starting at 1
+
+        Returns:
+            float: Seconds to wait
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 + self.jitter * (2 * random.random() - 1))
+
+class CircuitBreaker:
+    """Class used to stop calling a failing asset backend: after `failure_threshold` consecutive failed calls the breaker opens
+    and all calls are skipped for `cooldown` seconds, after which a single trial call is let through. The breaker closes again
+    if the trial call succeeds, and re-opens for another cooldown if it fails.
+    """
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN):
+        """Function to initialize the circuit breaker
+
+        Args:
+            failure_threshold (int, optional): Number of consecutive failed calls after which the breaker opens. Defaults to
+                DEFAULT_FAILURE_THRESHOLD.
+            cooldown (float, optional): Seconds for which the breaker stays open. Defaults to DEFAULT_COOLDOWN.
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Check whether a call can be made
+
+        Returns:
+            bool: Whether the breaker is closed, or the call is the trial call after the cooldown
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_in_flight or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def succeeded(self):
+        """Close the breaker after a successful call
+        """
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def failed(self):
+        """Count a failed call, opening the breaker once the threshold is reached or if the trial call failed
+        """
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
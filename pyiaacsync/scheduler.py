@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+import hashlib
+import heapq
+import math
+
+# Default fraction of the interval by which each drift check of an asset is randomly moved earlier or later
+DEFAULT_CHECK_JITTER = 0.1
+
+class CheckScheduler:
+    """Class used to decide which assets are due for a drift check (`check`) in a sync, so that each asset is checked once every
+    `check_interval` seconds (give or take the jitter) instead of in every sync.
+
+    To spread the checks evenly across the syncs, each asset is given a stable slot within the interval based on its config path,
+    and is due at its first slot at least half an interval after it was last checked. This way, assets which are created or 
+    checked together (e.g. all the assets in the first sync) do not keep falling due together.
+    """
+    def __init__(self, check_interval=None, check_jitter=DEFAULT_CHECK_JITTER, max_checks_per_cycle=None):
+        """Function to initialize the scheduler
+
+        Args:
+            check_interval (float, optional): Seconds between drift checks of each asset, unless set for the asset's config. If
+                not set, such assets are checked in every sync. Defaults to None.
+            check_jitter (float, optional): Fraction of the interval by which each check is randomly moved earlier or later. 
+                Defaults to DEFAULT_CHECK_JITTER.
+            max_checks_per_cycle (int, optional): Maximum number of assets due for a drift check in a sync, the most overdue
+                first. Defaults to None.
+        """
+        self.check_interval = check_interval
+        self.check_jitter = check_jitter
+        self.max_checks_per_cycle = max_checks_per_cycle
+
+    def interval(self, record):
+        """Get the seconds between drift checks for an asset
+
+        Args:
+            record (StateRecord): The asset tracked in the state
+
+        Returns:
+            float: Seconds between drift checks OR None, if the asset is checked in every sync
+        """
+        return record.get('check_interval') or self.check_interval
+
+    def schedule(self, records, now):
+        """Find the assets which are due for a drift check
+
+        Args:
+            records (iterable): The (config path, `StateRecord`) of each asset tracked in the state
+            now (float): The current time, in seconds since the epoch
+
+        Returns:
+            tuple: The set of config paths due for a drift check, and a dict of the last checked time to record for the assets
+                which have never been checked (half an interval ago, so that they are due at their next slot)
+        """
+        due = []
+        last_checked_times = {}
+        for config_path, record in records:
+            interval = self.interval(record)
+            if not interval or not record.get('asset_id'):
+                continue
+
+            last_checked = record.get('last_checked')
+            if last_checked is None:
+                last_checked = now - interval / 2
+                last_checked_times[config_path] = last_checked
+
+            next_check = self.next_check(config_path, last_checked, interval)
+            if next_check <= now:
+                due.append((next_check, config_path))
+
+        # Check the most overdue assets first, if the number of checks per sync is limited
+        if self.max_checks_per_cycle and len(due) > self.max_checks_per_cycle:
+            due = heapq.nsmallest(self.max_checks_per_cycle, due)
+
+        return set([config_path for _, config_path in due]), last_checked_times
+
+    def next_check(self, config_path, last_checked, interval):
+        """Get the time at which an asset is next due for a drift check
+
+        Args:
+            config_path (str): Path to the config file
+            last_checked (float): Time at which the asset was last checked, in seconds since the epoch
+            interval (float): Seconds between drift checks of the asset
+
+        Returns:
+            float: Time at which the asset is due, in seconds since the epoch
+        """
+        phase = interval * self.__spread(config_path)
+        slot = math.ceil((last_checked + interval / 2 - phase) / interval)
+        jitter = self.check_jitter * interval * (self.__spread(config_path, slot) - 0.5)
+        return slot * interval + phase + jitter
+
+    def __spread(self, config_path, salt=''):
+        """Get a stable pseudo-random number for a config path, used to spread the drift checks
+
+        Args:
+            config_path (str): Path to the config file
+            salt (object, optional): Salt to get different numbers for the same config path. Defaults to ''.
+
+        Returns:
+            float: Number in [0, 1)
+        """
+        digest = hashlib.blake2b(f"{salt}{config_path}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') / 2**64
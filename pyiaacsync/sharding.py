@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+import bisect
+import glob
+import hashlib
+import os
+import socket
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Default number of points on the hash ring for each shard, so that the config paths are spread evenly across the shards
+DEFAULT_VIRTUAL_NODES = 128
+
+# Infix of the state file of each shard e.g. `state.shard-1.yaml` for the shard `1` of `state.yaml`
+SHARD_STATE_FILE_INFIX = ".shard-"
+
+# Suffix of the lock file held on the state file of a shard
+LOCK_FILE_SUFFIX = ".lock"
+
+# Suffixes of the files kept next to a state file which are not state files themselves e.g. lock files, SQLite journals
+NON_STATE_FILE_SUFFIXES = (LOCK_FILE_SUFFIX, ".tmp", "-wal", "-shm", "-journal")
+
+class ShardLockedException(Exception):
+    """Exception generated when the state partition of a shard is locked by another worker
+    """
+    pass
+
+class HashRing:
+    """Class used to assign config paths to shards via consistent hashing: each shard is placed at several points on a ring of
+    hashes, and a config path belongs to the shard at the first point after the hash of the path. When a shard is added or
+    removed, only the config paths next to its points (about 1/N of them) move to another shard.
+    """
+    def __init__(self, shards, virtual_nodes=DEFAULT_VIRTUAL_NODES):
+        """Function to initialize the hash ring
+
+        Args:
+            shards (int|list): The names of the shards, or the number of shards in which case they are named `0` to `N-1`
+            virtual_nodes (int, optional): Number of points on the ring for each shard. Defaults to DEFAULT_VIRTUAL_NODES.
+        """
+        if isinstance(shards, int):
+            shards = range(shards)
+        self.shards = [str(shard) for shard in shards]
+        points = sorted([(self.__hash(f"{shard}#{i}"), shard) for shard in self.shards for i in range(virtual_nodes)])
+        self.hashes = [h for h, _ in points]
+        self.point_shards = [shard for _, shard in points]
+
+    def __hash(self, key):
+        """Hash a key onto the ring
+
+        Args:
+            key (str): The key
+
+        Returns:
+            int: Position of the key on the ring
+        """
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+    def get_shard(self, key):
+        """Get the shard that a key belongs to
+
+        Args:
+            key (str): The key e.g. a config path relative to the IAAC Sync folder
+
+        Returns:
+            str: Name of the shard
+        """
+        index = bisect.bisect(self.hashes, self.__hash(key)) % len(self.hashes)
+        return self.point_shards[index]
+
+class ShardLock:
+    """Class used to hold an exclusive lock on the state partition of a shard via a lock file, so that two workers never sync the
+    same shard at once. The lock is re-entrant within the same instance, and is released if the worker dies.
+    """
+    def __init__(self, lock_file):
+        """Function to initialize the lock
+
+        Args:
+            lock_file (str): Path to the lock file
+        """
+        self.lock_file = lock_file
+        self.fd = None
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Acquire the lock, without waiting
+
+        Raises:
+            ShardLockedException: The lock is held by another worker
+        """
+        with self.lock:
+            if self.count == 0:
+                if fcntl is None:
+                    raise ShardLockedException(f"Lock file: {self.lock_file} cannot be locked as file locks are not "
+                                               f"available on the platform")
+                fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    holder = os.read(fd, 1024).decode(errors='replace').strip()
+                    os.close(fd)
+                    raise ShardLockedException(f"Lock file: {self.lock_file} is locked by another worker: {holder}")
+
+                # Record the worker holding the lock, to help find it if the shard is reported as locked
+                os.ftruncate(fd, 0)
+                os.write(fd, f"{socket.gethostname()}:{os.getpid()}\n".encode())
+                self.fd = fd
+            self.count += 1
+
+    def release(self):
+        """Release the lock
+        """
+        with self.lock:
+            self.count -= 1
+            if self.count == 0:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+                os.close(self.fd)
+                self.fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+def shard_state_file(state_file, shard):
+    """Get the path of the state file for the partition of the state kept by a shard
+
+    Args:
+        state_file (str): The path of the state file, if it was not sharded
+        shard (str): Name of the shard
+
+    Returns:
+        str: The path of the state file of the shard
+    """
+    root, ext = os.path.splitext(state_file)
+    return f"{root}{SHARD_STATE_FILE_INFIX}{shard}{ext}"
+
+def find_shard_state_files(state_file):
+    """Find the state files of all the shards which have kept a partition of the state, incl. shards which have since been
+    removed
+
+    Args:
+        state_file (str): The path of the state file, if it was not sharded
+
+    Returns:
+        dict: The path of the state file of each shard
+    """
+    root, ext = os.path.splitext(state_file)
+    prefix = f"{root}{SHARD_STATE_FILE_INFIX}"
+    shard_state_files = {}
+    for path in glob.glob(f"{glob.escape(prefix)}*{glob.escape(ext)}"):
+        shard = path[len(prefix):len(path) - len(ext)]
+        if shard and not path.endswith(NON_STATE_FILE_SUFFIXES) and os.path.isfile(path):
+            shard_state_files[shard] = path
+    return shard_state_files
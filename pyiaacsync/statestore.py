@@ -0,0 +1,636 @@
+#!/usr/bin/env python
+import argparse
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import yaml
+
+from collections.abc import MutableMapping
+
+from .sharding import shard_state_file
+
+# Use the libyaml based loader and dumper when available, as they are much faster than the pure python ones
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+DESCRIPTION = "Manage the state of the assets synced by pyiaacsync"
+
+CHOICES_ACTION = [
+    'migrate',
+]
+
+HELP_ACTION = """
+Action to perform.
+
+migrate: To copy the state from a state file into a new state file of another format e.g. from YAML into SQLite
+"""
+
+# Magic bytes at the start of a binary state file, which include the version of the format
+BINARY_STATE_MAGIC = b"PYIAACS1"
+
+# Header of a binary state file after the magic bytes: number of records, length of the config path prefix
+BINARY_STATE_HEADER = struct.Struct("<II")
+
+# Header of each record in a binary state file: flags, length of the config path suffix, length of the asset ID, SHA256 digest,
+# stat (mtime_ns, size, inode), length of the JSON encoded extra fields
+BINARY_RECORD_HEADER = struct.Struct("<BII32sqQQI")
+
+# Flags describing which fields are set for a record in a binary state file
+BINARY_HAS_ASSET_ID = 0x01
+BINARY_ASSET_ID_JSON = 0x02
+BINARY_HAS_DIGEST = 0x04
+BINARY_HAS_STAT = 0x08
+BINARY_FULL_PATH = 0x10
+
+class StateRecord:
+    """Class which describes the asset tracked in the state for a config path. Fields are accessed like a dict e.g.
+    `record['asset_id']`, `record.get('hash')`. The hash is kept as the raw SHA256 digest, and any other fields are kept in
+    `extra`.
+    """
+    __slots__ = ('asset_id', 'digest', 'stat', 'extra')
+
+    def __init__(self, asset_id=None, digest=None, stat=None, extra=None):
+        """Function to initialize the record
+
+        Args:
+            asset_id (str, optional): ID of the asset created from the config. Defaults to None.
+            digest (bytes, optional): Raw SHA256 digest of the config, or empty if not hashed yet. Defaults to None.
+            stat (tuple, optional): The (mtime_ns, size, inode) of the config file when it was hashed. Defaults to None.
+            extra (dict, optional): Any other fields. Defaults to None.
+        """
+        self.asset_id = asset_id
+        self.digest = digest
+        self.stat = stat
+        self.extra = extra
+
+    def get(self, key, default=None):
+        """Get a field of the record
+
+        Args:
+            key (str): Name of the field e.g. `asset_id`, `hash`
+            default (object, optional): Value to return if the field is not set. Defaults to None.
+
+        Returns:
+            object: Value of the field, with the hash as a readable SHA256 hash
+        """
+        if key == 'asset_id':
+            return default if self.asset_id is None else self.asset_id
+        if key == 'hash':
+            if self.extra and 'hash' in self.extra:
+                return self.extra['hash']
+            return default if self.digest is None else self.digest.hex()
+        if key == 'stat':
+            return default if self.stat is None else self.stat
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, KeyError)
+        if value is KeyError:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == 'asset_id':
+            self.asset_id = value
+        elif key == 'hash':
+            self.__set_hash(value)
+        elif key == 'stat':
+            self.stat = tuple(value) if value is not None else None
+        elif value is None:
+            if self.extra:
+                self.extra.pop(key, None)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __set_hash(self, value):
+        """Set the hash of the record, kept as the raw digest if it is a readable SHA256 hash
+
+        Args:
+            value (str): The readable hash
+        """
+        try:
+            digest = bytes.fromhex(value)
+        except (TypeError, ValueError):
+            digest = None
+        if digest is not None and len(digest) in (0, 32):
+            self.digest = digest
+            if self.extra:
+                self.extra.pop('hash', None)
+        else:
+            self.digest = None
+            if self.extra is None:
+                self.extra = {}
+            self.extra['hash'] = value
+
+    def update(self, fields):
+        """Set several fields of the record
+
+        Args:
+            fields (dict): Fields to set
+        """
+        for key, value in fields.items():
+            self[key] = value
+
+    def to_dict(self):
+        """Describe the record as a dict, as kept in the YAML state file
+
+        Returns:
+            dict: The fields which are set
+        """
+        record = {}
+        if self.asset_id is not None:
+            record['asset_id'] = self.asset_id
+        if self.digest is not None:
+            record['hash'] = self.digest.hex()
+        if self.stat is not None:
+            record['stat'] = list(self.stat)
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    @classmethod
+    def from_dict(cls, fields):
+        """Create a record from a dict, as kept in the YAML state file
+
+        Args:
+            fields (dict): The fields of the record
+
+        Returns:
+            StateRecord: The record
+        """
+        record = cls()
+        record.update(fields or {})
+        return record
+
+def records_from_dicts(state):
+    """Convert a state read as a dict of dicts into a dict of records, interning the config paths
+
+    Args:
+        state (dict): The state with the config path as key and a dict of fields as value
+
+    Returns:
+        dict: The state with the config path as key and a `StateRecord` as value
+    """
+    return {sys.intern(config_path): StateRecord.from_dict(fields) for config_path, fields in state.items()}
+
+def records_to_dicts(state):
+    """Convert a state of records into a dict of dicts, as kept in the YAML state file
+
+    Args:
+        state (dict): The state with the config path as key and a `StateRecord` as value
+
+    Returns:
+        dict: The state with the config path as key and a dict of fields as value
+    """
+    return {config_path: record.to_dict() for config_path, record in state.items()}
+
+class StateStore:
+    """Class describing where the state of the assets synced by `IaacSync` is kept. The state is a dict with the config path as
+    key and a `StateRecord` describing the asset (e.g. asset ID, hash of the config) as value.
+    """
+    def __init__(self, state_file):
+        """Function to initialize the state store
+
+        Args:
+            state_file (str): The path of the state file
+        """
+        self.state_file = state_file
+
+    def exists(self):
+        """Check whether the state has been created
+
+        Returns:
+            bool: Whether the state file exists
+        """
+        return os.path.isfile(self.state_file)
+
+    def create(self, state):
+        """Create the state (replacing any existing state)
+
+        Args:
+            state (dict): The initial state
+        """
+        raise NotImplementedError
+
+    def read(self):
+        """Read the full state
+
+        Returns:
+            dict: The state OR None, if the state file does not exist
+        """
+        raise NotImplementedError
+
+    def write(self, state, changed_config_paths):
+        """Write the state
+
+        Args:
+            state (dict): The full state
+            changed_config_paths (set): The config paths which have been added, updated or removed in the state since it was
+                last read or written. Stores which can write incrementally only write these.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the state store
+        """
+        pass
+
+    def for_shard(self, shard):
+        """Get the state store for the partition of the state kept by a shard, when the config paths are sharded across 
+        several workers. State stores which take other settings must override this.
+
+        Args:
+            shard (str): Name of the shard
+
+        Returns:
+            StateStore: The state store of the shard
+        """
+        return type(self)(shard_state_file(self.state_file, shard))
+
+class YamlStateStore(StateStore):
+    """State store which keeps the whole state in a YAML file, re-written on every write
+    """
+    def create(self, state):
+        """Create the state file (replacing any existing state file)
+
+        Args:
+            state (dict): The initial state
+        """
+        with open(self.state_file, "w") as f:
+            if state:
+                yaml.dump(records_to_dicts(state), f, Dumper=SafeDumper)
+            else:
+                f.write('{}')
+
+    def read(self):
+        """Read the full state from the YAML file
+
+        Returns:
+            dict: The state OR None, if the state file does not exist
+        """
+        if not os.path.isfile(self.state_file):
+            return None
+        with open(self.state_file, "rb") as f:
+            return records_from_dicts(yaml.load(f, Loader=SafeLoader) or {})
+
+    def write(self, state, changed_config_paths):
+        """Write the full state to the YAML file, replacing it at once so that readers never see a partly written file
+
+        Args:
+            state (dict): The full state
+            changed_config_paths (set): Not used, as the whole file is re-written
+        """
+        tmp_state_file = f"{self.state_file}.tmp"
+        with open(tmp_state_file, "w") as f:
+            yaml.dump(records_to_dicts(state), f, Dumper=SafeDumper)
+        os.replace(tmp_state_file, self.state_file)
+
+class SqliteStateStore(StateStore):
+    """State store which keeps the state in an SQLite database with a row per config path, so that only the rows for the config
+    paths which have changed are written, in a single transaction
+    """
+    def __init__(self, state_file):
+        """Function to initialize the state store
+
+        Args:
+            state_file (str): The path of the SQLite database file
+        """
+        super().__init__(state_file)
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def __connect(self):
+        """Open the SQLite database, creating the state table if it does not exist
+
+        Returns:
+            sqlite3.Connection: Connection to the database
+        """
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.state_file, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS state (config_path TEXT PRIMARY KEY, record TEXT NOT NULL)")
+            self.conn.commit()
+        return self.conn
+
+    def create(self, state):
+        """Create the state table (replacing any existing state)
+
+        Args:
+            state (dict): The initial state
+        """
+        with self.lock:
+            conn = self.__connect()
+            with conn:
+                conn.execute("DELETE FROM state")
+                conn.executemany("INSERT INTO state (config_path, record) VALUES (?, ?)",
+                                 [(config_path, json.dumps(record.to_dict())) for config_path, record in state.items()])
+
+    def read(self):
+        """Read the full state from the SQLite database
+
+        Returns:
+            dict: The state OR None, if the database file does not exist
+        """
+        if not os.path.isfile(self.state_file):
+            return None
+        with self.lock:
+            conn = self.__connect()
+            return {sys.intern(config_path): StateRecord.from_dict(json.loads(record))
+                    for config_path, record in conn.execute("SELECT config_path, record FROM state")}
+
+    def write(self, state, changed_config_paths):
+        """Upsert the rows for the config paths which have changed and are still in the state, and delete the rest, in a single
+        transaction
+
+        Args:
+            state (dict): The full state
+            changed_config_paths (set): The config paths which have been added, updated or removed in the state
+        """
+        if not changed_config_paths:
+            return
+
+        upserts = []
+        deletes = []
+        for config_path in changed_config_paths:
+            if config_path in state:
+                upserts.append((config_path, json.dumps(state[config_path].to_dict())))
+            else:
+                deletes.append((config_path,))
+
+        with self.lock:
+            conn = self.__connect()
+            with conn:
+                conn.executemany("INSERT INTO state (config_path, record) VALUES (?, ?) "
+                                 "ON CONFLICT(config_path) DO UPDATE SET record = excluded.record", upserts)
+                conn.executemany("DELETE FROM state WHERE config_path = ?", deletes)
+
+    def close(self):
+        """Close the connection to the SQLite database
+        """
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+class BinaryState(MutableMapping):
+    """The state read from a binary state file, which is kept memory mapped. Only the offset of the record for each config path
+    is indexed when the file is read, and each record is decoded when it is first accessed, so that the records which are never
+    accessed (e.g. in a sync of only the changed configs) are never decoded. The records decoded are kept, along with any 
+    changes made to them. The records which were never decoded are copied as is when the state is written.
+    """
+    def __init__(self, state_map, prefix, offsets):
+        """Function to initialize the state
+
+        Args:
+            state_map (mmap): The memory mapped binary state file
+            prefix (bytes): The folder common to the config paths in the binary state file
+            offsets (dict): The offset of the record for each config path in the binary state file
+        """
+        self.state_map = state_map
+        self.prefix = prefix
+
+        # Offset of the record for each config path, or None for the config paths added since the state was read
+        self.offsets = offsets
+
+        # Records decoded or added since the state was read
+        self.records = {}
+
+    def __getitem__(self, config_path):
+        record = self.records.get(config_path)
+        if record is None:
+            offset = self.offsets[config_path]
+            record = self.__decode(offset)
+            self.records[config_path] = record
+        return record
+
+    def __setitem__(self, config_path, record):
+        self.records[config_path] = record
+        self.offsets.setdefault(config_path, None)
+
+    def __delitem__(self, config_path):
+        del self.offsets[config_path]
+        self.records.pop(config_path, None)
+
+    def __contains__(self, config_path):
+        return config_path in self.offsets
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get_encoded(self, config_path, prefix):
+        """Get the encoded record for a config path as kept in the binary state file, if it can be copied as is
+
+        Args:
+            config_path (str): Path to the config file
+            prefix (bytes): The folder common to the config paths in the binary state file to write
+
+        Returns:
+            bytes: The encoded record OR None, if the record has been decoded or the common folder has changed
+        """
+        if config_path in self.records or prefix != self.prefix:
+            return None
+        offset = self.offsets[config_path]
+        _, path_len, asset_id_len, _, _, _, _, extra_len = BINARY_RECORD_HEADER.unpack_from(self.state_map, offset)
+        return self.state_map[offset:offset + BINARY_RECORD_HEADER.size + path_len + asset_id_len + extra_len]
+
+    def __decode(self, offset):
+        """Decode the record at an offset of the binary state file
+
+        Args:
+            offset (int): Offset of the record
+
+        Returns:
+            StateRecord: The record
+        """
+        m = self.state_map
+        flags, path_len, asset_id_len, digest, mtime_ns, size, inode, extra_len = BINARY_RECORD_HEADER.unpack_from(m, offset)
+        offset += BINARY_RECORD_HEADER.size + path_len
+
+        record = StateRecord()
+        if flags & BINARY_HAS_ASSET_ID:
+            asset_id = m[offset:offset + asset_id_len].decode()
+            record.asset_id = json.loads(asset_id) if flags & BINARY_ASSET_ID_JSON else asset_id
+        offset += asset_id_len
+        if flags & BINARY_HAS_DIGEST:
+            record.digest = digest
+        elif digest[0]:
+            # Empty hash, for a config which has not been hashed yet
+            record.digest = b""
+        if flags & BINARY_HAS_STAT:
+            record.stat = (mtime_ns, size, inode)
+        if extra_len:
+            record.extra = json.loads(m[offset:offset + extra_len])
+        return record
+
+class BinaryStateStore(StateStore):
+    """State store which keeps a compact binary snapshot of the whole state, which is memory mapped when read so that each 
+    record is only decoded when accessed (see `BinaryState`). The config paths are kept relative to their common folder, and 
+    the hashes as raw SHA256 digests. The snapshot is re-written (atomically) on every write.
+    """
+    def create(self, state):
+        """Create the state file (replacing any existing state file)
+
+        Args:
+            state (dict): The initial state
+        """
+        self.write(state, set(state.keys()))
+
+    def read(self):
+        """Read the state from the binary state file via mmap, indexing the offset of the record for each config path
+
+        Raises:
+            ValueError: The state file is not a binary state file
+
+        Returns:
+            BinaryState: The state OR None, if the state file does not exist
+        """
+        if not os.path.isfile(self.state_file):
+            return None
+
+        with open(self.state_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"State file: {self.state_file} is not a binary state file")
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if m[:len(BINARY_STATE_MAGIC)] != BINARY_STATE_MAGIC:
+            m.close()
+            raise ValueError(f"State file: {self.state_file} is not a binary state file")
+        offset = len(BINARY_STATE_MAGIC)
+        num_records, prefix_len = BINARY_STATE_HEADER.unpack_from(m, offset)
+        offset += BINARY_STATE_HEADER.size
+        prefix = m[offset:offset + prefix_len]
+        offset += prefix_len
+
+        offsets = {}
+        decoded_prefix = prefix.decode()
+        for _ in range(num_records):
+            flags, path_len, asset_id_len, _, _, _, _, extra_len = BINARY_RECORD_HEADER.unpack_from(m, offset)
+            path_offset = offset + BINARY_RECORD_HEADER.size
+            config_path = m[path_offset:path_offset + path_len].decode()
+            if not flags & BINARY_FULL_PATH:
+                config_path = decoded_prefix + config_path
+            offsets[sys.intern(config_path)] = offset
+            offset = path_offset + path_len + asset_id_len + extra_len
+        return BinaryState(m, prefix, offsets)
+
+    def write(self, state, changed_config_paths):
+        """Write the full state to the binary state file, via a temporary file which replaces the state file. The records of a 
+        `BinaryState` which were never decoded are copied as is
+
+        Args:
+            state (dict): The full state
+            changed_config_paths (set): Not used, as the whole file is re-written
+        """
+        # Find the folder common to the config paths, ignoring any keys which are not paths (e.g. the sync metadata)
+        config_paths = list(state.keys())
+        folder_paths = [config_path for config_path in config_paths if os.sep in config_path]
+        prefix = os.path.dirname(os.path.commonprefix(folder_paths)) if folder_paths else ''
+        if prefix:
+            prefix += os.sep
+        encoded_prefix = prefix.encode()
+
+        chunks = [BINARY_STATE_MAGIC, BINARY_STATE_HEADER.pack(len(config_paths), len(encoded_prefix)), encoded_prefix]
+        for config_path in config_paths:
+            if isinstance(state, BinaryState):
+                encoded = state.get_encoded(config_path, encoded_prefix)
+                if encoded is not None:
+                    chunks.append(encoded)
+                    continue
+            record = state[config_path]
+
+            flags = 0
+            if config_path.startswith(prefix):
+                path = config_path[len(prefix):].encode()
+            else:
+                flags |= BINARY_FULL_PATH
+                path = config_path.encode()
+            asset_id = b""
+            if record.asset_id is not None:
+                flags |= BINARY_HAS_ASSET_ID
+                if isinstance(record.asset_id, str):
+                    asset_id = record.asset_id.encode()
+                else:
+                    flags |= BINARY_ASSET_ID_JSON
+                    asset_id = json.dumps(record.asset_id).encode()
+
+            # An empty hash is marked by a digest starting with a non-zero byte, without the digest flag
+            digest = b"\1"
+            if record.digest:
+                flags |= BINARY_HAS_DIGEST
+                digest = record.digest
+            elif record.digest is None:
+                digest = b""
+
+            mtime_ns, size, inode = 0, 0, 0
+            if record.stat is not None:
+                flags |= BINARY_HAS_STAT
+                mtime_ns, size, inode = record.stat
+
+            extra = json.dumps(record.extra).encode() if record.extra else b""
+            chunks.append(BINARY_RECORD_HEADER.pack(flags, len(path), len(asset_id), digest, mtime_ns, size, inode, len(extra)))
+            chunks.extend([path, asset_id, extra])
+
+        tmp_state_file = f"{self.state_file}.tmp"
+        with open(tmp_state_file, "wb") as f:
+            f.write(b"".join(chunks))
+        os.replace(tmp_state_file, self.state_file)
+
+# State stores which can be selected by name e.g. when migrating the state
+STATE_STORES = {
+    'yaml': YamlStateStore,
+    'sqlite': SqliteStateStore,
+    'binary': BinaryStateStore,
+}
+
+def migrate_state(source, state_store):
+    """Copy the state from an existing state file into another state store e.g. `SqliteStateStore`
+
+    Args:
+        source (str|StateStore): Path to the existing YAML state file, or the state store to copy the state from
+        state_store (StateStore): The state store to copy the state into
+
+    Raises:
+        FileNotFoundError: When the existing state file is not found
+    """
+    if not isinstance(source, StateStore):
+        source = YamlStateStore(source)
+    state = source.read()
+    if state is None:
+        raise FileNotFoundError(f"State file: {source.state_file} not found")
+    state_store.create(state)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument('-a', '--action', required=True, choices=CHOICES_ACTION, help=HELP_ACTION)
+    parser.add_argument('-s', '--state-file', required=True, help="Existing state file")
+    parser.add_argument('-i', '--state-format', default='yaml', choices=list(STATE_STORES.keys()),
+                        help="Format of the existing state file")
+    parser.add_argument('-o', '--out-state-file', required=True, help="State file to create")
+    parser.add_argument('-t', '--out-state-format', default='sqlite', choices=list(STATE_STORES.keys()),
+                        help="Format of the state file to create")
+    parser.add_argument('-f', '--force', action='store_true', help="Replace the state file to create even if it already exists")
+    args = parser.parse_args()
+
+    if args.action == 'migrate':
+        state_store = STATE_STORES[args.out_state_format](args.out_state_file)
+        if state_store.exists() and not args.force:
+            parser.error(f"State file: {args.out_state_file} already exists. Use `--force` flag to replace it")
+        source = STATE_STORES[args.state_format](args.state_file)
+        migrate_state(source, state_store)
+        source.close()
+        state_store.close()
+        print(f"Migrated state from {args.state_file} to {args.out_state_file}")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+import hashlib
+import inspect
+import json
+import os
+from collections import namedtuple
+
+# Version of the format of the validation cache file
+VALIDATION_CACHE_VERSION = 1
+
+# A config file which failed validation, along with the class name and message of the error
+ValidationFailure = namedtuple('ValidationFailure', ['config_path', 'error_class', 'error_message'])
+
+class ValidationReport:
+    """Class which describes the outcome of validating ALL the config files: the number of config files validated, how many
+    of them passed as per the validation cache, and each config file which failed
+    """
+    def __init__(self):
+        """Function to initialize the report
+        """
+        self.validated = 0
+        self.cached = 0
+        self.failures = []
+
+    def is_valid(self):
+        """Check whether all the config files passed validation
+
+        Returns:
+            bool: Whether no config file failed
+        """
+        return not self.failures
+
+    def add_failure(self, config_path, error):
+        """Record a config file which failed validation
+
+        Args:
+            config_path (str): Path to the config file
+            error (Exception|tuple): The error raised, or its class name and message
+        """
+        if isinstance(error, Exception):
+            error = (error.__class__.__name__, str(error))
+        self.failures.append(ValidationFailure(config_path, *error))
+
+    def summary(self):
+        """Describe the outcome of the validation, with a line for each config file which failed
+
+        Returns:
+            str: The summary
+        """
+        lines = [f"Validated {self.validated} config files ({self.cached} unchanged since they last passed), "
+                 f"{len(self.failures)} failed"]
+        for failure in sorted(self.failures):
+            lines.append(f"  {failure.config_path}: {failure.error_class}: {failure.error_message}")
+        return "\n".join(lines)
+
+class ValidationCache:
+    """Class used to remember the config files which passed validation, by the hash of their contents along with the version
+    of the validators, so that they are not validated again until either changes
+    """
+    def __init__(self, cache_file):
+        """Function to initialize the cache
+
+        Args:
+            cache_file (str): Path to the JSON file in which the cache is kept
+        """
+        self.cache_file = cache_file
+
+    def read(self):
+        """Read the keys of the config files which passed validation
+
+        Returns:
+            set: The keys, or none if the cache file does not exist or cannot be read
+        """
+        try:
+            with open(self.cache_file, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        if not isinstance(cache, dict) or cache.get('version') != VALIDATION_CACHE_VERSION:
+            return set()
+        return set(cache.get('passed') or [])
+
+    def write(self, keys):
+        """Write the keys of the config files which passed validation, replacing the cache file at once
+
+        Args:
+            keys (set): The keys
+        """
+        tmp_cache_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(tmp_cache_file, "w") as f:
+            json.dump({'version': VALIDATION_CACHE_VERSION, 'passed': sorted(keys)}, f)
+        os.replace(tmp_cache_file, self.cache_file)
+
+def get_validator_version(asset_classes, args):
+    """Get the version of the validators, which changes whenever the validation of a config could have a different outcome:
+    the `validator_version` attribute of each asset class if set (e.g. the version of its schemas), or else the source of its
+    `validate` method, along with the args passed to it
+
+    Args:
+        asset_classes (dict): The asset class for each kind of asset
+        args (dict): Any additional optional args which would get passed to the `validate` method
+
+    Returns:
+        str: The version, as a readable SHA256 hash
+    """
+    version = hashlib.sha256()
+    for kind, asset_class in sorted(asset_classes.items(), key=lambda item: str(item[0])):
+        asset_version = getattr(asset_class, 'validator_version', None)
+        if asset_version is None:
+            validate = getattr(asset_class, 'validate', None)
+            try:
+                asset_version = inspect.getsource(validate)
+            except (OSError, TypeError):
+                asset_version = getattr(validate, '__qualname__', repr(validate))
+        version.update(f"{kind}\0{asset_class.__module__}.{asset_class.__qualname__}\0{asset_version}\0".encode())
+    version.update(repr(sorted(args.items(), key=lambda item: item[0])).encode())
+    return version.hexdigest()
+
+def get_cache_key(validator_version, config_bytes, route):
+    """Get the key of a config file in the validation cache
+
+    Args:
+        validator_version (str): The version of the validators
+        config_bytes (bytes): Contents of the config file
+        route (str): Anything else the outcome depends on e.g. the sub-folder which routes the config to a kind of asset
+
+    Returns:
+        str: The key
+    """
+    config_hash = hashlib.sha256(config_bytes).hexdigest()
+    return hashlib.sha256(f"{validator_version}\0{route}\0{config_hash}".encode()).hexdigest()
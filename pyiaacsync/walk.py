@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+import os
+
+def walk_files(folder):
+    """Walk a folder and all its sub-folders via `os.scandir`, yielding each file as soon as it is found. Unlike `os.walk`, the
+    names of the files in a folder are never collected into a list, so only the sub-folders still to walk are held in memory,
+    however many files the folder has. Symlinks to folders are not followed, and folders which cannot be read are skipped.
+
+    Args:
+        folder (str): The folder to walk
+
+    Yields:
+        str: Path to each file in the folder e.g. `<folder>/rules/rule-1.yaml`
+    """
+    dir_paths = [folder]
+    while dir_paths:
+        dir_path = dir_paths.pop()
+        try:
+            entries = os.scandir(dir_path)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    yield entry.path
+                elif not entry.is_symlink():
+                    dir_paths.append(entry.path)
@@ -21,7 +21,7 @@ with open('README.md', 'r') as f:
 setup(
     name="pyiaacsync",
     version="0.8",
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests', 'tests.*']),
     install_requires=requirements,
     description=project_description,
     long_description=description,
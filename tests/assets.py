@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+import itertools
+import threading
+
+class MemoryAsset:
+    """An asset class which keeps the assets in memory as `remote`, and records each call made to it in `calls` as a tuple of
+    the method name and its first argument. Instances are passed to `IaacSync` in place of an asset class, so that each test has
+    its own assets. Set `errors` to make the next calls to a method raise, e.g. `{'create': [RuntimeError('down')]}`.
+    """
+    def __init__(self):
+        self.remote = {}
+        self.calls = []
+        self.errors = {}
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+
+    def record(self, operation, arg=None):
+        """Record a call to the asset class, raising the next error set for the method if any
+
+        Args:
+            operation (str): Name of the method called
+            arg (object, optional): First argument of the call. Defaults to None.
+
+        Raises:
+            Exception: The next error set for the method in `errors`
+        """
+        with self.lock:
+            self.calls.append((operation, arg))
+            errors = self.errors.get(operation)
+            if errors:
+                raise errors.pop(0)
+
+    def count(self, operation):
+        """Count the calls made to a method
+
+        Args:
+            operation (str): Name of the method
+
+        Returns:
+            int: Number of calls
+        """
+        return len([call for call in self.calls if call[0] == operation])
+
+    def validate(self, config, **args):
+        self.record('validate', config.get('name'))
+        return 'name' in config
+
+    def check(self, asset_id, config, **args):
+        self.record('check', asset_id)
+        return self.remote.get(asset_id) == config
+
+    def create(self, config, **args):
+        self.record('create', config.get('name'))
+        asset_id = f"{config['name']}-{next(self.ids)}"
+        self.remote[asset_id] = config
+        return asset_id
+
+    def update(self, asset_id, config, **args):
+        self.record('update', asset_id)
+        if asset_id not in self.remote:
+            return False
+        self.remote[asset_id] = config
+        return True
+
+    def delete(self, asset_id, **args):
+        self.record('delete', asset_id)
+        self.remote.pop(asset_id, None)
+        return True
+
+class AsyncMemoryAsset(MemoryAsset):
+    """The in-memory asset class with `async def` methods, so that the sync is driven through an event loop
+    """
+    async def validate(self, config, **args):
+        return MemoryAsset.validate(self, config, **args)
+
+    async def check(self, asset_id, config, **args):
+        return MemoryAsset.check(self, asset_id, config, **args)
+
+    async def create(self, config, **args):
+        return MemoryAsset.create(self, config, **args)
+
+    async def update(self, asset_id, config, **args):
+        return MemoryAsset.update(self, asset_id, config, **args)
+
+    async def delete(self, asset_id, **args):
+        return MemoryAsset.delete(self, asset_id, **args)
+
+class BatchMemoryAsset(MemoryAsset):
+    """The in-memory asset class with the batch methods, recording each batch call with the number of items
+    """
+    def check_many(self, items, **args):
+        self.record('check_many', len(items))
+        return [self.remote.get(asset_id) == config for asset_id, config in items]
+
+    def create_many(self, configs, **args):
+        self.record('create_many', len(configs))
+        return [MemoryAsset.create(self, config) for config in configs]
+
+    def delete_many(self, asset_ids, **args):
+        self.record('delete_many', len(asset_ids))
+        return [MemoryAsset.delete(self, asset_id) for asset_id in asset_ids]
+
+class FingerprintedMemoryAsset(MemoryAsset):
+    """The in-memory asset class keeping a version for each asset, which is returned by `fingerprint` and `list`
+    """
+    def __init__(self):
+        super().__init__()
+        self.versions = {}
+
+    def create(self, config, **args):
+        asset_id = super().create(config, **args)
+        self.versions[asset_id] = 1
+        return asset_id
+
+    def update(self, asset_id, config, **args):
+        is_updated = super().update(asset_id, config, **args)
+        if is_updated:
+            self.versions[asset_id] += 1
+        return is_updated
+
+    def change(self, asset_id, config):
+        """Change an asset in the background, as if changed out-of-band
+
+        Args:
+            asset_id (str): ID of the asset
+            config (dict): The config the asset now has
+        """
+        self.remote[asset_id] = config
+        self.versions[asset_id] += 1
+
+    def fingerprint(self, asset_id, **args):
+        self.record('fingerprint', asset_id)
+        return self.versions.get(asset_id)
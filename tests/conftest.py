@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+import os
+
+import pytest
+import yaml
+
+from pyiaacsync import pyiaacsync
+
+@pytest.fixture
+def conf_folder(tmp_path):
+    """The IAAC Sync folder, empty until configs are written to it via `write_config`
+    """
+    folder = tmp_path / "conf"
+    folder.mkdir()
+    return str(folder)
+
+@pytest.fixture
+def state_file(tmp_path):
+    """Path to the YAML state file, created by the first `sync`
+    """
+    return str(tmp_path / "state.yaml")
+
+@pytest.fixture
+def write_config(conf_folder):
+    """Write a config file to the IAAC Sync folder, returning its path
+    """
+    def write_config(config_path, config):
+        config_path = os.path.join(conf_folder, config_path)
+        os.makedirs(os.path.dirname(config_path), exist_ok=True)
+        with open(config_path, "w") as f:
+            yaml.safe_dump(config, f)
+        return config_path
+    return write_config
+
+@pytest.fixture
+def sync(conf_folder, state_file):
+    """Sync the IAAC Sync folder via an asset class, creating the state first if needed. Any settings of `IaacSync` can be
+    passed, incl. another `state_file`.
+    """
+    def sync(asset, state_file=state_file, **kwargs):
+        if not os.path.exists(getattr(state_file, 'state_file', state_file)):
+            pyiaacsync.IaacSync(conf_folder, state_file, asset, init=True)
+        return pyiaacsync.IaacSync(conf_folder, state_file, asset, **kwargs)
+    return sync
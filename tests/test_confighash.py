@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import datetime
+
+from pyiaacsync.configdiff import ConfigDiff, diff_configs, restore_config, snapshot_config
+from pyiaacsync.confighash import RAW_HASH_MODE, SEMANTIC_HASH_MODE, calculate_hash, canonicalize
+
+from .assets import MemoryAsset
+
+class DiffedMemoryAsset(MemoryAsset):
+    """The in-memory asset class recording the config diff passed to each update
+    """
+    def __init__(self):
+        super().__init__()
+        self.config_diffs = []
+
+    def update(self, asset_id, config, config_diff=None, **args):
+        self.config_diffs.append(config_diff)
+        return super().update(asset_id, config, **args)
+
+def write_raw_config(conf_folder, text):
+    """Write the text of a config file as is, to control its formatting
+
+    Args:
+        conf_folder (str): The IAAC Sync folder
+        text (str): Contents of the config file
+    """
+    with open(f"{conf_folder}/config.yaml", "w") as f:
+        f.write(text)
+
+def test_semantic_hash_ignores_formatting_key_order_and_comments():
+    config = {'name': 'asset', 'settings': {'count': 1, 'enabled': True}}
+    reordered = {'settings': {'enabled': True, 'count': 1}, 'name': 'asset'}
+    assert calculate_hash(b"a", config, SEMANTIC_HASH_MODE) == calculate_hash(b"b", reordered, SEMANTIC_HASH_MODE)
+    assert calculate_hash(b"a", config, SEMANTIC_HASH_MODE) != calculate_hash(b"a", {'name': 'other'}, SEMANTIC_HASH_MODE)
+    assert calculate_hash(b"a", config, RAW_HASH_MODE) != calculate_hash(b"b", config, RAW_HASH_MODE)
+
+def test_canonical_form_tags_values_json_cannot_describe():
+    assert canonicalize({1: 'a', '!key': {'b', 'a'}}) == {'!map': [['!key', {'!set': ['a', 'b']}], [1, 'a']]}
+    assert canonicalize(datetime.date(2024, 1, 2)) == {'!timestamp': '2024-01-02'}
+    assert canonicalize({'!key': b"\0"}) == {'!!key': {'!binary': 'AA=='}}
+
+def test_semantic_hash_mode_does_not_update_reformatted_configs(sync, conf_folder):
+    asset = MemoryAsset()
+    write_raw_config(conf_folder, "name: asset\nvalue: 1\n")
+    sync(asset, hash_mode=SEMANTIC_HASH_MODE)
+    write_raw_config(conf_folder, "# A comment\nvalue: 1\nname:   'asset'\n__pyiaacsync__:\n  check_interval: 60\n")
+    sync(asset, hash_mode=SEMANTIC_HASH_MODE)
+    assert asset.count('update') == 0 and asset.count('create') == 1
+
+    write_raw_config(conf_folder, "name: asset\nvalue: 2\n")
+    sync(asset, hash_mode=SEMANTIC_HASH_MODE)
+    assert asset.count('update') == 1
+
+def test_switching_hash_mode_migrates_hashes_without_updates(sync, write_config):
+    asset = MemoryAsset()
+    config_path = write_config("config.yaml", {'name': 'asset'})
+    raw_hash = sync(asset).state[config_path]['hash']
+    state = sync(asset, hash_mode=SEMANTIC_HASH_MODE).state
+    assert state[config_path]['hash'] != raw_hash
+    assert asset.count('update') == 0 and asset.count('create') == 1
+
+def test_diff_configs_finds_added_removed_and_changed_keys():
+    diff = diff_configs({'name': 'a', 'settings': {'count': 1, 'old': True}, 'tags': [1]},
+                        {'name': 'a', 'settings': {'count': 2, 'new': 'x'}, 'tags': [1, 2]})
+    assert diff == ConfigDiff(added={('settings', 'new'): 'x'}, removed={('settings', 'old'): True},
+                              changed={('settings', 'count'): (1, 2), ('tags',): ([1], [1, 2])})
+    assert diff.paths() == [('settings', 'count'), ('settings', 'new'), ('settings', 'old'), ('tags',)]
+    assert not diff_configs({'name': 'a'}, {'name': 'a'})
+
+def test_config_snapshot_round_trips():
+    config = {'name': 'asset', 'settings': {'count': 1}, 'tags': ['a', 'b']}
+    assert restore_config(snapshot_config(config)) == config
+
+def test_update_is_passed_the_config_diff(sync, write_config):
+    asset = DiffedMemoryAsset()
+    write_config("config.yaml", {'name': 'asset', 'value': 1})
+    sync(asset, config_diffs=True)
+    write_config("config.yaml", {'name': 'asset', 'value': 2})
+    sync(asset, config_diffs=True)
+    assert asset.config_diffs == [ConfigDiff(changed={('value',): (1, 2)})]
+
+    # An asset which drifted from an unchanged config is updated with the whole config
+    asset_id = list(asset.remote)[0]
+    asset.remote[asset_id] = {'name': 'drifted'}
+    sync(asset, config_diffs=True)
+    assert asset.config_diffs[-1] is None and asset.remote[asset_id] == {'name': 'asset', 'value': 2}
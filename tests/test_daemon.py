@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from pyiaacsync import pyiaacsync
+from pyiaacsync.inotify import InotifyNotAvailable, InotifyWatcher
+
+from .assets import MemoryAsset
+
+# Seconds to wait for further changes in the daemon under test, long enough for the changes made by a test to be one burst
+DEBOUNCE = 0.3
+
+# Maximum seconds to wait for the daemon to sync a change
+TIMEOUT = 10
+
+def is_inotify_available(folder):
+    """Check whether the folders can be watched via inotify on this platform
+
+    Args:
+        folder (str): A folder to try watching
+
+    Returns:
+        bool: True, if inotify is available
+    """
+    try:
+        InotifyWatcher(folder).close()
+    except InotifyNotAvailable:
+        return False
+    return True
+
+def wait_for(condition):
+    """Wait until a condition holds
+
+    Args:
+        condition (func): Function of format `def condition()` returning True once the condition holds
+
+    Raises:
+        AssertionError: The condition does not hold after TIMEOUT seconds
+    """
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the daemon"
+        time.sleep(0.05)
+
+class RecordingWatcher(InotifyWatcher):
+    """The inotify watcher, keeping the instances created so that the tests can reach the watcher of a daemon
+    """
+    instances = []
+
+    def __init__(self, folder):
+        InotifyWatcher.__init__(self, folder)
+        RecordingWatcher.instances.append(self)
+
+@pytest.fixture
+def daemon(conf_folder, state_file, monkeypatch):
+    """Start `run_forever` in a thread via an asset class, once the configs already written have been synced by the first
+    full sync, and stop it at the end of the test
+    """
+    if not is_inotify_available(conf_folder):
+        pytest.skip("inotify is not available")
+    RecordingWatcher.instances = []
+    monkeypatch.setattr(pyiaacsync, 'InotifyWatcher', RecordingWatcher)
+    daemons = []
+
+    def daemon(asset, **kwargs):
+        pyiaacsync.IaacSync(conf_folder, state_file, asset, init=True)
+        instance = pyiaacsync.IaacSync(conf_folder, state_file, asset, run_on_init=False, **kwargs)
+        thread = threading.Thread(target=instance.run_forever, kwargs={'debounce': DEBOUNCE, 'full_sync_interval': 3600})
+        thread.start()
+        daemons.append((instance, thread))
+        wait_for(lambda: get_cycles(instance, 'sync') == 1)
+        return instance
+
+    yield daemon
+    for instance, thread in daemons:
+        instance.stop()
+        thread.join(TIMEOUT)
+
+def get_cycles(instance, action):
+    """Count the sync cycles run by an instance
+
+    Args:
+        instance (IaacSync): The instance
+        action (str): The action of the cycles e.g. `sync`, `sync_changed`
+
+    Returns:
+        int: Number of cycles
+    """
+    return instance.metrics.get('pyiaacsync_cycles_total', action=action) or 0
+
+def test_daemon_syncs_a_burst_of_changes_once(daemon, write_config):
+    asset = MemoryAsset()
+    instance = daemon(asset)
+    for i in range(5):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    wait_for(lambda: asset.count('create') == 5)
+    time.sleep(DEBOUNCE * 2)
+    assert get_cycles(instance, 'sync_changed') == 1
+
+def test_daemon_syncs_a_change_without_a_full_sync(daemon, write_config):
+    asset = MemoryAsset()
+    write_config("config0.yaml", {'name': 'asset0'})
+    write_config("config1.yaml", {'name': 'asset1'})
+    instance = daemon(asset)
+    assert asset.count('create') == 2
+
+    asset.calls.clear()
+    write_config("config0.yaml", {'name': 'asset0', 'value': 1})
+    wait_for(lambda: asset.count('update') == 1)
+    assert get_cycles(instance, 'sync') == 1
+    assert [asset_id for operation, asset_id in asset.calls if operation == 'validate'] == ['asset0']
+    assert [config for config in asset.remote.values() if config['name'] == 'asset0'] == [{'name': 'asset0', 'value': 1}]
+
+def test_daemon_deletes_the_assets_of_removed_configs(daemon, write_config, conf_folder):
+    asset = MemoryAsset()
+    config_path = write_config("config0.yaml", {'name': 'asset0'})
+    write_config("folder/config1.yaml", {'name': 'asset1'})
+    write_config("folder/sub/config2.yaml", {'name': 'asset2'})
+    write_config("config3.yaml", {'name': 'asset3'})
+    instance = daemon(asset)
+    assert len(asset.remote) == 4
+
+    os.remove(config_path)
+    wait_for(lambda: asset.count('delete') == 1)
+    shutil.rmtree(os.path.join(conf_folder, "folder"))
+    wait_for(lambda: asset.count('delete') == 3)
+    assert [config['name'] for config in asset.remote.values()] == ['asset3']
+    assert sorted(instance.state) == [os.path.join(conf_folder, "config3.yaml"), pyiaacsync.STATE_METADATA_KEY]
+    assert get_cycles(instance, 'sync') == 1
+
+def test_daemon_keeps_watching_a_moved_folder(daemon, write_config, conf_folder, tmp_path):
+    asset = MemoryAsset()
+    write_config("folder/sub/config0.yaml", {'name': 'asset0'})
+    instance = daemon(asset)
+
+    # The assets of the moved folder are recreated from their config files under the new path
+    os.rename(os.path.join(conf_folder, "folder"), os.path.join(conf_folder, "moved"))
+    wait_for(lambda: asset.count('delete') == 1 and asset.count('create') == 2)
+    moved_config_path = os.path.join(conf_folder, "moved", "sub", "config0.yaml")
+    assert sorted(instance.state) == [moved_config_path, pyiaacsync.STATE_METADATA_KEY]
+
+    # Changes in the moved folder and its sub-folders are still seen
+    write_config("moved/sub/config0.yaml", {'name': 'asset0', 'value': 1})
+    wait_for(lambda: asset.count('update') == 1)
+    write_config("moved/config1.yaml", {'name': 'asset1'})
+    wait_for(lambda: asset.count('create') == 3)
+
+    # A folder moved out of the IAAC Sync folder is no longer watched
+    os.rename(os.path.join(conf_folder, "moved"), str(tmp_path / "outside"))
+    wait_for(lambda: asset.count('delete') == 3)
+    watcher = RecordingWatcher.instances[0]
+    assert sorted(watcher.watches.values()) == [conf_folder]
+    assert get_cycles(instance, 'sync') == 1
+
+def test_daemon_runs_a_full_sync_when_changes_are_missed(daemon, write_config):
+    asset = MemoryAsset()
+    write_config("config0.yaml", {'name': 'asset0'})
+    instance = daemon(asset)
+
+    # The asset is removed without any change to its config file, so that only a full sync recreates it
+    asset.remote.clear()
+    RecordingWatcher.instances[0].overflowed = True
+    wait_for(lambda: get_cycles(instance, 'sync') == 2)
+    wait_for(lambda: len(asset.remote) == 1)
+    assert get_cycles(instance, 'sync_changed') == 0
+
+def test_daemon_stops(daemon):
+    asset = MemoryAsset()
+    instance = daemon(asset)
+    instance.stop()
+
+    # The watcher is closed once `run_forever` returns
+    wait_for(lambda: RecordingWatcher.instances[0].fd == -1)
+    assert get_cycles(instance, 'sync') == 1
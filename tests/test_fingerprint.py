@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+import pytest
+
+from pyiaacsync.pyiaacsync import FingerprintedResult
+
+from .assets import FingerprintedMemoryAsset, MemoryAsset
+
+class ListedMemoryAsset(FingerprintedMemoryAsset):
+    """The in-memory asset class which lists the fingerprints of all its assets, one page at a time
+    """
+    def list(self, **args):
+        self.record('list')
+        for asset_id, version in list(self.versions.items()):
+            if asset_id in self.remote:
+                yield asset_id, version
+
+class ReturningFingerprintMemoryAsset(FingerprintedMemoryAsset):
+    """The in-memory asset class returning the fingerprint of each asset it creates or updates
+    """
+    def create(self, config, **args):
+        asset_id = super().create(config, **args)
+        return FingerprintedResult(asset_id, self.versions[asset_id])
+
+    def update(self, asset_id, config, **args):
+        is_updated = super().update(asset_id, config, **args)
+        return FingerprintedResult(is_updated, self.versions.get(asset_id))
+
+def test_unchanged_fingerprint_skips_the_check(sync, write_config):
+    asset = FingerprintedMemoryAsset()
+    write_config("config.yaml", {'name': 'asset'})
+    sync(asset)
+
+    # The fingerprint is kept once the asset is checked, after which the check is skipped while it is unchanged
+    asset.calls.clear()
+    sync(asset)
+    assert [call[0] for call in asset.calls if call[0] != 'validate'] == ['fingerprint', 'check']
+    asset.calls.clear()
+    sync(asset)
+    assert [call[0] for call in asset.calls if call[0] != 'validate'] == ['fingerprint']
+
+    asset_id = list(asset.remote)[0]
+    asset.change(asset_id, {'name': 'drifted'})
+    asset.calls.clear()
+    sync(asset)
+    assert [call[0] for call in asset.calls if call[0] != 'validate'] == ['fingerprint', 'check', 'update']
+    assert asset.remote[asset_id] == {'name': 'asset'}
+
+def test_fingerprint_returned_by_create_skips_the_first_check(sync, write_config):
+    asset = ReturningFingerprintMemoryAsset()
+    config_path = write_config("config.yaml", {'name': 'asset'})
+    state = sync(asset).state
+    assert state[config_path]['fingerprint'] == '1'
+    asset.calls.clear()
+    sync(asset)
+    assert asset.count('check') == 0 and asset.count('fingerprint') == 1
+
+def test_listed_assets_are_only_checked_when_their_fingerprint_changed(sync, write_config):
+    asset = ListedMemoryAsset()
+    for i in range(4):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    sync(asset)
+    sync(asset)
+
+    asset_ids = sorted(asset.remote)
+    asset.change(asset_ids[0], {'name': 'drifted'})
+    del asset.remote[asset_ids[1]]
+    asset.remote['manual'] = {'name': 'manual'}
+    asset.versions['manual'] = 1
+    asset.calls.clear()
+    instance = sync(asset)
+    assert asset.count('list') == 1 and asset.count('fingerprint') == 0
+    assert [call[1] for call in asset.calls if call[0] == 'check'] == [asset_ids[0]]
+    assert [call[1] for call in asset.calls if call[0] == 'create'] == ['asset1']
+    assert instance.get_untracked_assets() == {None: ['manual']}
+
+def test_assets_missing_from_the_list_are_created_again_without_a_check(sync, write_config):
+    asset = ListedMemoryAsset()
+    config_path = write_config("config.yaml", {'name': 'asset'})
+    asset_id = sync(asset).state[config_path]['asset_id']
+    del asset.remote[asset_id]
+    asset.calls.clear()
+    state = sync(asset).state
+    assert [call[0] for call in asset.calls if call[0] != 'validate'] == ['list', 'create']
+    assert state[config_path]['asset_id'] != asset_id and asset.remote == {state[config_path]['asset_id']: {'name': 'asset'}}
+
+def test_untracked_assets_are_reported_for_each_kind_which_lists_its_assets(sync, write_config):
+    rules = ListedMemoryAsset()
+    sources = MemoryAsset()
+    write_config("rules/rule.yaml", {'name': 'rule'})
+    write_config("sources/source.yaml", {'name': 'source'})
+    sync({'rules': rules, 'sources': sources})
+
+    # The untracked assets are left as is
+    rules.remote['manual'] = {'name': 'manual'}
+    rules.versions['manual'] = 1
+    sources.remote['other'] = {'name': 'other'}
+    instance = sync({'rules': rules, 'sources': sources})
+    assert instance.get_untracked_assets() == {'rules': ['manual']}
+    assert instance.metrics.get('pyiaacsync_untracked_assets', kind='rules') == 1
+    assert 'manual' in rules.remote and rules.count('delete') == 0
+
+    del rules.remote['manual']
+    instance = sync({'rules': rules, 'sources': sources})
+    assert instance.get_untracked_assets() == {'rules': []}
+    assert instance.metrics.get('pyiaacsync_untracked_assets', kind='rules') == 0
+
+def test_listing_error_falls_back_to_checking_each_asset(sync, write_config):
+    asset = ListedMemoryAsset()
+    for i in range(3):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    sync(asset)
+    sync(asset)
+
+    # Without the list, the missing asset is found by its fingerprint, and the other assets are in sync as per theirs
+    asset_ids = sorted(asset.remote)
+    del asset.remote[asset_ids[0]]
+    del asset.versions[asset_ids[0]]
+    asset.errors['list'] = [RuntimeError('list down')]
+    asset.calls.clear()
+    errors = []
+    instance = sync(asset, continue_sync_on_error=True, 
+                    callback_on_sync_error=lambda err_class, err_msg: errors.append((err_class, err_msg)))
+    assert errors == [(RuntimeError, 'list down')]
+    assert sorted([call[1] for call in asset.calls if call[0] == 'fingerprint']) == asset_ids
+    assert [call[1] for call in asset.calls if call[0] == 'create'] == ['asset0']
+    assert instance.get_untracked_assets() == {}
+
+    # The error is raised if the sync does not continue on errors
+    asset.errors['list'] = [RuntimeError('list down')]
+    asset.calls.clear()
+    with pytest.raises(RuntimeError, match='list down'):
+        sync(asset)
+    assert asset.count('create') == 0
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+import logging
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from pyiaacsync import pyiaacsync
+
+from .assets import MemoryAsset
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+@pytest.fixture
+def git(tmp_path):
+    """Run git in a new git work tree holding the IAAC Sync folder
+    """
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path)] + list(args), check=True, capture_output=True)
+    git("init", "-q")
+    git("config", "user.email", "pyiaacsync@example.com")
+    git("config", "user.name", "pyiaacsync")
+    return git
+
+def test_git_changes_syncs_only_the_changed_configs(git, sync, write_config, conf_folder):
+    asset = MemoryAsset()
+    for i in range(5):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    git("add", "-A")
+    git("commit", "-qm", "Add configs")
+    state = sync(asset, git_changes=True).state
+    assert asset.count('create') == 5 and state[pyiaacsync.STATE_METADATA_KEY].get('git_commit')
+
+    asset.calls.clear()
+    sync(asset, git_changes=True)
+    assert asset.calls == []
+
+    write_config("config0.yaml", {'name': 'asset0', 'value': 1})
+    os.remove(os.path.join(conf_folder, "config1.yaml"))
+    write_config("new.yaml", {'name': 'new'})
+    git("add", "-A")
+    git("commit", "-qm", "Change configs")
+    asset.calls.clear()
+    sync(asset, git_changes=True)
+    assert sorted([call[0] for call in asset.calls if call[0] != 'validate']) == ['check', 'create', 'delete', 'update']
+    assert sorted([config['name'] for config in asset.remote.values()]) == ['asset0', 'asset2', 'asset3', 'asset4', 'new']
+
+def test_git_changes_syncs_all_configs_when_the_folder_is_dirty(git, sync, write_config):
+    asset = MemoryAsset()
+    for i in range(3):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    git("add", "-A")
+    git("commit", "-qm", "Add configs")
+    sync(asset, git_changes=True)
+
+    write_config("config0.yaml", {'name': 'asset0', 'value': 1})
+    asset.calls.clear()
+    state = sync(asset, git_changes=True).state
+    assert asset.count('check') == 3 and asset.count('update') == 1
+    assert state[pyiaacsync.STATE_METADATA_KEY].get('git_commit') is None
+
+def test_git_changes_syncs_all_configs_outside_a_git_work_tree(sync, write_config):
+    asset = MemoryAsset()
+    write_config("config.yaml", {'name': 'asset'})
+    sync(asset, git_changes=True)
+    assert asset.count('create') == 1
+
+def test_git_changes_checks_the_unchanged_configs_when_due(git, sync, write_config):
+    asset = MemoryAsset()
+    for i in range(3):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    git("add", "-A")
+    git("commit", "-qm", "Add configs")
+    sync(asset, git_changes=True, check_interval=3600)
+    asset.calls.clear()
+    sync(asset, git_changes=True, check_interval=3600)
+    assert asset.calls == []
+
+    # Git reports no changes, yet the drifted asset is found and updated once the checks are due
+    asset_id = sorted(asset.remote)[0]
+    asset.remote[asset_id] = {'name': 'drifted'}
+    time.sleep(0.01)
+    sync(asset, git_changes=True, check_interval=0.001)
+    assert asset.count('check') == 3 and asset.count('update') == 1
+    assert asset.remote[asset_id]['name'] != 'drifted'
+
+def test_git_changes_without_check_interval_warns(git, sync, write_config, caplog):
+    write_config("config.yaml", {'name': 'asset'})
+    with caplog.at_level(logging.WARNING, logger='pyiaacsync.pyiaacsync'):
+        sync(MemoryAsset(), git_changes=True)
+    assert 'check_interval' in caplog.text
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='pyiaacsync.pyiaacsync'):
+        sync(MemoryAsset(), git_changes=True, check_interval=3600)
+    assert caplog.text == ''
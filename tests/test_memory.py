@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+import os
+import tracemalloc
+
+import yaml
+
+from pyiaacsync import pyiaacsync
+
+# Number of config files in the generated tree, which can be raised e.g. to a million to check a large tree
+CONFIG_FILES = int(os.environ.get("PYIAACSYNC_TEST_CONFIG_FILES", "1000"))
+
+# Number of entries in each config, so that keeping every parsed config in memory would stand out
+CONFIG_ENTRIES = 20
+
+# Maximum number of bytes traced per config file while syncing, which covers reading and writing the state record of each config
+# but not keeping each parsed config
+MAX_TRACED_BYTES_PER_CONFIG = 6144
+
+# Bytes traced while syncing regardless of the number of config files
+MAX_TRACED_BYTES = 1024 * 1024
+
+class LeanAsset:
+    """An asset class which only keeps the IDs of its assets, so that the memory traced during a sync is the memory of the sync
+    """
+    def __init__(self):
+        self.asset_ids = set()
+        self.deleted = 0
+
+    def validate(self, config, **args):
+        return 'name' in config
+
+    def check(self, asset_id, config, **args):
+        return asset_id in self.asset_ids
+
+    def create(self, config, **args):
+        asset_id = config['name']
+        self.asset_ids.add(asset_id)
+        return asset_id
+
+    def update(self, asset_id, config, **args):
+        return asset_id in self.asset_ids
+
+    def delete(self, asset_id, **args):
+        self.asset_ids.discard(asset_id)
+        self.deleted += 1
+        return True
+
+def write_tree(conf_folder, config_files):
+    """Write a tree of config files to the IAAC Sync folder, in sub-folders of a hundred config files each
+
+    Args:
+        conf_folder (str): The IAAC Sync folder
+        config_files (int): Number of config files to write
+
+    Returns:
+        list: Paths to the config files
+    """
+    entries = yaml.safe_dump({'entries': [{'key': f"key{j}", 'value': j} for j in range(CONFIG_ENTRIES)]})
+    config_paths = []
+    for i in range(config_files):
+        dir_path = os.path.join(conf_folder, f"dir{i // 100}")
+        if i % 100 == 0:
+            os.makedirs(dir_path)
+        config_path = os.path.join(dir_path, f"config{i}.yaml")
+        with open(config_path, "w") as f:
+            f.write(f"name: asset{i}\n{entries}")
+        config_paths.append(config_path)
+    return config_paths
+
+def get_traced_peak(func):
+    """Run a function while tracing the memory allocated
+
+    Args:
+        func (func): The function to run
+
+    Returns:
+        tuple: The result of the function, and the peak of the memory traced in bytes
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_sync_of_a_large_tree_keeps_memory_bounded(sync, conf_folder):
+    asset = LeanAsset()
+    config_paths = write_tree(conf_folder, CONFIG_FILES)
+    max_peak = MAX_TRACED_BYTES + CONFIG_FILES * MAX_TRACED_BYTES_PER_CONFIG
+    instance, peak = get_traced_peak(lambda: sync(asset, max_workers=4, config_cache_size=100))
+    assert len(asset.asset_ids) == CONFIG_FILES and peak < max_peak
+    assert len(instance.config_cache) <= 100
+
+    # The assets whose config files were removed are found and deleted
+    for config_path in config_paths[::10]:
+        os.remove(config_path)
+    instance, peak = get_traced_peak(lambda: sync(asset, max_workers=4, config_cache_size=100))
+    assert asset.deleted == len(config_paths[::10]) and peak < max_peak
+    assert len(asset.asset_ids) == CONFIG_FILES - asset.deleted
+    assert len(instance.state) == len(asset.asset_ids) + 1
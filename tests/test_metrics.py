@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+import logging
+import os
+import re
+
+import pytest
+
+from pyiaacsync.metrics import Histogram, SyncMetrics
+
+from .assets import MemoryAsset
+
+# A sample in the Prometheus text format: the metric name, any labels with their escaped values, and the value
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*"'
+                         r'(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*")*\})? (\S+)$')
+
+def parse_prometheus(text):
+    """Parse metrics in the Prometheus text format, checking that they are well-formed
+
+    Args:
+        text (str): The metrics
+
+    Returns:
+        tuple: The type of each metric, and the value of each sample by its name and labels as written
+    """
+    assert text.endswith("\n")
+    types = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            assert name not in types and metric_type in ('counter', 'gauge', 'histogram')
+            types[name] = metric_type
+            continue
+        match = SAMPLE_LINE.match(line)
+        assert match, f"Malformed sample: {line}"
+        name, labels, value = match.groups()
+        metric_name = name if name in types else re.sub(r"_(bucket|sum|count)$", "", name)
+        assert metric_name in types, f"Sample before the TYPE of its metric: {line}"
+        samples[f"{name}{labels or ''}"] = float(value)
+    return types, samples
+
+def test_histogram_counts_values_into_cumulative_buckets():
+    histogram = Histogram((1, 5))
+    for value in [0.5, 1, 3, 10]:
+        histogram.observe(value)
+    assert histogram.to_dict() == {'count': 4, 'sum': 14.5, 'buckets': {1: 2, 5: 3}}
+
+def test_metrics_count_the_cycles_calls_and_configs(sync, write_config):
+    asset = MemoryAsset()
+    for i in range(4):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    metrics = sync(asset).metrics
+    assert metrics.get('pyiaacsync_configs_total', result='created') == 4
+    assert metrics.get('pyiaacsync_asset_calls_total', operation='create', result='ok') == 4
+    assert metrics.get('pyiaacsync_last_cycle_configs', action='sync', result='created') == 4
+
+    # Each config of the next cycle is counted by its outcome
+    write_config("config0.yaml", {'name': 'asset0', 'value': 1})
+    os.remove(write_config("config1.yaml", {'name': 'asset1'}))
+    write_config("config2.yaml", {'name': 'asset2', 'value': 2})
+    asset.errors['update'] = [RuntimeError('down')]
+    metrics = sync(asset, continue_sync_on_error=True, callback_on_sync_error=lambda err_class, err_msg: None).metrics
+    assert metrics.get('pyiaacsync_cycles_total', action='sync') == 1
+    assert dict([(result, metrics.get('pyiaacsync_last_cycle_configs', action='sync', result=result))
+                 for result in ['created', 'updated', 'deleted', 'in_sync', 'errored']]) == \
+        {'created': 0, 'updated': 1, 'deleted': 1, 'in_sync': 1, 'errored': 1}
+    assert metrics.get('pyiaacsync_asset_calls_total', operation='update', result='error') == 1
+
+    # The latency histograms count every call and phase
+    durations = metrics.get('pyiaacsync_asset_call_duration_seconds', operation='update')
+    assert durations['count'] == 2 and durations['sum'] >= 0
+    assert list(durations['buckets'].values()) == sorted(durations['buckets'].values())
+    assert metrics.get('pyiaacsync_phase_duration_seconds', phase='walk')['count'] == 1
+
+def test_metrics_textfile_is_well_formed(sync, write_config, tmp_path):
+    asset = MemoryAsset()
+    metrics_file = str(tmp_path / "pyiaacsync.prom")
+    for i in range(3):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    sync(asset, metrics_file=metrics_file)
+    with open(metrics_file) as f:
+        types, samples = parse_prometheus(f.read())
+    assert types['pyiaacsync_cycles_total'] == 'counter'
+    assert types['pyiaacsync_asset_call_duration_seconds'] == 'histogram'
+    assert samples['pyiaacsync_configs_total{result="created"}'] == 3
+    assert samples['pyiaacsync_asset_call_duration_seconds_bucket{operation="create",le="+Inf"}'] == \
+        samples['pyiaacsync_asset_call_duration_seconds_count{operation="create"}'] == 3
+    assert [path for path in os.listdir(tmp_path) if path.endswith(".tmp")] == []
+
+def test_metrics_escape_the_label_values():
+    metrics = SyncMetrics()
+    metrics.inc('pyiaacsync_asset_calls_total', operation='create', kind='a "b"\\c\nd', result='ok')
+    types, samples = parse_prometheus(metrics.to_prometheus())
+    assert samples == {'pyiaacsync_asset_calls_total{kind="a \\"b\\"\\\\c\\nd",operation="create",result="ok"}': 1}
+
+def test_metrics_textfile_error_never_replaces_the_sync_error(sync, write_config, tmp_path, caplog):
+    asset = MemoryAsset()
+    metrics_file = str(tmp_path / "missing" / "pyiaacsync.prom")
+    write_config("config0.yaml", {'name': 'asset0'})
+    asset.errors['create'] = [RuntimeError('down')]
+    with caplog.at_level(logging.ERROR, logger='pyiaacsync.metrics'):
+        with pytest.raises(RuntimeError, match='down'):
+            sync(asset, metrics_file=metrics_file)
+    assert "Could not write the metrics to textfile" in caplog.text
+
+    # A sync which succeeds is not failed by the metrics either
+    assert sync(asset, metrics_file=metrics_file).metrics.get('pyiaacsync_configs_total', result='created') == 1
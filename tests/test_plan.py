@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import os
+
+import pytest
+
+from pyiaacsync.plan import Plan, PlanInvalidException, PlanStaleException
+
+from .assets import AsyncMemoryAsset, MemoryAsset
+
+@pytest.fixture(params=[MemoryAsset, AsyncMemoryAsset])
+def asset(request):
+    """The in-memory asset, with and without `async def` methods
+    """
+    return request.param()
+
+def test_plan_changes_neither_the_assets_nor_the_state(asset, sync, write_config, state_file, tmp_path):
+    for i in range(3):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    sync(asset, run_on_init=False)
+    with open(state_file) as f:
+        state_before = f.read()
+
+    plan_file = str(tmp_path / "plan.yaml")
+    plan = sync(asset, run_on_init=False).plan(plan_file)
+    assert plan.summary()['create'] == 3
+    assert asset.count('create') == 0 and asset.remote == {}
+    with open(state_file) as f:
+        assert f.read() == state_before
+    assert [action.config_path for action in Plan.read(plan_file).actions] == [action.config_path for action in plan.actions]
+
+def test_apply_runs_the_planned_changes_only(asset, sync, write_config, conf_folder, tmp_path):
+    config_paths = [write_config(f"config{i}.yaml", {'name': f"asset{i}"}) for i in range(4)]
+    sync(asset)
+
+    # Change a config, remove a config and change an asset in the background
+    write_config("config0.yaml", {'name': 'asset0', 'value': 1})
+    os.remove(config_paths[1])
+    drifted_asset_id = [asset_id for asset_id, config in asset.remote.items() if config['name'] == 'asset2'][0]
+    asset.remote[drifted_asset_id] = {'name': 'drifted'}
+
+    plan_file = str(tmp_path / "plan.yaml")
+    plan = sync(asset, run_on_init=False).plan(plan_file)
+    assert sorted([(action.action, action.config_path) for action in plan.changes()]) == [
+        ('delete', 'config1.yaml'), ('update', 'config0.yaml'), ('update', 'config2.yaml')]
+
+    asset.calls.clear()
+    sync(asset, apply_only=True, plan_file=plan_file)
+    assert asset.count('check') == 0 and asset.count('validate') == 0
+    assert sorted([config['name'] for config in asset.remote.values()]) == ['asset0', 'asset2', 'asset3']
+    assert {'name': 'asset0', 'value': 1} in asset.remote.values()
+
+def test_stale_plan_is_refused(asset, sync, write_config, tmp_path):
+    write_config("config.yaml", {'name': 'asset'})
+    plan_file = str(tmp_path / "plan.yaml")
+    plan = sync(asset, run_on_init=False).plan(plan_file)
+    sync(asset)
+
+    with pytest.raises(PlanStaleException):
+        sync(asset, run_on_init=False).apply(plan)
+    assert asset.count('create') == 1
+
+def test_invalid_plan_file_is_refused(tmp_path):
+    plan_file = str(tmp_path / "plan.yaml")
+    with open(plan_file, "w") as f:
+        f.write("version: 0\n")
+    with pytest.raises(PlanInvalidException):
+        Plan.read(plan_file)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+import logging
+import os
+import time
+
+import pytest
+
+from pyiaacsync.profiling import CycleProfiler
+
+from .assets import MemoryAsset
+
+class SlowMemoryAsset(MemoryAsset):
+    """The in-memory asset class taking `delay` seconds to create the assets named `slow`
+    """
+    delay = 0.2
+
+    def create(self, config, **args):
+        if config['name'] == 'slow':
+            time.sleep(self.delay)
+        return super().create(config, **args)
+
+def test_profiler_keeps_the_profiles_of_the_last_cycles(sync, write_config, tmp_path):
+    profile_dir = str(tmp_path / "profiles")
+    write_config("config.yaml", {'name': 'asset'})
+    profiler = CycleProfiler(profile_dir, keep_profiles=2)
+    for _ in range(4):
+        sync(MemoryAsset(), profiler=profiler)
+    profiles = os.listdir(profile_dir)
+    assert len(profiles) == 2 and all([profile.endswith("-sync.prof") for profile in profiles])
+
+@pytest.mark.parametrize('keep_profiles', [0, -1])
+def test_profiler_requires_keeping_a_profile(keep_profiles, tmp_path):
+    with pytest.raises(ValueError):
+        CycleProfiler(str(tmp_path), keep_profiles=keep_profiles)
+
+def test_profiler_logs_only_the_calls_slower_than_the_threshold(sync, write_config, caplog):
+    slow_config_path = write_config("slow.yaml", {'name': 'slow'})
+    fast_config_path = write_config("fast.yaml", {'name': 'fast'})
+    profiler = CycleProfiler(slow_call_threshold=SlowMemoryAsset.delay / 2)
+    with caplog.at_level(logging.WARNING, logger='pyiaacsync.profiling'):
+        sync(SlowMemoryAsset(), profiler=profiler)
+    slow_calls = [record.getMessage() for record in caplog.records if record.name == 'pyiaacsync.profiling']
+    assert len(slow_calls) == 1 and profiler.slow_calls == 1
+    assert slow_calls[0].startswith("Slow asset call: create took") and slow_calls[0].endswith(f"for config: {slow_config_path}")
+    assert fast_config_path not in caplog.text
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+import pytest
+
+from pyiaacsync.ratelimit import AssetThrottledException, RateLimiter
+from pyiaacsync.retry import CircuitBreaker, CircuitBreakerOpen, RetryPolicy
+
+from .assets import AsyncMemoryAsset, MemoryAsset
+
+# Retry policy which retries quickly, so that the tests do not wait for the backoff
+FAST_RETRY_POLICY = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05)
+
+@pytest.mark.parametrize('asset_class, settings', [(MemoryAsset, {}), (MemoryAsset, {'max_workers': 4}),
+                                                   (AsyncMemoryAsset, {})])
+def test_failed_calls_are_retried(asset_class, settings, sync, write_config):
+    asset = asset_class()
+    asset.errors['create'] = [RuntimeError('flaky'), RuntimeError('flaky')]
+    for i in range(5):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    sync(asset, retry_policies={'create': FAST_RETRY_POLICY}, **settings)
+    assert len(asset.remote) == 5
+    assert asset.count('create') == 7
+
+def test_error_is_surfaced_once_retries_are_exhausted(sync, write_config):
+    asset = MemoryAsset()
+    asset.errors['create'] = [RuntimeError('down')] * 3
+    write_config("config.yaml", {'name': 'asset'})
+    errors = []
+    sync(asset, retry_policies={'create': FAST_RETRY_POLICY}, continue_sync_on_error=True,
+         callback_on_sync_error=lambda err_class, err_msg: errors.append(err_class))
+    assert errors == [RuntimeError]
+    assert asset.count('create') == 3 and asset.remote == {}
+
+def test_errors_not_retried_by_the_policy_are_surfaced_at_once(sync, write_config):
+    asset = MemoryAsset()
+    asset.errors['create'] = [KeyError('bad config')]
+    write_config("config.yaml", {'name': 'asset'})
+    with pytest.raises(KeyError):
+        sync(asset, retry_policies={'create': RetryPolicy(base_delay=0.01, retry_on=(RuntimeError,))})
+    assert asset.count('create') == 1
+
+def test_circuit_breaker_skips_calls_once_open(sync, write_config):
+    asset = MemoryAsset()
+    asset.errors['create'] = [RuntimeError('down')] * 10
+    for i in range(6):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    errors = []
+    sync(asset, circuit_breaker=CircuitBreaker(failure_threshold=3, cooldown=60), continue_sync_on_error=True,
+         callback_on_sync_error=lambda err_class, err_msg: errors.append(err_class))
+    assert asset.count('create') == 3
+    assert errors == [RuntimeError] * 3 + [CircuitBreakerOpen] * 3
+
+def test_circuit_breaker_lets_a_trial_call_through_after_the_cooldown():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0)
+    breaker.failed()
+    assert breaker.allow()
+    breaker.failed()
+    assert breaker.allow() and not breaker.allow()
+    breaker.succeeded()
+    assert breaker.allow() and breaker.allow()
+
+def test_retry_policy_backs_off_exponentially():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+    assert [policy.delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+
+def test_rate_limiter_backs_off_when_throttled():
+    rate_limiter = RateLimiter(100)
+    rate_limiter.throttled()
+    assert rate_limiter.rate == 50
+
+@pytest.mark.parametrize('asset_class, settings', [(MemoryAsset, {}), (MemoryAsset, {'max_workers': 4}),
+                                                   (AsyncMemoryAsset, {})])
+def test_throttled_calls_to_rate_limited_methods_are_retried(asset_class, settings, sync, write_config):
+    asset = asset_class()
+    asset.errors['create'] = [AssetThrottledException('slow down'), AssetThrottledException('slow down')]
+    for i in range(5):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    rate_limiter = RateLimiter(100)
+    instance = sync(asset, rate_limits={'create': rate_limiter}, **settings)
+    assert len(asset.remote) == 5 and asset.count('create') == 7
+    assert rate_limiter.rate < 100
+    assert instance.metrics.get('pyiaacsync_asset_calls_total', operation='create', result='throttled') == 2
+
+def test_throttled_calls_are_only_retried_if_set_up(sync, write_config):
+    asset = MemoryAsset()
+    write_config("config.yaml", {'name': 'asset'})
+    asset.errors['create'] = [AssetThrottledException('slow down')]
+    with pytest.raises(AssetThrottledException):
+        sync(asset)
+    assert asset.count('create') == 1
+
+    # A retry policy of the method which does not retry them is enough to retry the throttled calls
+    asset.errors['create'] = [AssetThrottledException('slow down')]
+    retry_policy = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.05, retry_on=(ConnectionError,))
+    sync(asset, retry_policies={'create': retry_policy})
+    assert asset.count('create') == 3 and len(asset.remote) == 1
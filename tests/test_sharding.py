@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import os
+
+import pytest
+
+from pyiaacsync import pyiaacsync
+from pyiaacsync.sharding import HashRing, ShardLock, ShardLockedException
+
+from .assets import MemoryAsset
+
+# Number of configs spread across the shards
+NUM_CONFIGS = 200
+
+@pytest.fixture
+def sync_shard(conf_folder, state_file):
+    """Sync the partition of a shard, creating it first if needed
+    """
+    def sync_shard(asset, shard, shards, **kwargs):
+        if not os.path.exists(state_file.replace(".yaml", f".shard-{shard}.yaml")):
+            pyiaacsync.IaacSync(conf_folder, state_file, asset, shard=shard, shards=shards, init=True)
+        return pyiaacsync.IaacSync(conf_folder, state_file, asset, shard=shard, shards=shards, **kwargs)
+    return sync_shard
+
+def test_hash_ring_moves_few_keys_when_a_shard_is_added():
+    keys = [f"config{i}.yaml" for i in range(1000)]
+    ring = HashRing(3)
+    assert set([ring.get_shard(key) for key in keys]) == {'0', '1', '2'}
+    assert [ring.get_shard(key) for key in keys] == [HashRing(['0', '1', '2']).get_shard(key) for key in keys]
+
+    larger_ring = HashRing(4)
+    moved = [key for key in keys if ring.get_shard(key) != larger_ring.get_shard(key)]
+    assert set([larger_ring.get_shard(key) for key in moved]) == {'3'}
+    assert len(moved) < len(keys) / 2
+
+def test_shards_sync_each_config_once(sync_shard, write_config):
+    asset = MemoryAsset()
+    for i in range(NUM_CONFIGS):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    states = [sync_shard(asset, shard, 2).state for shard in ['0', '1']]
+    assert asset.count('create') == NUM_CONFIGS
+    config_paths = [set([k for k in state if k != pyiaacsync.STATE_METADATA_KEY]) for state in states]
+    assert not config_paths[0] & config_paths[1] and len(config_paths[0] | config_paths[1]) == NUM_CONFIGS
+
+def test_adding_a_shard_takes_over_assets_without_recreating_them(sync_shard, write_config, conf_folder):
+    asset = MemoryAsset()
+    for i in range(NUM_CONFIGS):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    for shard in ['0', '1']:
+        sync_shard(asset, shard, 2)
+
+    # Sync each shard twice, so that the old shards stop tracking the configs taken over by the new shard
+    asset.calls.clear()
+    for _ in range(2):
+        for shard in ['0', '1', '2']:
+            sync_shard(asset, shard, 3)
+    assert asset.count('create') == 0 and asset.count('delete') == 0
+
+    for i in range(10):
+        os.remove(os.path.join(conf_folder, f"config{i}.yaml"))
+    for shard in ['0', '1', '2']:
+        sync_shard(asset, shard, 3)
+    assert asset.count('delete') == 10 and len(asset.remote) == NUM_CONFIGS - 10
+
+def test_shard_lock_is_exclusive(tmp_path):
+    lock_file = str(tmp_path / "state.shard-0.yaml.lock")
+    with ShardLock(lock_file):
+        with pytest.raises(ShardLockedException):
+            ShardLock(lock_file).acquire()
+    with ShardLock(lock_file):
+        pass
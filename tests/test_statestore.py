@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+import asyncio
+import os
+
+import pytest
+
+from pyiaacsync.statestore import (STATE_STORES, BinaryStateStore, SqliteStateStore, StateRecord, YamlStateStore, 
+                                   migrate_state, records_to_dicts)
+
+from pyiaacsync import pyiaacsync
+
+from .assets import AsyncMemoryAsset, MemoryAsset
+
+# Records covering each field kept by the state stores: empty and unset hashes, asset IDs which are not strings, and extra fields
+RECORDS = {
+    '__pyiaacsync__': {'syncs': 3, 'hash_mode': 'raw'},
+    '/conf/config0.yaml': {'asset_id': 'asset0', 'hash': 'ab' * 32, 'stat': [1700000000000000000, 12, 34]},
+    '/conf/sub/config1.yaml': {'asset_id': {'region': 'eu', 'id': 1}, 'hash': '', 'kind': 'rules',
+                               'depends_on': ['/conf/config0.yaml'], 'check_interval': 60},
+    '/conf/config2.yaml': {'asset_id': '', 'hash': 'not a sha256 hash'},
+    '/other/config3.yaml': {'last_checked': 1700000000.5},
+}
+
+@pytest.fixture(params=sorted(STATE_STORES))
+def state_store(request, tmp_path):
+    """Each of the state stores, keeping the state in a file of the temporary folder
+    """
+    state_store = STATE_STORES[request.param](str(tmp_path / f"state.{request.param}"))
+    yield state_store
+    state_store.close()
+
+class CountingStateStore(YamlStateStore):
+    """The YAML state store, counting the writes of the state
+    """
+    writes = 0
+
+    def write(self, state, changed_config_paths):
+        self.writes += 1
+        super().write(state, changed_config_paths)
+
+class HangingDeleteAsset(AsyncMemoryAsset):
+    """The async in-memory asset class whose `delete` never returns, so that the sync can be cancelled while deleting
+    """
+    async def delete(self, asset_id, **args):
+        await asyncio.sleep(3600)
+
+def get_state(records):
+    """Get the state of records for dicts of fields
+
+    Args:
+        records (dict): The fields of each record by config path
+
+    Returns:
+        dict: The state
+    """
+    return dict([(config_path, StateRecord.from_dict(fields)) for config_path, fields in records.items()])
+
+def test_state_record_keeps_the_hash_as_a_digest():
+    record = StateRecord.from_dict({'hash': 'ab' * 32, 'asset_id': 'asset'})
+    assert record.digest == bytes.fromhex('ab' * 32) and record.extra is None
+    assert record['hash'] == 'ab' * 32 and record.get('kind') is None
+    record['kind'] = 'rules'
+    record['kind'] = None
+    assert record.to_dict() == {'asset_id': 'asset', 'hash': 'ab' * 32}
+    with pytest.raises(KeyError):
+        record['kind']
+
+def test_state_store_round_trips_the_state(state_store):
+    assert state_store.read() is None and not state_store.exists()
+    state_store.create(get_state(RECORDS))
+    assert records_to_dicts(state_store.read()) == RECORDS
+
+def test_state_store_writes_changed_records(state_store):
+    state_store.create(get_state(RECORDS))
+    state = state_store.read()
+    state['/conf/config0.yaml']['asset_id'] = 'asset0-updated'
+    del state['/conf/config2.yaml']
+    state['/conf/config4.yaml'] = StateRecord.from_dict({'asset_id': 'asset4'})
+    state_store.write(state, {'/conf/config0.yaml', '/conf/config2.yaml', '/conf/config4.yaml'})
+    assert records_to_dicts(state_store.read()) == records_to_dicts(state)
+
+def test_sqlite_state_store_only_writes_the_changed_rows(tmp_path):
+    state_store = SqliteStateStore(str(tmp_path / "state.db"))
+    state_store.create(get_state(RECORDS))
+    state = state_store.read()
+    state['/conf/config0.yaml']['asset_id'] = 'asset0-updated'
+    state['/conf/config2.yaml']['asset_id'] = 'not written'
+    state_store.write(state, {'/conf/config0.yaml'})
+    state = state_store.read()
+    assert state['/conf/config0.yaml']['asset_id'] == 'asset0-updated' and state['/conf/config2.yaml']['asset_id'] == ''
+    state_store.close()
+
+def test_binary_state_store_decodes_only_the_records_accessed(tmp_path):
+    state_store = BinaryStateStore(str(tmp_path / "state.binary"))
+    state_store.create(get_state(RECORDS))
+    state = state_store.read()
+    assert len(state) == len(RECORDS) and '/conf/config0.yaml' in state and state.records == {}
+    state['/conf/config0.yaml']['asset_id'] = 'asset0-updated'
+    assert list(state.records) == ['/conf/config0.yaml']
+
+    # The records never decoded are copied as is
+    state_store.write(state, {'/conf/config0.yaml'})
+    records = dict(RECORDS)
+    records['/conf/config0.yaml'] = dict(RECORDS['/conf/config0.yaml'], asset_id='asset0-updated')
+    assert records_to_dicts(state_store.read()) == records
+
+def test_migrate_state_copies_the_state(state_store, tmp_path):
+    source = STATE_STORES['yaml'](str(tmp_path / "source.yaml"))
+    source.create(get_state(RECORDS))
+    migrate_state(source, state_store)
+    assert records_to_dicts(state_store.read()) == RECORDS
+
+def test_sync_with_state_store(state_store, sync, write_config):
+    asset = MemoryAsset()
+    config_paths = [write_config(f"config{i}.yaml", {'name': f"asset{i}"}) for i in range(3)]
+    sync(asset, state_file=state_store)
+    asset.calls.clear()
+    sync(asset, state_file=state_store)
+    assert asset.count('create') == 0 and asset.count('check') == 3
+    state = state_store.read()
+    assert sorted([state[config_path]['asset_id'] for config_path in config_paths]) == sorted(asset.remote)
+
+def test_sync_errors_write_the_state_once_per_cycle(sync, write_config, tmp_path):
+    asset = MemoryAsset()
+    state_store = CountingStateStore(str(tmp_path / "state.yaml"))
+    config_paths = [write_config(f"config{i}.yaml", {'name': f"asset{i}"}) for i in range(6)]
+    asset.errors['create'] = [RuntimeError('down')] * 3
+    errors = []
+    sync(asset, state_file=state_store, continue_sync_on_error=True, 
+         callback_on_sync_error=lambda err_class, err_msg: errors.append(err_class))
+    assert errors == [RuntimeError] * 3 and state_store.writes == 1
+    state = state_store.read()
+    assert sorted([state[config_path].get('asset_id') for config_path in config_paths if state[config_path].get('asset_id')]) == \
+        sorted(asset.remote)
+    assert len(asset.remote) == 3
+
+def test_sync_stopped_by_the_error_callback_writes_the_state(sync, write_config, tmp_path):
+    asset = MemoryAsset()
+    state_store = CountingStateStore(str(tmp_path / "state.yaml"))
+    write_config("config0.yaml", {'name': 'asset0'})
+    orphan_config_path = write_config("config1.yaml", {'name': 'asset1'})
+    sync(asset, state_file=state_store)
+
+    # The orphans are deleted after the configs are synced, so the asset created is tracked once the sync is stopped
+    os.remove(orphan_config_path)
+    config_path = write_config("config2.yaml", {'name': 'asset2'})
+    asset.errors['delete'] = [RuntimeError('down')]
+    def stop(err_class, err_msg):
+        raise SystemExit(1)
+    with pytest.raises(SystemExit):
+        sync(asset, state_file=state_store, continue_sync_on_error=True, callback_on_sync_error=stop)
+    assert asset.remote[state_store.read()[config_path].get('asset_id')] == {'name': 'asset2'}
+
+def test_cancelled_async_sync_writes_the_state(sync, write_config, conf_folder, tmp_path):
+    asset = HangingDeleteAsset()
+    state_store = CountingStateStore(str(tmp_path / "state.yaml"))
+    orphan_config_path = write_config("config0.yaml", {'name': 'asset0'})
+    sync(asset, state_file=state_store)
+
+    # The sync is cancelled while deleting the orphan, after the asset of the new config is created
+    os.remove(orphan_config_path)
+    config_path = write_config("config1.yaml", {'name': 'asset1'})
+    instance = pyiaacsync.IaacSync(conf_folder, state_store, asset, run_on_init=False)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(instance.async_sync(), 0.5))
+    assert asset.remote[state_store.read()[config_path].get('asset_id')] == {'name': 'asset1'}
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+import os
+import time
+
+import pytest
+
+from pyiaacsync import pyiaacsync
+from pyiaacsync.graph import DependencyCycleException, TaskGraph
+from pyiaacsync.statestore import YamlStateStore
+
+from .assets import AsyncMemoryAsset, BatchMemoryAsset, FingerprintedMemoryAsset, MemoryAsset
+
+# Asset class and settings of each way of driving the sync: one config at a time, a pool of threads, an event loop, and batches
+DRIVERS = {
+    'serial': (MemoryAsset, {}),
+    'threads': (MemoryAsset, {'max_workers': 4}),
+    'async': (AsyncMemoryAsset, {'max_concurrency': 4}),
+    'batch': (BatchMemoryAsset, {'batch_size': 3}),
+}
+
+@pytest.fixture(params=sorted(DRIVERS))
+def driver(request):
+    """The asset and settings of each driver
+    """
+    asset_class, settings = DRIVERS[request.param]
+    return asset_class(), settings
+
+def test_sync_creates_updates_and_deletes_assets(driver, sync, write_config):
+    asset, settings = driver
+    config_paths = [write_config(f"{'sub/' if i % 2 else ''}config{i}.yaml", {'name': f"asset{i}", 'value': i})
+                    for i in range(7)]
+    state = sync(asset, **settings).state
+    assert sorted(asset.remote.values(), key=lambda c: c['name']) == [{'name': f"asset{i}", 'value': i} for i in range(7)]
+    asset_ids = dict([(config_path, state[config_path]['asset_id']) for config_path in config_paths])
+
+    # Change a config, remove a config, and change an asset in the background
+    write_config("config2.yaml", {'name': 'asset2', 'value': 20})
+    os.remove(config_paths[4])
+    asset.remote[asset_ids[config_paths[6]]] = {'name': 'asset6', 'value': 'drifted'}
+    state = sync(asset, **settings).state
+    assert asset.remote[state[config_paths[2]]['asset_id']] == {'name': 'asset2', 'value': 20}
+    assert asset_ids[config_paths[4]] not in asset.remote and config_paths[4] not in state
+    assert asset.remote[state[config_paths[6]]['asset_id']] == {'name': 'asset6', 'value': 6}
+    assert len(asset.remote) == 6
+
+    sync(asset, delete_all_only=True, **settings)
+    assert asset.remote == {}
+
+def test_sync_of_unchanged_configs_only_checks(driver, sync, write_config):
+    asset, settings = driver
+    for i in range(5):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    sync(asset, **settings)
+    asset.calls.clear()
+    sync(asset, **settings)
+    assert set([call[0] for call in asset.calls]) <= {'validate', 'check', 'check_many'}
+
+def test_sync_stops_on_error(sync, write_config):
+    asset = MemoryAsset()
+    asset.errors['create'] = [RuntimeError('down')]
+    write_config("config.yaml", {'name': 'asset'})
+    with pytest.raises(RuntimeError):
+        sync(asset)
+
+def test_sync_continues_on_error(driver, sync, write_config):
+    asset, settings = driver
+    asset.errors['create'] = [RuntimeError('down')]
+    for i in range(4):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    errors = []
+    sync(asset, continue_sync_on_error=True, callback_on_sync_error=lambda err_class, err_msg: errors.append(err_class),
+         **settings)
+    # A failed batch call fails all the configs in the batch
+    assert errors and set(errors) == {RuntimeError}
+    assert len(asset.remote) == 4 - len(errors)
+
+def test_sync_skips_invalid_config(sync, write_config):
+    asset = MemoryAsset()
+    config_path = write_config("config.yaml", {'value': 1})
+    state = sync(asset).state
+    assert asset.remote == {} and not state[config_path].get('asset_id')
+
+def test_check_interval_skips_checks_until_due(sync, write_config):
+    asset = MemoryAsset()
+    for i in range(5):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    sync(asset, check_interval=3600)
+    asset.calls.clear()
+    sync(asset, check_interval=3600)
+    assert asset.count('check') == 0
+
+@pytest.mark.parametrize('settings', [{}, {'max_workers': 4}])
+def test_depends_on_syncs_in_dependency_order(settings, sync, write_config):
+    asset = MemoryAsset()
+    write_config("a-rule.yaml", {'name': 'rule', pyiaacsync.CONFIG_METADATA_KEY: {'depends_on': ['z-source.yaml']}})
+    write_config("z-source.yaml", {'name': 'source'})
+    for i in range(5):
+        write_config(f"other{i}.yaml", {'name': f"other{i}"})
+    sync(asset, **settings)
+    created = [call[1] for call in asset.calls if call[0] == 'create']
+    assert created.index('source') < created.index('rule') and len(created) == 7
+
+    sync(asset, delete_all_only=True, **settings)
+    deleted = [call[1].rsplit('-', 1)[0] for call in asset.calls if call[0] == 'delete']
+    assert deleted.index('rule') < deleted.index('source')
+
+def test_configs_without_dependencies_are_synced_without_tracking_dependencies(driver, sync, write_config, monkeypatch):
+    asset, settings = driver
+    for i in range(5):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    task_graphs = []
+    class RecordingTaskGraph(TaskGraph):
+        def __init__(self, dependencies=None, reverse=False):
+            super().__init__(dependencies, reverse=reverse)
+            task_graphs.append(self)
+    monkeypatch.setattr(pyiaacsync, 'TaskGraph', RecordingTaskGraph)
+    sync(asset, **settings)
+    assert len(asset.remote) == 5
+    assert task_graphs and all([not task_graph.parents and not task_graph.children for task_graph in task_graphs])
+
+@pytest.mark.parametrize('settings', [{}, {'max_workers': 4}])
+def test_depends_on_syncs_the_dependent_configs_once_their_dependencies_are_synced(settings, sync, write_config, 
+                                                                                   monkeypatch):
+    asset = MemoryAsset()
+    write_config("a-source.yaml", {'name': 'source'})
+    write_config("b-parser.yaml", {'name': 'parser', pyiaacsync.CONFIG_METADATA_KEY: {'depends_on': ['a-source.yaml']}})
+    write_config("c-rule.yaml", {'name': 'rule', pyiaacsync.CONFIG_METADATA_KEY: {'depends_on': ['b-parser.yaml']}})
+    for i in range(20):
+        write_config(f"d-other{i:02}.yaml", {'name': f"other{i:02}"})
+    walk_files = pyiaacsync.walk_files
+    monkeypatch.setattr(pyiaacsync, 'walk_files', lambda folder: iter(sorted(walk_files(folder))))
+
+    # The dependent configs are synced before the walk is done, i.e. before the last config found
+    sync(asset, **settings)
+    created = [call[1] for call in asset.calls if call[0] == 'create']
+    assert created.index('source') < created.index('parser') < created.index('rule') < created.index('other19')
+
+def test_task_graph_waits_only_on_the_configs_added_until_closed():
+    task_graph = TaskGraph()
+    task_graph.add("rule", ["source", "outside"])
+    task_graph.add("source")
+    assert task_graph.pop_ready() == ["source"]
+    task_graph.finish("source")
+    assert task_graph.pop_ready() == [] and not task_graph.is_finished()
+
+    # The failure of a config is remembered to skip the configs added later which depend on it
+    task_graph.add("parser")
+    task_graph.fail("parser")
+    assert task_graph.add("other-rule", ["parser"]) == "parser"
+
+    task_graph.close()
+    assert task_graph.pop_ready() == ["rule"]
+    task_graph.finish("rule")
+    assert task_graph.is_finished()
+
+def test_depends_on_skips_dependents_of_failed_asset(sync, write_config):
+    asset = MemoryAsset()
+    asset.errors['create'] = [RuntimeError('down')]
+    write_config("rule.yaml", {'name': 'rule', pyiaacsync.CONFIG_METADATA_KEY: {'depends_on': ['source.yaml']}})
+    write_config("source.yaml", {'name': 'source'})
+    errors = []
+    sync(asset, continue_sync_on_error=True, callback_on_sync_error=lambda err_class, err_msg: errors.append(err_class))
+    assert errors == [RuntimeError, pyiaacsync.AssetDependencyFailedException]
+    assert asset.remote == {}
+
+def test_depends_on_cycle_raises(sync, write_config):
+    asset = MemoryAsset()
+    write_config("a.yaml", {'name': 'a', pyiaacsync.CONFIG_METADATA_KEY: {'depends_on': ['b.yaml']}})
+    write_config("b.yaml", {'name': 'b', pyiaacsync.CONFIG_METADATA_KEY: {'depends_on': ['a.yaml']}})
+    with pytest.raises(DependencyCycleException):
+        sync(asset)
+    assert asset.remote == {}
+
+def test_registry_routes_configs_by_kind(sync, write_config):
+    rules = MemoryAsset()
+    sources = MemoryAsset()
+    rule_path = write_config("rules/rule.yaml", {'name': 'rule'})
+    write_config("other/source.yaml", {'name': 'source', 'kind': 'sources'})
+    state = sync({'rules': rules, 'sources': sources}).state
+    assert list(rules.remote) == ['rule-0'] and list(sources.remote) == ['source-0']
+    assert state[rule_path]['kind'] == 'rules'
+
+    os.remove(rule_path)
+    sync({'rules': rules, 'sources': sources})
+    assert rules.remote == {} and len(sources.remote) == 1
+
+def test_registry_raises_for_unknown_kind(sync, write_config):
+    write_config("config.yaml", {'name': 'asset', 'kind': 'unknown'})
+    with pytest.raises(pyiaacsync.AssetKindNotFoundException):
+        sync({'rules': MemoryAsset()})
+
+def test_registry_records_the_kind_of_assets_tracked_without_one(sync, write_config, tmp_path):
+    asset = MemoryAsset()
+    config_path = write_config("rules/rule.yaml", {'name': 'rule'})
+    sync(asset, config_diffs=True)
+
+    asset.calls.clear()
+    plan = sync({'rules': asset}, run_on_init=False).plan(str(tmp_path / "plan.yaml"))
+    assert plan.summary()['recreate'] == 0
+    state = sync({'rules': asset}, config_diffs=True).state
+    assert asset.count('create') == 0 and asset.count('delete') == 0
+    assert state[config_path]['kind'] == 'rules'
+
+def test_registry_recreates_assets_routed_to_another_kind(sync, write_config, state_file):
+    rules = MemoryAsset()
+    sources = MemoryAsset()
+    config_path = write_config("rules/rule.yaml", {'name': 'rule'})
+    sync({'rules': rules, 'sources': sources})
+
+    # Track the asset as another kind of asset, as if the config was routed to it before
+    state_store = YamlStateStore(state_file)
+    state = state_store.read()
+    sources.remote = dict([(asset_id, rules.remote.pop(asset_id)) for asset_id in list(rules.remote)])
+    state[config_path]['kind'] = 'sources'
+    state_store.write(state, {config_path})
+
+    state = sync({'rules': rules, 'sources': sources}, config_diffs=True).state
+    assert sources.remote == {} and list(rules.remote.values()) == [{'name': 'rule'}]
+    assert state[config_path]['kind'] == 'rules' and state[config_path]['asset_id'] in rules.remote
+
+def test_unchanged_config_files_are_only_read_for_checks(sync, write_config, monkeypatch):
+    asset = FingerprintedMemoryAsset()
+    config_paths = [write_config(f"config{i}.yaml", {'name': f"asset{i}"}) for i in range(3)]
+    config_paths.append(write_config("scheduled.yaml", {'name': 'scheduled', 
+                                                         pyiaacsync.CONFIG_METADATA_KEY: {'check_interval': 3600}}))
+
+    # Keep the config files out of the window in which their stat cannot be relied upon
+    for config_path in config_paths:
+        os.utime(config_path, (time.time() - 3600, time.time() - 3600))
+    sync(asset)
+
+    read_config_paths = []
+    read_config_file = pyiaacsync.IaacSync._IaacSync__read_config_file
+    monkeypatch.setattr(pyiaacsync.IaacSync, '_IaacSync__read_config_file', 
+                        lambda self, config_path: read_config_paths.append(config_path) or read_config_file(self, config_path))
+
+    # The configs are read to check the assets, until the fingerprints of the assets in sync are kept
+    sync(asset)
+    assert sorted(read_config_paths) == sorted(config_paths[:3]) and asset.count('check') == 3
+
+    read_config_paths.clear()
+    asset.calls.clear()
+    sync(asset)
+    assert read_config_paths == [] and sorted(asset.calls) == sorted([('fingerprint', asset_id) for asset_id in asset.remote
+                                                                      if not asset_id.startswith('scheduled')])
+
+    # The config is read to update an asset which has drifted
+    asset_id = sorted(asset.remote)[0]
+    asset.change(asset_id, {'name': 'drifted'})
+    sync(asset)
+    assert len(read_config_paths) == 1 and asset.remote[asset_id] == {'name': 'asset0'}
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+import pytest
+
+from pyiaacsync import pyiaacsync
+
+class ValidatedAsset:
+    """Asset class which records the configs it validates, defined at the top level so that it can be pickled for the pool of
+    validation processes
+    """
+    validated = []
+    validator_version = "1"
+
+    @classmethod
+    def validate(cls, config, **args):
+        cls.validated.append(config.get('name'))
+        if config.get('error'):
+            raise ValueError(config['error'])
+        return 'name' in config
+
+    @staticmethod
+    def check(asset_id, config, **args):
+        return True
+
+    @staticmethod
+    def create(config, **args):
+        return config['name']
+
+    @staticmethod
+    def delete(asset_id, **args):
+        return True
+
+@pytest.fixture
+def validate(conf_folder, state_file):
+    """Validate the config files in the IAAC Sync folder via an asset class
+    """
+    ValidatedAsset.validated = []
+    ValidatedAsset.validator_version = "1"
+    def validate(asset_class=ValidatedAsset, **kwargs):
+        return pyiaacsync.IaacSync(conf_folder, state_file, asset_class, validate_configs_only=True, **kwargs)
+    return validate
+
+def write_configs(write_config):
+    """Write valid config files, a config which is not valid, a config whose validation raises and a config file which cannot be
+    parsed
+
+    Args:
+        write_config (func): Function writing a config file to the IAAC Sync folder
+    """
+    for i in range(3):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    write_config("invalid.yaml", {'value': 1})
+    write_config("raises.yaml", {'name': 'raises', 'error': 'bad value'})
+    with open(write_config("unparsable.yaml", {}), "w") as f:
+        f.write("name: [unclosed\n")
+
+@pytest.mark.parametrize('settings', [{}, {'validate_processes': 2}])
+def test_validate_configs_reports_all_failures(settings, validate, write_config):
+    write_configs(write_config)
+    with pytest.raises(pyiaacsync.ConfigFilesInvalidException) as e:
+        validate(**settings)
+    report = e.value.report
+    assert report.validated == 6 and not report.is_valid()
+    assert sorted([(failure.config_path.rsplit('/', 1)[1], failure.error_class) for failure in report.failures]) == [
+        ('invalid.yaml', 'ConfigNotValidException'), ('raises.yaml', 'ValueError'),
+        ('unparsable.yaml', 'ConfigFileInvalidSyntax')]
+
+def test_validate_configs_passes_valid_configs(validate, write_config):
+    for i in range(3):
+        write_config(f"config{i}.yaml", {'name': f"asset{i}"})
+    report = validate(run_on_init=False).validate_configs()
+    assert report.is_valid() and report.validated == 3
+
+def test_validation_cache_skips_unchanged_configs(validate, write_config, tmp_path):
+    cache_file = str(tmp_path / "validation-cache.json")
+    write_configs(write_config)
+    with pytest.raises(pyiaacsync.ConfigFilesInvalidException):
+        validate(validate_cache_file=cache_file)
+    assert len(ValidatedAsset.validated) == 5
+
+    # Only the configs which failed, or changed since they passed, are validated again
+    ValidatedAsset.validated = []
+    write_config("config0.yaml", {'name': 'asset0', 'value': 1})
+    with pytest.raises(pyiaacsync.ConfigFilesInvalidException) as e:
+        validate(validate_cache_file=cache_file)
+    assert sorted(map(str, ValidatedAsset.validated)) == ['None', 'asset0', 'raises']
+    assert e.value.report.cached == 2
+
+    # A new version of the validators validates all the configs again
+    ValidatedAsset.validated = []
+    ValidatedAsset.validator_version = "2"
+    with pytest.raises(pyiaacsync.ConfigFilesInvalidException):
+        validate(validate_cache_file=cache_file)
+    assert len(ValidatedAsset.validated) == 5